@@ -0,0 +1,123 @@
+'''
+    Headless benchmark of the time taken by import Typhoon in a fresh interpreter, so the engine keeps
+    starting fast on servers without a display
+    Each run starts a new python process, reports the median wall time of the import, the slowest
+    dependencies (from python -X importtime) and whether optional rendering packages were loaded
+    Exits with an error if a rendering package was imported or the median is above --limit
+    ---------
+    run:
+        python Benchmarks/ImportTime.py [-r runs] [--limit ms] [--save baseline.json] [--compare baseline.json]
+'''
+
+from os.path import dirname, abspath, join
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = join(dirname(abspath(__file__)), '..')
+RUNS = 10               # fresh interpreters started
+TOP = 8                 # slowest dependencies listed
+BASELINE_VERSION = 1    # version of the JSON baseline format
+
+#Packages only needed to render demos, import Typhoon must not load them
+RENDERING = ('vpython', 'jupyter', 'IPython', 'matplotlib')
+
+#Measured in the child process, prints the import time and the rendering packages it loaded
+PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+import Typhoon
+elapsed = time.perf_counter() - start
+print(json.dumps({'time': elapsed, 'rendering': [name for name in %r if name in sys.modules]}))
+''' % (RENDERING,)
+
+def measure(runs):
+    '''
+        Return the median import time in ms and the rendering packages loaded
+        ---------
+        args:
+            runs - int - number of fresh interpreters started
+    '''
+
+    times = []
+    rendering = set()
+    for run in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        times.append(result['time'] * 1000)
+        rendering.update(result['rendering'])
+    return statistics.median(times), sorted(rendering)
+
+def slowest(count):
+    '''
+        Return the dependencies imported by Typhoon modules with the largest cumulative import time in ms,
+        as (name, ms) pairs
+        ---------
+        args:
+            count - int - number of dependencies returned
+    '''
+
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import Typhoon'], cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line: continue
+        cumulative, name = line.split('|')[1:]
+        #Nesting is shown by indentation, two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1000))
+
+    #Modules are listed after the modules they import, so parents are found walking backwards
+    parents = {}
+    modules = {}
+    for depth, name, time in reversed(entries):
+        parents[depth] = name
+        parent = parents.get(depth - 1, '') if depth > 0 else ''
+        if parent.split('.')[0] == 'Typhoon' and name.split('.')[0] != 'Typhoon':
+            root = name.split('.')[0]
+            modules[root] = modules.get(root, 0) + time
+    return sorted(modules.items(), key=lambda item: item[1], reverse=True)[:count]
+
+def main():
+    '''
+        Parse arguments, measure the import, then save or compare a baseline
+    '''
+
+    parser = argparse.ArgumentParser(description='Typhoon import time benchmark')
+    parser.add_argument('-r', '--runs', type=int, default=RUNS, help='fresh interpreters started')
+    parser.add_argument('--limit', type=float, help='fail if the median import time in ms is above this')
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='JSON baseline to compare results with')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline.get('version') != BASELINE_VERSION: raise SystemExit(f'{args.compare} is not a version {BASELINE_VERSION} baseline')
+
+    median, rendering = measure(args.runs)
+    delta = f' ({(median - baseline["median"]) / baseline["median"] * 100:+.1f}%)' if baseline.get('median') else ''
+    print(f'import Typhoon: {median:.1f} ms median of {args.runs} runs{delta}')
+    for name, time in slowest(TOP):
+        print(f'    {name:<16}{time:>10.1f} ms')
+
+    if args.save:
+        data = {
+            'version': BASELINE_VERSION,
+            'runs': args.runs,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'median': median,
+        }
+        with open(args.save, 'w') as file:
+            json.dump(data, file, indent=4)
+        print(f'baseline written to {args.save}')
+
+    if rendering: raise SystemExit(f'import Typhoon loaded rendering packages: {", ".join(rendering)}')
+    if args.limit is not None and median > args.limit: raise SystemExit(f'import Typhoon took {median:.1f} ms, limit is {args.limit:.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+'''
+    Headless benchmark of the memory held by the engine objects, reports bytes per Vector, Quaternion,
+    Matrix3, Matrix4, Particle and RigidBody
+    Objects are built with distinct float components, like objects of a running scene, so the float
+    objects they reference are counted too
+    Results can be saved as a JSON baseline and compared with a later run, changes in percent are printed
+    ---------
+    run:
+        python Benchmarks/Memory.py [-n count] [--save baseline.json] [--compare baseline.json]
+'''
+
+from sys import path
+from os.path import dirname, abspath, join
+path.insert(0, join(dirname(abspath(__file__)), '..'))
+
+import argparse
+import gc
+import json
+import platform
+import random
+import tracemalloc
+from Typhoon import *
+
+COUNT = 10000           # objects built for each measurement
+SEED = 1234             # seed of random numbers used for components
+BASELINE_VERSION = 1    # version of the JSON baseline format
+
+def buildVector(rand):
+    return Vector(rand.random(), rand.random(), rand.random())
+
+def buildQuaternion(rand):
+    return Quaternion(rand.random(), rand.random(), rand.random(), rand.random())
+
+def buildMatrix3(rand):
+    return Matrix3(*(rand.random() for i in range(9)))
+
+def buildMatrix4(rand):
+    return Matrix4(*(rand.random() for i in range(12)))
+
+def buildParticle(rand):
+    particle = Particle()
+    particle.setMass(1 + rand.random())
+    particle.setDamping(0.99)
+    particle.setPosition(rand.random(), rand.random(), rand.random())
+    particle.setVelocity(rand.random(), rand.random(), rand.random())
+    particle.setAcceleration(0, -9.81, 0)
+    particle.addForce(Vector(rand.random(), rand.random(), rand.random()))
+    return particle
+
+def buildRigidBody(rand):
+    body = RigidBody()
+    body.setMass(1 + rand.random())
+    body.setInertiaTensor(Matrix3(1 + rand.random(), 0, 0, 0, 1 + rand.random(), 0, 0, 0, 1 + rand.random()))
+    body.setDamping(0.99, 0.8)
+    body.setPosition(rand.random(), rand.random(), rand.random())
+    body.setOrientation(1, rand.random(), rand.random(), rand.random())
+    body.setVelocity(rand.random(), rand.random(), rand.random())
+    body.setRotation(rand.random(), rand.random(), rand.random())
+    body.setAcceleration(0, -9.81, 0)
+    body.calculateDerivedData()
+    body.addForceAtBodyPoint(Vector(rand.random(), rand.random(), rand.random()), Vector(rand.random(), rand.random(), rand.random()))
+    return body
+
+#Name of each measurement and the function building one object from a random generator
+BUILDERS = {
+    'Vector': buildVector,
+    'Quaternion': buildQuaternion,
+    'Matrix3': buildMatrix3,
+    'Matrix4': buildMatrix4,
+    'Particle': buildParticle,
+    'RigidBody': buildRigidBody,
+}
+
+def measure(name, count):
+    '''
+        Return the bytes held by one object, averaged over count objects
+        ---------
+        args:
+            name  - str - key of the builder in BUILDERS
+            count - int - number of objects built
+    '''
+
+    build = BUILDERS[name]
+    rand = random.Random(SEED)
+    objects = [None] * count
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for index in range(count):
+        objects[index] = build(rand)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size / count
+
+def main():
+    '''
+        Parse arguments, measure the objects, then save or compare a baseline
+    '''
+
+    parser = argparse.ArgumentParser(description='Typhoon memory per object benchmark')
+    parser.add_argument('-n', '--count', type=int, default=COUNT, help='objects built for each measurement')
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='JSON baseline to compare results with')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            data = json.load(file)
+        if data.get('version') != BASELINE_VERSION: raise SystemExit(f'{args.compare} is not a version {BASELINE_VERSION} baseline')
+        baseline = data['objects']
+
+    print(f'bytes per object, averaged over {args.count} objects')
+    results = {}
+    for name in BUILDERS:
+        results[name] = measure(name, args.count)
+        delta = f' ({(results[name] - baseline[name]) / baseline[name] * 100:+.1f}%)' if baseline.get(name) else ''
+        print(f'    {name:<12}{results[name]:>10.1f}{delta}')
+
+    if args.save:
+        data = {
+            'version': BASELINE_VERSION,
+            'count': args.count,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'objects': results,
+        }
+        with open(args.save, 'w') as file:
+            json.dump(data, file, indent=4)
+        print(f'baseline written to {args.save}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+'''
+    Headless benchmark comparing contact resolvers on a stack of boxes resting on the ground
+    For each resolver it reports the velocity iterations used per frame once the stack settled,
+    how many frames needed less than the iteration limit (converged), the time per frame
+    and the mean speed of the fastest body, which shows jitter of the stack
+    ---------
+    run:
+        python Benchmarks/SolverConvergence.py [stack height] [frames]
+'''
+
+from sys import path
+from os.path import dirname, abspath, join
+path.insert(0, join(dirname(abspath(__file__)), '..'))
+
+import time
+from Typhoon import *
+
+FREQ = 60               # frequency of simulation
+STACK_HEIGHT = 8        # number of bodies in the stack
+FRAMES = 300            # frames simulated for each resolver
+SETTLE_FRAMES = 100     # frames ignored at start while the stack settles
+
+def buildStack(resolver, height):
+    '''
+        Return a world with a stack of boxes resting on a ground plane
+        ---------
+        args:
+            resolver - ContactResolver - resolver used by the world
+            height   - int             - number of boxes in the stack
+    '''
+
+    world = World(height * 4)
+    world.setResolver(resolver)
+    world.collisionData.friction = 0.6
+
+    ground = CollisionPlane()
+    ground.direction = Vector(0, 1, 0)
+    ground.offset = 0
+    world.addPlane(ground)
+
+    for i in range(height):
+        body = RigidBody()
+        body.setMass(1)
+        tensor = Matrix3()
+        tensor.setBlockInertiaTensor(Vector(1, 1, 1), 1)
+        body.setInertiaTensor(tensor)
+        body.setDamping(0.95, 0.8)
+        body.setPosition(0, 1 + i * 2, 0)
+        body.setAcceleration(0, -9.81, 0)
+        body.calculateDerivedData()
+        world.getBodyRegistry().append(body)
+
+        primitive = CollisionBox()
+        primitive.body = body
+        primitive.halfSize = Vector(1, 1, 1)
+        world.addPrimitive(primitive)
+
+    return world
+
+def run(name, resolver, height, frames):
+    '''
+        Simulate a stack with a resolver and print its convergence
+        ---------
+        args:
+            name     - str             - name of the resolver in the report
+            resolver - ContactResolver - resolver to benchmark
+            height   - int             - number of boxes in the stack
+            frames   - int             - number of frames to simulate
+    '''
+
+    world = buildStack(resolver, height)
+    iterations = []
+    speeds = []
+    converged = 0
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        world.startFrame()
+        world.runPhysics(1/FREQ)
+        if frame < SETTLE_FRAMES: continue
+        iterations.append(resolver.velocityIterationsUsed)
+        speeds.append(max(body.getVelocity().magnitude() for body in world.getBodyRegistry()))
+        if resolver.velocityIterationsUsed < resolver.velocityIterations: converged += 1
+    elapsed = time.perf_counter() - start
+
+    print(f'{name:<24}{sum(iterations)/len(iterations):>12.2f}{max(iterations):>8}{converged:>7}/{len(iterations):<6}'
+          f'{elapsed/frames*1000:>10.2f}{sum(speeds)/len(speeds):>12.4f}')
+
+def main(height = STACK_HEIGHT, frames = FRAMES):
+    '''
+        Run the benchmark for all resolvers
+        ---------
+        args:
+            height - int - number of bodies in the stack
+            frames - int - number of frames to simulate
+    '''
+
+    #Iterations are calculated by the world from the number of contacts
+    resolvers = [
+        ('ContactResolver', ContactResolver(0, 0)),
+        ('SequentialImpulse cold', SequentialImpulseResolver(0, 0, warmStartFactor = 0)),
+        ('SequentialImpulse warm', SequentialImpulseResolver(0, 0)),
+    ]
+
+    print(f'stack of {height} bodies, {frames} frames at {FREQ} Hz, first {SETTLE_FRAMES} frames not measured')
+    print(f'{"resolver":<24}{"mean iter":>12}{"max":>8}{"converged":>14}{"ms/frame":>10}{"jitter":>12}')
+    for name, resolver in resolvers:
+        run(name, resolver, height, frames)
+
+if __name__ == '__main__':
+    from sys import argv
+    main(*(int(arg) for arg in argv[1:3]))
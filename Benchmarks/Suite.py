@@ -0,0 +1,542 @@
+'''
+    Headless benchmark suite running reproducible scenarios derived from the demos without vpython:
+    bridge (rods and cables), platform, firework particle storm, ragdoll joints, box stack and sail boat
+    For each scenario it reports steps per second, average wall time of each runPhysics phase (PhysicsStats),
+    memory allocated to build the scenario, peak memory while it runs and memory blocks allocated per step
+    Random numbers come from a seeded generator, so every run simulates the same frames
+    Results can be saved as a JSON baseline and compared with a later run, changes in percent are printed
+    ---------
+    run:
+        python Benchmarks/Suite.py [-f frames] [-s scenario ...] [--save baseline.json] [--compare baseline.json]
+'''
+
+from sys import path
+from os.path import dirname, abspath, join
+path.insert(0, join(dirname(abspath(__file__)), '..'))
+
+import argparse
+import json
+import math
+import platform
+import random
+import time
+import tracemalloc
+import numpy as np
+from Typhoon import *
+
+FREQ = 60               # frequency of simulation
+FRAMES = 600            # frames simulated for each scenario
+WARMUP_FRAMES = 30      # frames run before measuring
+MEMORY_FRAMES = 60      # frames run while tracing memory
+SEED = 1234             # seed of random numbers used by scenarios
+BASELINE_VERSION = 1    # version of the JSON baseline format
+
+class BridgeScenario(Scenario):
+    '''
+        Bridge demo, particles hung from anchors by cables, linked by cables and rods, with the extra mass
+        resting at its start position
+    '''
+
+    PARTICLE_COUNT = 12
+    CABLE_COUNT = 10
+    SUPPORT_COUNT = 12
+    ROD_COUNT = 6
+    BASE_MASS = 1
+    EXTRA_MASS = 10
+
+    def build(self):
+        world = ParticleWorld(self.PARTICLE_COUNT*10)
+
+        particles = []
+        for i in range(self.PARTICLE_COUNT):
+            particle = Particle()
+            particle.setPosition(i-5, 4, (i%2)*2-1)
+            particle.setMass(self.BASE_MASS)
+            particle.setDamping(0.9)
+            particle.setAcceleration(0, -9.81, 0)
+            particle.clearAccumulator()
+            world.addParticle(particle)
+            particles.append(particle)
+
+        for i in range(self.CABLE_COUNT):
+            cable = ParticleCable()
+            cable.particles[0] = particles[i]
+            cable.particles[1] = particles[i+2]
+            cable.maxLength = 1.9
+            cable.restitution = 0
+            world.getContactGenerators().append(cable)
+
+        for i in range(self.SUPPORT_COUNT):
+            support = ParticleCableConstrain()
+            support.particle = particles[i]
+            support.anchor = Vector(i/2*2.2-5.5, 6, (i%2)*1.6-0.8)
+            support.maxLength = i/4 + 3.0 if i < 6 else i/4
+            support.restitution = 0
+            world.getContactGenerators().append(support)
+
+        for i in range(self.ROD_COUNT):
+            rod = ParticleRod()
+            rod.particles[0] = particles[i*2]
+            rod.particles[1] = particles[i*2+1]
+            rod.length = 2
+            world.getContactGenerators().append(rod)
+
+        #Extra mass at (0, 0, 0.5) is shared by the first two particles
+        particles[0].setMass(self.BASE_MASS + self.EXTRA_MASS*0.5)
+        particles[1].setMass(self.BASE_MASS + self.EXTRA_MASS*0.5)
+        return world
+
+
+class PlatformScenario(Scenario):
+    '''
+        Platform demo, a platform of six particles braced by rods resting on the ground, with the extra mass
+        resting at its start position
+    '''
+
+    PARTICLE_COUNT = 6
+    BASE_MASS = 1
+    EXTRA_MASS = 10
+
+    #(first particle, second particle, length) of each rod
+    RODS = [
+        (0, 1, 2), (2, 3, 2), (4, 5, 2), (2, 4, 7), (3, 5, 7),
+        (0, 2, 3.605551275), (1, 3, 3.605551275), (0, 4, 4.472135955), (1, 5, 4.472135955),
+        (0, 3, 4.123105626), (2, 5, 7.280109889), (4, 1, 4.898979486), (1, 2, 4.123105626),
+        (3, 4, 7.280109889), (5, 0, 4.898979486),
+    ]
+
+    def build(self):
+        world = ParticleWorld(self.PARTICLE_COUNT*10)
+
+        particles = []
+        for position in [(0,0,1), (0,0,-1), (-3,2,1), (-3,2,-1), (4,2,1), (4,2,-1)]:
+            particle = Particle()
+            particle.setPosition(*position)
+            particle.setMass(self.BASE_MASS)
+            particle.setDamping(0.9)
+            particle.setAcceleration(0, -9.81, 0)
+            particle.clearAccumulator()
+            world.addParticle(particle)
+            particles.append(particle)
+
+        #Base of the platform is nearly immovable
+        particles[0].setInverseMass(0.0001)
+        particles[1].setInverseMass(0.0001)
+
+        for one, two, length in self.RODS:
+            rod = ParticleRod()
+            rod.particles[0] = particles[one]
+            rod.particles[1] = particles[two]
+            rod.length = length
+            world.getContactGenerators().append(rod)
+        world.getContactGenerators().append(GroundContacts(world.getParticles()))
+
+        #Extra mass at (0, 0, 0.5) is shared by the two particles at the back of the platform
+        particles[2].setMass(self.BASE_MASS + self.EXTRA_MASS*0.5)
+        particles[3].setMass(self.BASE_MASS + self.EXTRA_MASS*0.5)
+        return world
+
+
+class FireworkScenario(Scenario):
+    '''
+        Firework demo turned into a storm, every particle of the pool is always in flight
+        A firework which burns out spawns its payloads into free particles, particles left free are
+        launched as new fireworks
+        ---------
+        properties:
+            parameters - int  - size of the particle pool, 1024 if None
+            random     - Random - seeded generator of ages and velocities
+            types      - list - rule type of each particle
+            ages       - list - time left for each particle
+    '''
+
+    #type: (minAge, maxAge, minVelocity, maxVelocity, damping, payloads as (type, count))
+    RULES = {
+        1: (0.5, 2.1, (-5, -5, 25), (5, 5, 28), 0.8, [(3, 5), (5, 1)]),
+        2: (0.5, 1, (-5, -5, 20), (5, 5, 30), 0.1, [(4, 7)]),
+        3: (0.5, 3, (-20, 10, 40), (5, 20, 80), 0.2, []),
+        4: (0.2, 2.1, (-20, 5, 50), (20, 5, 95), 0.2, []),
+        5: (0.2, 1.7, (-20, 5, 5), (20, 5, 30), 0.2, [(2, 2), (3, 3)]),
+    }
+
+    def build(self):
+        count = self.parameters or 1024
+        world = ParticleWorld(1)
+        self.random = random.Random(SEED)
+        self.types = [0] * count
+        self.ages = [0] * count
+
+        for i in range(count):
+            world.addParticle(Particle())
+            self.create(world.getParticles()[i], i, self.random.choice((1, 2)))
+        return world
+
+    def create(self, particle, index, type, parent = None):
+        '''
+            Launch a firework of a rule type from the ground, or from a parent position and velocity
+            ---------
+            args:
+                particle - Particle     - particle reused for the firework
+                index    - int          - index of the particle in the pool
+                type     - int          - rule type
+                parent   - tuple = None - (position, velocity) of the parent
+        '''
+
+        minAge, maxAge, minVelocity, maxVelocity, damping, payloads = self.RULES[type]
+        uniform = self.random.uniform
+        self.types[index] = type
+        self.ages[index] = uniform(minAge, maxAge)
+
+        velocity = [uniform(low, high) for low, high in zip(minVelocity, maxVelocity)]
+        if parent is None:
+            particle.setPosition(uniform(0, 50), uniform(0, 100), 0)
+        else:
+            position, parentVelocity = parent
+            particle.setPosition(*position)
+            velocity = [v + p for v, p in zip(velocity, parentVelocity)]
+
+        particle.setVelocity(*velocity)
+        particle.setMass(1)
+        particle.setDamping(damping)
+        particle.setAcceleration(0, 0, -20)
+
+    def update(self, duration):
+        super().update(duration)
+
+        particles = self.world.getParticles()
+        dead = []
+        for i, particle in enumerate(particles):
+            self.ages[i] -= duration
+            if self.ages[i] < 0 or particle.getPosition().z < 0: dead.append(i)
+
+        #Payloads are spawned into free particles, parents are read before their particle is reused
+        free = list(reversed(dead))
+        for i in dead:
+            position, velocity = particles[i].getPosition(), particles[i].getVelocity()
+            parent = ((position.x, position.y, position.z), (velocity.x, velocity.y, velocity.z))
+            for type, count in self.RULES[self.types[i]][5]:
+                for n in range(count):
+                    if not free: break
+                    index = free.pop()
+                    self.create(particles[index], index, type, parent)
+
+        for index in free:
+            self.create(particles[index], index, self.random.choice((1, 2)))
+
+
+class JointedSpatialHash(SpatialHash):
+    '''
+        Spatial hash which doesn't report pairs of bodies linked by a joint, they overlap at the joint
+        ---------
+        properties:
+            jointedPairs - set - (body, body) pairs in both orders
+    '''
+
+    def __init__(self, jointedPairs):
+        super().__init__()
+        self.jointedPairs = jointedPairs
+
+    def getPotentialContacts(self, limit):
+        contacts = super().getPotentialContacts(limit)
+        return [contact for contact in contacts
+                if (contact.primitives[0].body, contact.primitives[1].body) not in self.jointedPairs]
+
+
+class RagdollScenario(Scenario):
+    '''
+        Ragdoll demo, twelve bones linked by eleven joints falling on the ground after being hit
+    '''
+
+    #(position, half size) of each bone
+    BONES = [
+        ((0, 0.993, -0.5), (0.301, 1.0, 0.234)), ((0, 3.159, -0.56), (0.301, 1.0, 0.234)),
+        ((0, 0.993, 0.5), (0.301, 1.0, 0.234)), ((0, 3.15, 0.56), (0.301, 1.0, 0.234)),
+        ((-0.054, 4.683, 0.013), (0.415, 0.392, 0.690)), ((0.043, 5.603, 0.013), (0.301, 0.367, 0.693)),
+        ((0, 6.485, 0.013), (0.435, 0.367, 0.786)), ((0, 7.759, 0.013), (0.45, 0.598, 0.421)),
+        ((0, 5.946, -1.066), (0.267, 0.888, 0.207)), ((0, 4.024, -1.066), (0.267, 0.888, 0.207)),
+        ((0, 5.946, 1.066), (0.267, 0.888, 0.207)), ((0, 4.024, 1.066), (0.267, 0.888, 0.207)),
+    ]
+
+    #(bone, position, other bone, other position, error) of each joint
+    JOINTS = [
+        (0, (0, 1.07, 0), 1, (0, -1.07, 0), 0.15), (2, (0, 1.07, 0), 3, (0, -1.07, 0), 0.15),
+        (9, (0, 0.96, 0), 8, (0, -0.96, 0), 0.15), (11, (0, 0.96, 0), 10, (0, -0.96, 0), 0.15),
+        (4, (0.054, 0.50, 0), 5, (-0.043, -0.45, 0), 0.15), (5, (-0.043, 0.411, 0), 6, (0, -0.411, 0), 0.15),
+        (6, (0, 0.521, 0), 7, (0, -0.752, 0), 0.15), (1, (0, 1.066, 0), 4, (0, -0.458, -0.5), 0.15),
+        (3, (0, 1.066, 0), 4, (0, -0.458, 0.5), 0.105), (6, (0, 0.367, -0.8), 8, (0, 0.888, 0.32), 0.15),
+        (6, (0, 0.367, 0.8), 10, (0, 0.888, -0.32), 0.15),
+    ]
+
+    def __init__(self, parameters = None):
+        super().__init__(parameters)
+        self.frame = 0
+
+    def build(self):
+        world = World(256)
+        world.collisionData.friction = 0.9
+        world.collisionData.restitution = 0.6
+        world.collisionData.tolerance = 0.1
+
+        bodies = []
+        for position, extents in self.BONES:
+            body = RigidBody()
+            body.setPosition(*position)
+            halfSize = Vector(*extents)
+            mass = halfSize.x * halfSize.y * halfSize.z * 8.0
+            body.setMass(mass)
+            tensor = Matrix3()
+            tensor.setBlockInertiaTensor(halfSize, mass)
+            body.setInertiaTensor(tensor)
+            body.setLinearDamping(0.95)
+            body.setAngularDamping(0.8)
+            body.setAcceleration(0, -2, 0)
+            body.setCanSleep(False)
+            body.setAwake()
+            body.calculateDerivedData()
+            world.getBodyRegistry().append(body)
+            bodies.append(body)
+
+        jointedPairs = set()
+        for one, position, two, otherPosition, error in self.JOINTS:
+            joint = Joint()
+            joint.set(bodies[one], Vector(*position), bodies[two], Vector(*otherPosition), error)
+            world.contactGenRegistry.append(joint)
+            jointedPairs.add((bodies[one], bodies[two]))
+            jointedPairs.add((bodies[two], bodies[one]))
+        world.setBroadPhase(JointedSpatialHash(jointedPairs))
+
+        ground = CollisionPlane()
+        ground.direction = Vector(0, 1, 0)
+        ground.offset = 0
+        world.addPlane(ground)
+
+        for body, (position, extents) in zip(bodies, self.BONES):
+            primitive = CollisionBox()
+            primitive.body = body
+            primitive.halfSize = Vector(*extents)
+            world.addPrimitive(primitive)
+
+        #Hit the chest and both feet
+        bodies[6].addForceAtBodyPoint(Vector(100, 0, 0), Vector(0, 0, 0))
+        bodies[0].addForceAtBodyPoint(Vector(-100, 0, 0), Vector(0, 0, 0))
+        bodies[2].addForceAtBodyPoint(Vector(-100, 0, 0), Vector(0, 0, 0))
+        return world
+
+    def update(self, duration):
+        #The hit is kept for the first frame
+        if self.frame: self.world.startFrame()
+        self.frame += 1
+        self.world.runPhysics(duration)
+
+
+class BoxStackScenario(Scenario):
+    '''
+        Stack of boxes resting on the ground, the same stack as SolverConvergence
+        ---------
+        properties:
+            parameters - int - height of the stack, 8 if None
+    '''
+
+    def build(self):
+        height = self.parameters or 8
+        world = World(height * 4)
+        world.collisionData.friction = 0.6
+
+        ground = CollisionPlane()
+        ground.direction = Vector(0, 1, 0)
+        ground.offset = 0
+        world.addPlane(ground)
+
+        for i in range(height):
+            body = RigidBody()
+            body.setMass(1)
+            tensor = Matrix3()
+            tensor.setBlockInertiaTensor(Vector(1, 1, 1), 1)
+            body.setInertiaTensor(tensor)
+            body.setDamping(0.95, 0.8)
+            body.setPosition(0, 1 + i * 2, 0)
+            body.setAcceleration(0, -9.81, 0)
+            body.calculateDerivedData()
+            world.getBodyRegistry().append(body)
+
+            primitive = CollisionBox()
+            primitive.body = body
+            primitive.halfSize = Vector(1, 1, 1)
+            world.addPrimitive(primitive)
+        return world
+
+
+class SailBoatScenario(Scenario):
+    '''
+        Sail boat demo, a boat floating on two buoyancy forces pushed by a gusting wind on its sail
+        ---------
+        properties:
+            random    - Random - seeded generator of wind gusts
+            windSpeed - Vector - wind speed read by the aero force, changed in place every frame
+    '''
+
+    def build(self):
+        world = World(1)
+        self.random = random.Random(SEED)
+        self.windSpeed = Vector()
+
+        boat = RigidBody()
+        boat.setPosition(0, 1.5, 0)
+        boat.setOrientation(1, 0, 0, 0)
+        boat.setMass(200.0)
+        tensor = Matrix3()
+        tensor.setBlockInertiaTensor(Vector(2, 1, 1), 100)
+        boat.setInertiaTensor(tensor)
+        boat.setDamping(0.8, 0.4)
+        boat.setAcceleration(0.3, -9.81, 0)
+        boat.setCanSleep(False)
+        boat.setAwake()
+        boat.calculateDerivedData()
+        world.getBodyRegistry().append(boat)
+
+        world.getForces().add(boat, Aero(Matrix3(0,0,0, 0,0,0, -1,0,-1), Vector(2, 0, 0), self.windSpeed))
+        world.getForces().add(boat, Buoyancy(Vector(0.5, 0, 0), 0.6, 2, 1.6))
+        world.getForces().add(boat, Buoyancy(Vector(-0.51, 0, 0), 0.6, 2, 1.6))
+        return world
+
+    def update(self, duration):
+        super().update(duration)
+
+        #Wind is changed in place, the aero force keeps a reference to it
+        self.windSpeed.x = self.windSpeed.x * 0.9 + self.random.uniform(0, 100)
+        self.windSpeed.z = self.windSpeed.z * 0.9 + self.random.uniform(0, 100)
+
+
+SCENARIOS = {
+    'bridge': BridgeScenario,
+    'platform': PlatformScenario,
+    'firework': FireworkScenario,
+    'ragdoll': RagdollScenario,
+    'boxStack': BoxStackScenario,
+    'sailBoat': SailBoatScenario,
+}
+
+def measure(name, frames):
+    '''
+        Run a scenario and return its results as a dict
+        Timing and memory are measured in separate runs since tracing memory slows the interpreter
+        ---------
+        args:
+            name   - str - key of the scenario in SCENARIOS
+            frames - int - number of measured frames
+    '''
+
+    duration = 1/FREQ
+
+    #Memory allocated by building and peak memory while running
+    tracemalloc.start()
+    scenario = SCENARIOS[name]()
+    scenario.world = scenario.build()
+    buildMemory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for frame in range(MEMORY_FRAMES):
+        scenario.update(duration)
+    peakMemory = tracemalloc.get_traced_memory()[1] - buildMemory
+    tracemalloc.stop()
+
+    scenario = SCENARIOS[name]()
+    scenario.world = scenario.build()
+    for frame in range(WARMUP_FRAMES):
+        scenario.update(duration)
+
+    stats = scenario.world.setStats()
+    allocations = 0
+    contacts = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        scenario.update(duration)
+        allocations += stats.allocations
+        contacts += stats.contacts
+    elapsed = time.perf_counter() - start
+
+    #Sum of the final state shows when a change altered the simulation
+    state = scenario.world.getStateArray()
+    return {
+        'stepsPerSecond': frames / elapsed,
+        'msPerStep': elapsed / frames * 1000,
+        'physicsMsPerStep': stats.totalTime / stats.frames * 1000,
+        'phases': {phase: time * 1000 for phase, time in stats.averages().items()},
+        'contactsPerStep': contacts / frames,
+        'allocationsPerStep': allocations / frames,
+        'buildMemory': buildMemory,
+        'peakMemory': peakMemory,
+        'bodies': len(state),
+        'stateChecksum': float(np.abs(state).sum()),
+    }
+
+def report(name, result, baseline = None):
+    '''
+        Print the results of a scenario, with the change from the baseline if given
+        ---------
+        args:
+            name     - str         - name of the scenario
+            result   - dict        - results returned by measure
+            baseline - dict = None - results of the scenario in the baseline
+    '''
+
+    def change(key, value, higherIsBetter = False):
+        if baseline is None or key not in baseline or not baseline[key]: return ''
+        percent = (value - baseline[key]) / baseline[key] * 100
+        better = percent > 0 if higherIsBetter else percent < 0
+        return f' ({percent:+.1f}%{" better" if better and abs(percent) >= 5 else " worse" if abs(percent) >= 5 else ""})'
+
+    print(f'{name}: {result["bodies"]} bodies, {result["contactsPerStep"]:.1f} contacts/step')
+    print(f'    steps/sec      {result["stepsPerSecond"]:>12.1f}{change("stepsPerSecond", result["stepsPerSecond"], True)}')
+    print(f'    ms/step        {result["msPerStep"]:>12.3f}{change("msPerStep", result["msPerStep"])}')
+    phases = baseline.get('phases', {}) if baseline else {}
+    for phase, value in result['phases'].items():
+        delta = f' ({(value - phases[phase]) / phases[phase] * 100:+.1f}%)' if phases.get(phase) else ''
+        print(f'      {phase:<13}{value:>12.3f}{delta}')
+    print(f'    allocs/step    {result["allocationsPerStep"]:>12.1f}{change("allocationsPerStep", result["allocationsPerStep"])}')
+    print(f'    build memory   {result["buildMemory"]/1024:>10.1f} KiB{change("buildMemory", result["buildMemory"])}')
+    print(f'    peak memory    {result["peakMemory"]/1024:>10.1f} KiB{change("peakMemory", result["peakMemory"])}')
+    if baseline is not None and 'stateChecksum' in baseline and not math.isclose(baseline['stateChecksum'], result['stateChecksum'], rel_tol=1e-9):
+        print(f'    final state differs from baseline ({baseline["stateChecksum"]:.6g} -> {result["stateChecksum"]:.6g})')
+
+def main():
+    '''
+        Parse arguments, run the scenarios, then save or compare a baseline
+    '''
+
+    parser = argparse.ArgumentParser(description='Headless Typhoon benchmark suite')
+    parser.add_argument('-f', '--frames', type=int, default=FRAMES, help='measured frames per scenario')
+    parser.add_argument('-s', '--scenario', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS), help='scenarios to run')
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='JSON baseline to compare results with')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            data = json.load(file)
+        if data.get('version') != BASELINE_VERSION: raise SystemExit(f'{args.compare} is not a version {BASELINE_VERSION} baseline')
+        if data.get('frames') != args.frames: print(f'baseline measured {data.get("frames")} frames, this run measures {args.frames}')
+        baseline = data['scenarios']
+
+    print(f'{args.frames} frames at {FREQ} Hz after {WARMUP_FRAMES} warm up frames, phase times in ms/step')
+    results = {}
+    for name in args.scenario:
+        results[name] = measure(name, args.frames)
+        report(name, results[name], baseline.get(name))
+
+    if args.save:
+        data = {
+            'version': BASELINE_VERSION,
+            'frames': args.frames,
+            'freq': FREQ,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'scenarios': results,
+        }
+        with open(args.save, 'w') as file:
+            json.dump(data, file, indent=4)
+        print(f'baseline written to {args.save}')
+
+if __name__ == '__main__':
+    main()
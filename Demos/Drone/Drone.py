@@ -122,9 +122,8 @@ class DroneDemo():
         '''
 
         self.MAX_CONTACT = 32
-        self.contacts = []
-        self.cData = CollisionData()
-        self.cData.contactArray = self.contacts
+        self.cData = CollisionData(self.MAX_CONTACT)
+        self.contacts = self.cData.contactArray
         self.cData.friction = 1
         self.cData.restitution = 0.2
         self.cData.tolerance = 0.1
@@ -3,6 +3,7 @@ path.insert(0, '../../')
 
 from vpython import *
 from Typhoon import *
+from time import perf_counter
 
 class PlatformDemo:
     '''
@@ -156,19 +157,17 @@ class PlatformDemo:
         #Update particle mass to take into account the mass on the platform
         self.updateAdditionalMass()
 
-    def update(self):
+    def update(self, elapsed):
         '''
-            Method called to update simulation on time step
+            Method called each frame to run the time steps that fit in the elapsed wall clock time
+            ---------
+            args:
+                elapsed - double - wall clock time since last frame
         '''
 
-        #Clear accumulators
-        self.world.startFrame()
-
-        #Run the simulation
-        self.world.runPhysics(1/self.FREQ)
-
-        #update mass of platform
-        self.updateAdditionalMass()
+        #Run fixed time steps of 1/FREQ, accumulators are cleared before each
+        #Mass of platform is updated after each time step, so the physics doesn't depend on the frame rate
+        self.world.step(elapsed, lambda duration: self.updateAdditionalMass())
 
     def updateAdditionalMass(self):
         '''
@@ -222,17 +221,17 @@ class PlatformDemo:
 
     def display(self):
         '''
-            Called each time step to update simulation graphics
+            Called each frame to update simulation graphics, positions are interpolated between the last two time steps
         '''
 
         for particle in self.particleArray:
-            position = particle.particle.getPosition()
+            position = self.world.getInterpolatedPosition(particle.particle)
             particle.ball.pos = vec(position.x,position.y,position.z)
             particle.ball.visible = True
 
         for rod in self.rods:
-            p0 = rod.rod.particles[0].getPosition()
-            p1 = rod.rod.particles[1].getPosition()
+            p0 = self.world.getInterpolatedPosition(rod.rod.particles[0])
+            p1 = self.world.getInterpolatedPosition(rod.rod.particles[1])
             rod.shape.pos = vec(p0.x,p0.y,p0.z)
             rod.shape.axis =vec(p1.x-p0.x,p1.y-p0.y,p1.z-p0.z)
             
@@ -265,9 +264,13 @@ class PlatformDemo:
         '''
 
         self.graphicsSetup()
+        self.world.setTimestep(1/self.FREQ)
+        lastTime = perf_counter()
         while(True):
             rate(self.FREQ)
-            self.update()
+            currentTime = perf_counter()
+            self.update(currentTime - lastTime)
+            lastTime = currentTime
             self.display()
 
 
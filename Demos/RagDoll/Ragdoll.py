@@ -7,13 +7,11 @@ from vpython import *
 
 class Bone(CollisionBox):
     '''
-        Class acts as a collision box for the bones of the ragdoll,
-        it renders center of collision box as a sphere
+        Class acts as a collision box for the bones of the ragdoll
         ---------
         properties:
             body    - RigidBody      
             shape   - vpython.box     
-            sphere  - vpython.sphere    
     '''
 
     def __init__(self):
@@ -24,7 +22,6 @@ class Bone(CollisionBox):
         super().__init__()
         self.body = RigidBody()
         self.shape = box()
-        self.sphere = sphere()
 
     def display(self):
         '''
@@ -41,33 +38,11 @@ class Bone(CollisionBox):
         axis = axis.toVPython()
         up = up.toVPython()
 
-        self.sphere.opacity = 0.2
-        self.sphere.color = color.red
-        self.sphere.pos = pos
-        radius = self.halfSize.x + self.halfSize.x * 0.2
-        if self.halfSize.y < radius: radius = self.halfSize.y + self.halfSize.y * 0.2
-        if self.halfSize.z < radius: radius = self.halfSize.z + self.halfSize.z * 0.2
-        self.sphere.radius = radius
-
         self.shape.pos = pos
         self.shape.axis = axis
         self.shape.up = up
         self.shape.size = (self.halfSize*2).toVPython()
 
-    def getCollisionSphere(self):   
-        '''
-            Method called to get collision sphere of bone
-            collision sphere used to collide bone on bone to allow some limited interpenetration
-        '''
-
-        sphere = CollisionSphere()
-        sphere.body = self.body;
-        sphere.radius = self.halfSize.x;
-        if self.halfSize.y < sphere.radius: sphere.radius = self.halfSize.y;
-        if self.halfSize.z < sphere.radius: sphere.radius = self.halfSize.z;
-        sphere.calculateInternals();
-        return sphere
-
     def setState(self, position, extents):
         '''
             Sets the bone to a specific location
@@ -105,11 +80,13 @@ class RagdollDemo():
         ---------
         properties:
             MAX_CONTACT - int             - constant of max allowed contacts in a time step
-            contacts    - list            - all contacts in the simulation
+            contacts    - list            - pool of contacts of cData, first cData.contactCount are used
             cData       - CollisionData   - holds all collision data of the simulation
             resolver    - ContactResolver 
             bones       - list            - all bones in the simulation
             joints      - list            - all joints in the simulation
+            jointedPairs - set            - pairs of bodies linked by a joint, which don't collide with each other
+            broadPhase  - SpatialHash     - coarse collision detection between bones
 
             sailBoat            - SailBoat      - Rigidbody and its graphics
             buoyancyForceFront  - Buoyancy      - Force acting on front of boat
@@ -129,9 +106,8 @@ class RagdollDemo():
         '''
 
         self.MAX_CONTACT = 256
-        self.contacts = []
-        self.cData = CollisionData()
-        self.cData.contactArray = self.contacts
+        self.cData = CollisionData(self.MAX_CONTACT)
+        self.contacts = self.cData.contactArray
         self.resolver = ContactResolver(self.MAX_CONTACT*8,self.MAX_CONTACT*8)
 
         #Setup bones and joints
@@ -142,6 +118,11 @@ class RagdollDemo():
         for i in range(self.NUM_JOINTS):
             self.joints.append(Joint())
 
+        #Bones are only tested against bones sharing a cell with them
+        self.broadPhase = SpatialHash()
+        for bone in self.bones:
+            self.broadPhase.insert(bone)
+
         #Assign joints to self.bones
         #Right Knee
         self.joints[0].set(self.bones[0].body, Vector(0, 1.07, 0), self.bones[1].body, Vector(0, -1.07, 0), 0.15)
@@ -164,6 +145,12 @@ class RagdollDemo():
         #Left shoulder
         self.joints[10].set(self.bones[6].body, Vector(0, 0.367, 0.8), self.bones[10].body, Vector(0, 0.888, -0.32), 0.15)
 
+        #Bones linked by a joint overlap at the joint, so they aren't collided
+        self.jointedPairs = set()
+        for joint in self.joints:
+            self.jointedPairs.add((joint.body[0], joint.body[1]))
+            self.jointedPairs.add((joint.body[1], joint.body[0]))
+
         #Reset to initial position
         self.reset();
 
@@ -229,18 +216,19 @@ class RagdollDemo():
             if not self.cData.hasMoreContacts(): return
 
             CollisionDetector.boxAndHalfSpace(self.bones[i], plane, self.cData)
-            boneSphere = self.bones[i].getCollisionSphere()
 
-            #Check for collision with each others
-            for j in range(i+1, self.NUM_BONES):
-                if not self.cData.hasMoreContacts(): return
-                otherSphere = self.bones[j].getCollisionSphere()
-                CollisionDetector.sphereAndSphere(boneSphere, otherSphere, self.cData)
+        #Check for collision with each others, only for pairs found by the broad phase
+        self.broadPhase.update()
+        for potentialContact in self.broadPhase.getPotentialContacts(self.cData.contactsLeft):
+            if not self.cData.hasMoreContacts(): return
+            one, two = potentialContact.primitives
+            if (one.body, two.body) in self.jointedPairs: continue
+            CollisionDetector.boxAndBox(one, two, self.cData)
 
         #Check joint violation 
         for joint in self.joints:
             if not self.cData.hasMoreContacts(): return
-            added = joint.addContact(self.cData.contactArray, self.cData.contactsLeft)
+            added = joint.addContact(self.cData, self.cData.contactsLeft)
             self.cData.addContacts(added)
 
     def update(self,duration):
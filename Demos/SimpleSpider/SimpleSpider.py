@@ -138,11 +138,10 @@ class SimpleSpider():
     
     def __init__(self):
         self.MAX_CONTACT = 32
-        #Array of contacts
-        self.contacts = []
         #Data of collision detector
-        self.cData = CollisionData()
-        self.cData.contactArray = self.contacts
+        self.cData = CollisionData(self.MAX_CONTACT)
+        #Pool of contacts, only the first cData.contactCount are used
+        self.contacts = self.cData.contactArray
         self.resolver = ContactResolver(self.MAX_CONTACT*6,self.MAX_CONTACT*6)
         self.Registry = []
         self.forceRegistry = ForceRegistry()
@@ -249,7 +248,7 @@ class SimpleSpider():
         #Check joint violation 
         for joint in self.joints:
             if not self.cData.hasMoreContacts(): return
-            added = joint.joint.addContact(self.cData.contactArray, self.cData.contactsLeft)
+            added = joint.joint.addContact(self.cData, self.cData.contactsLeft)
             self.cData.addContacts(added)
 
     def update(self,duration):
@@ -0,0 +1,174 @@
+import os
+import numpy as np
+
+class Scenario:
+    '''
+        One independent simulation run by BatchRunner, subclass it at module level so it can be sent to
+        worker processes and override build to create the world from parameters
+        Only the scenario and its parameters are sent, the world is built inside the worker
+        ---------
+        properties:
+            parameters - object - anything picklable the subclass needs to build its world (controller gains, sail area...)
+            world      - World or ParticleWorld - built by build, None before
+        ---------
+        methods:
+            build    - create and return the world
+            update   - run one frame
+            getState - return the state array recorded for a frame
+    '''
+
+    def __init__(self, parameters = None):
+        '''
+            Class constractor
+            ---------
+            args:
+                parameters - object = None - parameters of the scenario
+        '''
+
+        self.parameters = parameters
+        self.world = None
+
+    def build(self):
+        '''
+            Create and return the world of the scenario, must be overridden
+        '''
+
+        raise NotImplementedError('Scenario subclasses must build a world')
+
+    def update(self, duration):
+        '''
+            Run one frame, override to drive controllers between frames
+            ---------
+            args:
+                duration - double - duration of the frame
+        '''
+
+        self.world.startFrame()
+        self.world.runPhysics(duration)
+
+    def getState(self, dtype):
+        '''
+            Return the state array recorded for a frame, World and ParticleWorld getStateArray by default
+            ---------
+            args:
+                dtype - numpy.dtype - type of the array
+        '''
+
+        return self.world.getStateArray(dtype)
+
+
+class BatchRunner:
+    '''
+        Runs many independent scenarios across a pool of processes, so sweeps use all cores instead of one interpreter
+        Scenarios are split in shards, each shard is run by one worker which builds the worlds, steps them and sends
+        back only their state arrays
+        ---------
+        properties:
+            workers     - int         - number of worker processes, 0 runs everything in this process
+            dtype       - numpy.dtype - type of returned state arrays
+        ---------
+        methods:
+            run         - run all scenarios and return their states in order
+            imap        - yield states of scenarios as their shards finish
+            runShard    - static, run a shard of scenarios inside a worker
+            runScenario - static, build and run one scenario
+    '''
+
+    def __init__(self, workers = None, dtype = np.float32):
+        '''
+            Class constractor
+            ---------
+            args:
+                workers - int = None            - number of worker processes, number of cores if None, 0 for no processes
+                dtype   - numpy.dtype = float32 - type of returned state arrays
+        '''
+
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.dtype = dtype
+
+    def run(self, scenarios, frames, duration, recordEvery = 1, shardSize = None):
+        '''
+            Run all scenarios and return a list of their states in the order of scenarios
+            ---------
+            args:
+                scenarios   - list   - Scenario objects
+                frames      - int    - number of frames to run each scenario
+                duration    - double - duration of a frame
+                recordEvery - int = 1    - state is recorded every recordEvery frames
+                shardSize   - int = None - scenarios sent to a worker at once, a few shards per worker if None
+        '''
+
+        results = [None] * len(scenarios)
+        for index, states in self.imap(scenarios, frames, duration, recordEvery, shardSize):
+            results[index] = states
+        return results
+
+    def imap(self, scenarios, frames, duration, recordEvery = 1, shardSize = None):
+        '''
+            Yield (index, states) of each scenario as soon as its shard finished, index is its position in scenarios
+            states is a (records, N, C) array, or a list of (N, C) arrays if the number of bodies changed during the run
+            ---------
+            args:
+                scenarios   - list   - Scenario objects
+                frames      - int    - number of frames to run each scenario
+                duration    - double - duration of a frame
+                recordEvery - int = 1    - state is recorded every recordEvery frames
+                shardSize   - int = None - scenarios sent to a worker at once, a few shards per worker if None
+        '''
+
+        indexed = list(enumerate(scenarios))
+        if not indexed: return
+
+        if self.workers == 0:
+            yield from BatchRunner.runShard(indexed, frames, duration, recordEvery, self.dtype)
+            return
+
+        #Several shards per worker balance uneven scenarios without paying process overhead per scenario
+        if shardSize is None: shardSize = max(1, -(-len(indexed) // (self.workers * 4)))
+        shards = [indexed[i:i+shardSize] for i in range(0, len(indexed), shardSize)]
+
+        #Imported on first use, the process pool machinery slows down import Typhoon
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers = min(self.workers, len(shards))) as executor:
+            futures = [executor.submit(BatchRunner.runShard, shard, frames, duration, recordEvery, self.dtype) for shard in shards]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    @staticmethod
+    def runShard(shard, frames, duration, recordEvery, dtype):
+        '''
+            Run a shard of scenarios one after the other and return a list of (index, states)
+            ---------
+            args:
+                shard       - list        - (index, Scenario) pairs
+                frames      - int         - number of frames to run each scenario
+                duration    - double      - duration of a frame
+                recordEvery - int         - state is recorded every recordEvery frames
+                dtype       - numpy.dtype - type of state arrays
+        '''
+
+        return [(index, BatchRunner.runScenario(scenario, frames, duration, recordEvery, dtype)) for index, scenario in shard]
+
+    @staticmethod
+    def runScenario(scenario, frames, duration, recordEvery, dtype):
+        '''
+            Build a scenario, run it for frames and return its recorded states
+            ---------
+            args:
+                scenario    - Scenario    - scenario to run
+                frames      - int         - number of frames to run
+                duration    - double      - duration of a frame
+                recordEvery - int         - state is recorded every recordEvery frames
+                dtype       - numpy.dtype - type of state arrays
+        '''
+
+        scenario.world = scenario.build()
+
+        states = []
+        for frame in range(1, frames + 1):
+            scenario.update(duration)
+            if frame % recordEvery == 0: states.append(scenario.getState(dtype))
+
+        if not states: return np.empty((0, 0, 0), dtype=dtype)
+        if all(state.shape == states[0].shape for state in states): return np.stack(states)
+        return states
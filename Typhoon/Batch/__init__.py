@@ -0,0 +1,2 @@
+from Typhoon.Batch.BatchRunner import Scenario
+from Typhoon.Batch.BatchRunner import BatchRunner
\ No newline at end of file
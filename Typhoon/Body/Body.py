@@ -7,7 +7,7 @@ class RigidBody:
         properties:
             inverseMass                 - double     - Holds inverse mass of the rigid body
             inverseInertiaTensor        - Matrix3    - Holds inverse of the body inertia in body space
-            damping                     - double     - Holds the amount of damping applied to the linear motion
+            linearDamping               - double     - Holds the amount of damping applied to the linear motion
             angularDamping              - double     - Holds the amount of damping applied to the angular motion
             position                    - Vector     - Holds the position of the center of mass of the rigid body in world space
             orientation                 - Quaternion - Holds the angular orientation of the rigid body in world space
@@ -33,13 +33,21 @@ class RigidBody:
             getPointInWorldSpace     - transform a point from local space to world space
             getDirectionInLocalSpace - transform a direction from world space to local space
             getDirectionInWorldSpace - transform a direction from local space to world space
+            get...sIn...Space        - transform a Vector3Array of points or directions between local and world space
             addForce                 - add force to the forceAccum in this time step (no torque)
             addForceAtBodyPoint      - add force to act on a point in body space (it causes torque)
             addForceAtPoint          - add force to act on a point in world space (it causes torque)
             addTorque                - add torque to the torqueAccum in this time step (no torque
-
+            addImpulse               - change velocity instantly by an impulse (no torque)
+            addImpulseAtPoint        - change velocity and rotation instantly by an impulse at a point in world space
+            setAwake                 - wake the body up or put it to sleep, forces and impulses wake the body up
+            get...View               - return the body's own vector or matrix without copying, callers must not modify it
 
     '''
+
+    #Scratch vectors shared by all bodies, only used within one method call so integration and forces don't allocate
+    scratch = (Vector(), Vector())
+
     def __init__(self):
         '''
             Class constractor
@@ -48,7 +56,7 @@ class RigidBody:
         #charactaristic properties
         self.inverseMass = 0
         self.inverseInertiaTensor = Matrix3()
-        self.damping = 1
+        self.linearDamping = 1
         self.angularDamping = 1
 
         #state properties
@@ -59,7 +67,8 @@ class RigidBody:
 
         #Derived data (holds data drieved from above data)
         self.inverseInertiaTensorWorld = Matrix3()
-        self.motion = 0
+        #Bodies start with some motion so they don't sleep before they start moving
+        self.motion = SLEEP_EPSILON*2
         self.isAwake = True
         self.canSleep = False
         self.transformMatrix = Matrix4()
@@ -145,12 +154,12 @@ class RigidBody:
         if not self.isAwake: return
 
         #Calculate linear acceleration from forceAccum
-        self.lastFrameAcceleration = self.getAcceleration()
+        self.acceleration.copyInto(self.lastFrameAcceleration)
         self.lastFrameAcceleration.addScaledVector(self.forceAccum,self.inverseMass)
         
         #Calculate angular acceleration from torqueAccum
         #AngularAcceleration = InertiaInverse * tourque
-        angularAcceleration = self.inverseInertiaTensorWorld.transform(self.torqueAccum)
+        angularAcceleration = self.inverseInertiaTensorWorld.transformInto(self.torqueAccum, RigidBody.scratch[0])
 
         #Adjust linear velocity
         self.velocity.addScaledVector(self.lastFrameAcceleration,duration)
@@ -176,15 +185,15 @@ class RigidBody:
 
         #Update kinetic energy stored as well as put body to sleep
         if(self.canSleep):
-            currentMotion = velocity.scalarProduct(velocity) + rotation.scalarProduct(rotation)
+            currentMotion = self.velocity.scalarProduct(self.velocity) + self.rotation.scalarProduct(self.rotation)
             bias = 0.5**duration
 
             self.motion = bias*self.motion + (1-bias)*currentMotion
 
-            if motion < SLEEP_EPSILON:
-                self.setAwake(Fasle)
-            elif motion > 10*SLEEP_EPSILON:
-                motion = 10*SLEEP_EPSILON
+            if self.motion < SLEEP_EPSILON:
+                self.setAwake(False)
+            elif self.motion > 10*SLEEP_EPSILON:
+                self.motion = 10*SLEEP_EPSILON
 
     ####SETTERS AND GETTERS
 
@@ -268,7 +277,8 @@ class RigidBody:
         return inertiaTensorWorld
 
     def setInverseInertiaTensor(self, inverseInertiaTensor):
-        self.inverseInertiaTensor = inverseInertiaTensor
+        #Copied into the body's own matrix, World.restore writes into it in place
+        inverseInertiaTensor.copyInto(self.inverseInertiaTensor)
 
 
     def getInverseInertiaTensor(self):
@@ -282,6 +292,32 @@ class RigidBody:
         return self.transformMatrix.copy() 
 
 
+    ####Zero copy accessors, they return the body's own objects which change as it moves
+    ####Callers must treat them as read only, use the copying getters to keep a value
+    def getPositionView(self):
+        return self.position
+
+    def getOrientationView(self):
+        return self.orientation
+
+    def getVelocityView(self):
+        return self.velocity
+
+    def getRotationView(self):
+        return self.rotation
+
+    def getAccelerationView(self):
+        return self.acceleration
+
+    def getLastFrameAccelerationView(self):
+        return self.lastFrameAcceleration
+
+    def getInverseInertiaTensorWorldView(self):
+        return self.inverseInertiaTensorWorld
+
+    def getTransformView(self):
+        return self.transformMatrix
+
     def setDamping(self, linearDamping, angularDamping):
         self.linearDamping = linearDamping
         self.angularDamping = angularDamping
@@ -405,26 +441,52 @@ class RigidBody:
     def getDirectionInWorldSpace(self, direction):
         return self.transformMatrix.transformDirection(direction)
 
-    ####Adding Force and torque 
+    ####Batch versions of the space conversions, they take and return Vector3Array
+    def getPointsInLocalSpace(self, points, out = None):
+        return self.transformMatrix.transformInverseArray(points, out)
+
+    def getPointsInWorldSpace(self, points, out = None):
+        return self.transformMatrix.transformArray(points, out)
+
+    def getDirectionsInLocalSpace(self, directions, out = None):
+        return self.transformMatrix.transformInverseDirectionArray(directions, out)
+
+    def getDirectionsInWorldSpace(self, directions, out = None):
+        return self.transformMatrix.transformDirectionArray(directions, out)
+
+    ####Adding Force, torque and impulse, all of them wake the body up
     def addForce(self, force):
         self.forceAccum += force;
-        self.isAwake = True;
+        if not self.isAwake: self.setAwake()
 
     def addForceAtBodyPoint(self, force, point):
         #Convert to coordinates relative to center of mass
-        pt = self.getPointInWorldSpace(point)
+        pt = self.transformMatrix.transformInto(point, RigidBody.scratch[0])
         self.addForceAtPoint(force, pt)
 
     def addForceAtPoint(self, force, point):
         #Convert to coordinates relative to center of mass.
-        pt = Vector(point.x,point.y,point.z)
-        pt -= self.position
+        pt = point.subInto(self.position, RigidBody.scratch[1])
 
         self.forceAccum += force
-        self.torqueAccum += pt % force
+        self.torqueAccum += pt.vectorProductInto(force, pt)
 
-        self.isAwaWke = True
+        if not self.isAwake: self.setAwake()
 
     def addTorque(self, torque):
         self.torqueAccum += torque
-        self.isAwake = true
\ No newline at end of file
+        if not self.isAwake: self.setAwake()
+
+    def addImpulse(self, impulse):
+        #Instant change of linear momentum
+        self.velocity.addScaledVector(impulse, self.inverseMass)
+        if not self.isAwake: self.setAwake()
+
+    def addImpulseAtPoint(self, impulse, point):
+        #Convert to coordinates relative to center of mass
+        pt = point.subInto(self.position, RigidBody.scratch[0])
+
+        self.velocity.addScaledVector(impulse, self.inverseMass)
+        self.rotation += self.inverseInertiaTensorWorld.transformInto(pt.vectorProductInto(impulse, pt), pt)
+
+        if not self.isAwake: self.setAwake()
\ No newline at end of file
@@ -0,0 +1,353 @@
+from Typhoon.Core import *
+import numpy as np
+
+class RigidBodyBatch:
+    '''
+        Array store of many rigid bodies which integrates them and calculates their derived data
+        in a few vectorized passes instead of body by body
+        It can be used on its own by writing the arrays directly, or loaded from and stored to RigidBody objects
+        ---------
+        properties:
+            capacity                    - int           - number of rows allocated
+            count                       - int           - number of rows used
+            bodies                      - list          - RigidBody bound to each row (None for array only rows)
+            inverseMass                 - numpy.ndarray - (N,)     inverse masses
+            linearDamping               - numpy.ndarray - (N,)     linear damping
+            angularDamping              - numpy.ndarray - (N,)     angular damping
+            position                    - numpy.ndarray - (N,3)    positions of center of mass
+            orientation                 - numpy.ndarray - (N,4)    orientations as quaternions r, i, j, k
+            velocity                    - numpy.ndarray - (N,3)    linear velocities
+            rotation                    - numpy.ndarray - (N,3)    angular velocities
+            acceleration                - numpy.ndarray - (N,3)    constant linear accelerations
+            lastFrameAcceleration       - numpy.ndarray - (N,3)    linear accelerations of last frame
+            forceAccum                  - numpy.ndarray - (N,3)    accumulated forces
+            torqueAccum                 - numpy.ndarray - (N,3)    accumulated torques
+            inverseInertiaTensor        - numpy.ndarray - (N,3,3)  inverse inertia tensors in body space
+            inverseInertiaTensorWorld   - numpy.ndarray - (N,3,3)  inverse inertia tensors in world space
+            transformMatrix             - numpy.ndarray - (N,3,4)  transform matrices, same layout as Matrix4.data
+            isAwake                     - numpy.ndarray - (N,)     awake flags, sleeping bodies are not integrated
+            canSleep                    - numpy.ndarray - (N,)     flags of bodies which can sleep
+            motion                      - numpy.ndarray - (N,)     recency weighted motion, bodies which can sleep sleep when it's under SLEEP_EPSILON
+            integrated                  - numpy.ndarray - (N,)     flags of rows integrated in the last integrate, they are stored back
+        ---------
+        methods:
+            add                     - add a row, optionally filled from a RigidBody
+            clear                   - remove all rows
+            loadBodies              - make the batch hold the state of the given bodies
+            loadState               - reload the per frame state of the bound bodies
+            storeBodies             - write state of integrated rows back into their bodies
+            integrate               - integrate all awake bodies and put bodies which stopped moving to sleep
+            calculateDerivedData    - calculate transform matrices and world inertia tensors of all bodies
+            calculateTransforms     - static, build transform matrices from positions and unit quaternions
+    '''
+
+    def __init__(self, capacity=64):
+        '''
+            Class constractor
+            ---------
+            args:
+                capacity - int = 64 - initial number of rows, grows when needed
+        '''
+
+        self.capacity = 0
+        self.count = 0
+        self.bodies = []
+        self.allocate(max(1, capacity))
+
+    def allocate(self, capacity):
+        '''
+            Allocate arrays of a given capacity, copying the used rows
+            ---------
+            args:
+                capacity - int - number of rows
+        '''
+
+        arrays = {
+            'inverseMass': np.zeros(capacity),
+            'linearDamping': np.ones(capacity),
+            'angularDamping': np.ones(capacity),
+            'position': np.zeros((capacity, 3)),
+            'orientation': np.zeros((capacity, 4)),
+            'velocity': np.zeros((capacity, 3)),
+            'rotation': np.zeros((capacity, 3)),
+            'acceleration': np.zeros((capacity, 3)),
+            'lastFrameAcceleration': np.zeros((capacity, 3)),
+            'forceAccum': np.zeros((capacity, 3)),
+            'torqueAccum': np.zeros((capacity, 3)),
+            'inverseInertiaTensor': np.zeros((capacity, 3, 3)),
+            'inverseInertiaTensorWorld': np.zeros((capacity, 3, 3)),
+            'transformMatrix': np.zeros((capacity, 3, 4)),
+            'isAwake': np.ones(capacity, dtype=bool),
+            'canSleep': np.zeros(capacity, dtype=bool),
+            'motion': np.zeros(capacity),
+            'integrated': np.zeros(capacity, dtype=bool),
+        }
+        arrays['orientation'][:, 0] = 1
+
+        n = self.count
+        for name, array in arrays.items():
+            if n: array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def add(self, body=None):
+        '''
+            Add a row to the batch and return its index
+            ---------
+            args:
+                body - RigidBody = None - body to read the state from and to store the state to
+        '''
+
+        if self.count == self.capacity: self.allocate(self.capacity*2)
+
+        index = self.count
+        self.count += 1
+        self.bodies.append(body)
+        if body is not None: self.loadBody(index, body)
+        return index
+
+    def clear(self):
+        '''
+            Remove all rows
+        '''
+
+        self.count = 0
+        self.bodies.clear()
+
+    def loadBody(self, index, body):
+        '''
+            Copy the state of a body into a row
+            ---------
+            args:
+                index - int       - row index
+                body  - RigidBody
+        '''
+
+        self.inverseMass[index] = body.inverseMass
+        self.linearDamping[index] = body.linearDamping
+        self.angularDamping[index] = body.angularDamping
+        self.position[index] = (body.position.x, body.position.y, body.position.z)
+        self.orientation[index] = (body.orientation.r, body.orientation.i, body.orientation.j, body.orientation.k)
+        self.velocity[index] = (body.velocity.x, body.velocity.y, body.velocity.z)
+        self.rotation[index] = (body.rotation.x, body.rotation.y, body.rotation.z)
+        self.acceleration[index] = (body.acceleration.x, body.acceleration.y, body.acceleration.z)
+        self.forceAccum[index] = (body.forceAccum.x, body.forceAccum.y, body.forceAccum.z)
+        self.torqueAccum[index] = (body.torqueAccum.x, body.torqueAccum.y, body.torqueAccum.z)
+        self.inverseInertiaTensor[index].flat = body.inverseInertiaTensor.data
+        self.inverseInertiaTensorWorld[index].flat = body.inverseInertiaTensorWorld.data
+        self.transformMatrix[index].flat = body.transformMatrix.data
+        self.isAwake[index] = body.isAwake
+        self.canSleep[index] = body.canSleep
+        self.motion[index] = body.motion
+
+    def loadBodies(self, bodies):
+        '''
+            Make the batch hold exactly the state of the given bodies
+            The state is gathered column by column which is much cheaper than loading body by body
+            ---------
+            args:
+                bodies - list - list of RigidBody
+        '''
+
+        n = len(bodies)
+        self.clear()
+        if n > self.capacity: self.allocate(max(n, self.capacity*2))
+        self.count = n
+        self.bodies.extend(bodies)
+        if n == 0: return
+
+        self.inverseMass[:n] = [body.inverseMass for body in bodies]
+        self.linearDamping[:n] = [body.linearDamping for body in bodies]
+        self.angularDamping[:n] = [body.angularDamping for body in bodies]
+        self.acceleration[:n] = [(body.acceleration.x, body.acceleration.y, body.acceleration.z) for body in bodies]
+        self.inverseInertiaTensor[:n] = np.reshape([body.inverseInertiaTensor.data for body in bodies], (n, 3, 3))
+        self.inverseInertiaTensorWorld[:n] = np.reshape([body.inverseInertiaTensorWorld.data for body in bodies], (n, 3, 3))
+        self.transformMatrix[:n] = np.reshape([body.transformMatrix.data for body in bodies], (n, 3, 4))
+        self.canSleep[:n] = [body.canSleep for body in bodies]
+        self.loadState()
+
+    def loadState(self):
+        '''
+            Reload the state that changes every frame (position, orientation, velocities, accumulators, awake flag and motion)
+            from the bound bodies, mass, damping, inertia and canSleep are kept from the last loadBodies
+        '''
+
+        n = self.count
+        bodies = self.bodies
+        if n == 0: return
+
+        self.position[:n] = [(body.position.x, body.position.y, body.position.z) for body in bodies]
+        self.orientation[:n] = [(body.orientation.r, body.orientation.i, body.orientation.j, body.orientation.k) for body in bodies]
+        self.velocity[:n] = [(body.velocity.x, body.velocity.y, body.velocity.z) for body in bodies]
+        self.rotation[:n] = [(body.rotation.x, body.rotation.y, body.rotation.z) for body in bodies]
+        self.forceAccum[:n] = [(body.forceAccum.x, body.forceAccum.y, body.forceAccum.z) for body in bodies]
+        self.torqueAccum[:n] = [(body.torqueAccum.x, body.torqueAccum.y, body.torqueAccum.z) for body in bodies]
+        self.isAwake[:n] = [body.isAwake for body in bodies]
+        self.motion[:n] = [body.motion for body in bodies]
+
+    def storeBodies(self):
+        '''
+            Write the state of rows integrated in the last integrate back into their bodies and clear their accumulators,
+            bodies which fell asleep are put to sleep, rows without a body are skipped
+        '''
+
+        n = self.count
+        if n == 0: return
+        position = self.position[:n].tolist()
+        orientation = self.orientation[:n].tolist()
+        velocity = self.velocity[:n].tolist()
+        rotation = self.rotation[:n].tolist()
+        lastFrameAcceleration = self.lastFrameAcceleration[:n].tolist()
+        inverseInertiaTensorWorld = self.inverseInertiaTensorWorld[:n].reshape(n, 9).tolist()
+        transformMatrix = self.transformMatrix[:n].reshape(n, 12).tolist()
+        isAwake = self.isAwake[:n].tolist()
+        motion = self.motion[:n].tolist()
+        integrated = self.integrated[:n].tolist()
+
+        for index, body in enumerate(self.bodies):
+            #Sleeping bodies were not integrated
+            if body is None or not integrated[index]: continue
+            v = body.position
+            v.x, v.y, v.z = position[index]
+            q = body.orientation
+            q.r, q.i, q.j, q.k = orientation[index]
+            v = body.velocity
+            v.x, v.y, v.z = velocity[index]
+            v = body.rotation
+            v.x, v.y, v.z = rotation[index]
+            v = body.lastFrameAcceleration
+            v.x, v.y, v.z = lastFrameAcceleration[index]
+            body.inverseInertiaTensorWorld.data[:] = inverseInertiaTensorWorld[index]
+            body.transformMatrix.data[:] = transformMatrix[index]
+            body.forceAccum.clear()
+            body.torqueAccum.clear()
+            body.motion = motion[index]
+            if not isAwake[index]: body.setAwake(False)
+
+    def integrate(self, duration):
+        '''
+            Integrate all awake bodies, same as RigidBody.integrate
+            ---------
+            args:
+                duration - double - duration of time step
+        '''
+
+        n = self.count
+        if n == 0: return
+
+        awake = self.isAwake[:n]
+        self.integrated[:n] = awake
+        if awake.all(): rows = slice(0, n)
+        else: rows = np.flatnonzero(awake)
+
+        inverseMass = self.inverseMass[rows]
+        velocity = self.velocity[rows]
+        rotation = self.rotation[rows]
+        orientation = self.orientation[rows]
+
+        #Linear acceleration from forceAccum
+        lastFrameAcceleration = self.acceleration[rows] + self.forceAccum[rows] * inverseMass[:, None]
+
+        #AngularAcceleration = InertiaInverse * tourque
+        angularAcceleration = np.einsum('nij,nj->ni', self.inverseInertiaTensorWorld[rows], self.torqueAccum[rows])
+
+        #Adjust velocities and apply drag
+        velocity += lastFrameAcceleration * duration
+        rotation += angularAcceleration * duration
+        velocity *= (self.linearDamping[rows] ** duration)[:, None]
+        rotation *= (self.angularDamping[rows] ** duration)[:, None]
+
+        #Adjust position
+        position = self.position[rows] + velocity * duration
+
+        #Adjust orientation, q += 0.5 * (0, w*t) * q
+        w = rotation * duration
+        r, i, j, k = orientation[:, 0], orientation[:, 1], orientation[:, 2], orientation[:, 3]
+        x, y, z = w[:, 0], w[:, 1], w[:, 2]
+        spin = np.stack((
+            - x*i - y*j - z*k,
+              x*r + y*k - z*j,
+              y*r + z*i - x*k,
+              z*r + x*j - y*i), axis=1)
+        orientation += spin * 0.5
+
+        self.lastFrameAcceleration[rows] = lastFrameAcceleration
+        self.velocity[rows] = velocity
+        self.rotation[rows] = rotation
+        self.position[rows] = position
+        self.orientation[rows] = orientation
+
+        #Normalize oriantation, update transform matrix and inertia tensor in world space
+        self.calculateDerivedData(rows)
+
+        #Clear all accumulators
+        self.forceAccum[rows] = 0
+        self.torqueAccum[rows] = 0
+
+        #Update kinetic energy stored as well as put bodies to sleep
+        canSleep = self.canSleep[rows]
+        if canSleep.any():
+            indices = np.arange(n)[rows][canSleep]
+            velocity = self.velocity[indices]
+            rotation = self.rotation[indices]
+            currentMotion = np.einsum('ni,ni->n', velocity, velocity) + np.einsum('ni,ni->n', rotation, rotation)
+            bias = 0.5**duration
+
+            motion = bias*self.motion[indices] + (1-bias)*currentMotion
+            asleep = indices[motion < SLEEP_EPSILON]
+            self.isAwake[asleep] = False
+            self.velocity[asleep] = 0
+            self.rotation[asleep] = 0
+            self.motion[indices] = np.minimum(motion, 10*SLEEP_EPSILON)
+
+    def calculateDerivedData(self, rows=None):
+        '''
+            Normalize orientations then calculate transform matrices and inverse inertia tensors in world space
+            ---------
+            args:
+                rows - slice or numpy.ndarray = None - rows to update, all used rows if None
+        '''
+
+        if rows is None: rows = slice(0, self.count)
+
+        #Normalize quaternions, zero length ones are reset to no rotation
+        orientation = self.orientation[rows]
+        d = np.einsum('ni,ni->n', orientation, orientation)
+        small = d < REAL_EPSILON
+        if small.any():
+            orientation[small] = (1, 0, 0, 0)
+            d[small] = 1
+        orientation /= np.sqrt(d)[:, None]
+        self.orientation[rows] = orientation
+
+        transform = RigidBodyBatch.calculateTransforms(self.position[rows], orientation)
+        self.transformMatrix[rows] = transform
+        rotationMatrix = transform[:, :, :3]
+
+        #Inertia tensor in world space R * I^-1 * R^T
+        self.inverseInertiaTensorWorld[rows] = rotationMatrix @ self.inverseInertiaTensor[rows] @ rotationMatrix.transpose(0, 2, 1)
+
+    @staticmethod
+    def calculateTransforms(position, orientation):
+        '''
+            Build (N,3,4) transform matrices, same layout as Matrix4.data, from positions and unit quaternions
+            ---------
+            args:
+                position    - numpy.ndarray - (N,3) positions
+                orientation - numpy.ndarray - (N,4) unit quaternions r, i, j, k
+        '''
+
+        r, i, j, k = orientation[:, 0], orientation[:, 1], orientation[:, 2], orientation[:, 3]
+
+        transform = np.empty((len(r), 3, 4))
+        transform[:, 0, 0] = 1 - 2*j*j - 2*k*k
+        transform[:, 0, 1] = 2*i*j - 2*r*k
+        transform[:, 0, 2] = 2*i*k + 2*r*j
+        transform[:, 1, 0] = 2*i*j + 2*r*k
+        transform[:, 1, 1] = 1 - 2*i*i - 2*k*k
+        transform[:, 1, 2] = 2*j*k - 2*r*i
+        transform[:, 2, 0] = 2*i*k - 2*r*j
+        transform[:, 2, 1] = 2*j*k + 2*r*i
+        transform[:, 2, 2] = 1 - 2*i*i - 2*j*j
+        transform[:, :, 3] = position
+        return transform
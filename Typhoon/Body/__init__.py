@@ -1 +1,2 @@
-from Typhoon.Body.Body import RigidBody
\ No newline at end of file
+from Typhoon.Body.Body import RigidBody
+from Typhoon.Body.BodyBatch import RigidBodyBatch
@@ -0,0 +1,239 @@
+from Typhoon.Core import *
+from Typhoon.Contact.FineCollision import CollisionBox, CollisionSphere, CollisionData
+import numpy as np
+
+#Signs of the half-sizes of each vertex, in the same order as CollisionDetector.boxAndHalfSpace
+BOX_VERTICES = np.array([[1,1,1],[-1,1,1],[1,-1,1],[-1,-1,1], [1,1,-1],[-1,1,-1],[1,-1,-1],[-1,-1,-1]], dtype=float)
+
+class BatchCollisionDetector:
+    '''
+        Collides many boxes and spheres with many planes in a few NumPy passes instead of
+        calling CollisionDetector.boxAndHalfSpace and sphereAndHalfSpace for each pair
+        Only penetrating vertices and spheres are written into the contact pool, contacts are the same
+        as the ones of CollisionDetector and written plane by plane, boxes first
+        Transforms use the layout of Matrix4.data, (N,3,4) rows of rotation and position, as RigidBodyBatch.transformMatrix
+        ---------
+        methods:
+            planeArrays             - return (K,3) directions and (K,) offsets of a list of planes
+            boxArrays               - return (N,3,4) transforms and (N,3) half-sizes of a list of boxes
+            sphereArrays            - return (N,3) centres and (N,) radii of a list of spheres
+            boxVertexDistances      - return world vertices of boxes and their distances to planes
+            boxesAndHalfSpaces      - create contacts between boxes and planes
+            fillBoxContacts         - write contacts of vertices behind a plane
+            spheresAndHalfSpaces    - create contacts between spheres and planes
+            fillSphereContacts      - write contacts of spheres behind a plane
+            collideHalfSpaces       - create contacts between a list of primitives and a list of planes
+    '''
+
+    @staticmethod
+    def planeArrays(planes):
+        '''
+            Return (K,3) directions and (K,) offsets of a list of planes
+            ---------
+            args:
+                planes - list - list of CollisionPlane
+        '''
+
+        directions = np.array([(plane.direction.x, plane.direction.y, plane.direction.z) for plane in planes], dtype=float).reshape(-1, 3)
+        offsets = np.array([plane.offset for plane in planes], dtype=float)
+        return directions, offsets
+
+    @staticmethod
+    def boxArrays(boxes):
+        '''
+            Return (N,3,4) transforms and (N,3) half-sizes of a list of boxes, their transforms have to be calculated
+            ---------
+            args:
+                boxes - list - list of CollisionBox
+        '''
+
+        transforms = np.array([box.transform.data for box in boxes], dtype=float).reshape(-1, 3, 4)
+        halfSizes = np.array([(box.halfSize.x, box.halfSize.y, box.halfSize.z) for box in boxes], dtype=float).reshape(-1, 3)
+        return transforms, halfSizes
+
+    @staticmethod
+    def sphereArrays(spheres):
+        '''
+            Return (N,3) centres and (N,) radii of a list of spheres, their transforms have to be calculated
+            ---------
+            args:
+                spheres - list - list of CollisionSphere
+        '''
+
+        centres = np.array([sphere.transform.data[3::4] for sphere in spheres], dtype=float).reshape(-1, 3)
+        radii = np.array([sphere.radius for sphere in spheres], dtype=float)
+        return centres, radii
+
+    @staticmethod
+    def boxVertexDistances(transforms, halfSizes, directions):
+        '''
+            Return (N,8,3) world positions of vertices of boxes and (K,N,8) their distances along plane directions
+            ---------
+            args:
+                transforms - numpy.ndarray - (N,3,4) transforms of the boxes
+                halfSizes  - numpy.ndarray - (N,3)   half-sizes of the boxes
+                directions - numpy.ndarray - (K,3)   plane directions
+        '''
+
+        local = BOX_VERTICES[None, :, :] * halfSizes[:, None, :]
+        vertices = np.einsum('nij,nvj->nvi', transforms[:, :, :3], local) + transforms[:, None, :, 3]
+        distances = np.einsum('kj,nvj->knv', directions, vertices)
+        return vertices, distances
+
+    @staticmethod
+    def boxesAndHalfSpaces(transforms, halfSizes, directions, offsets, bodies, normals, data: CollisionData):
+        '''
+            create contacts between boxes and planes, one for each vertex behind a plane
+            return number of contacts used
+            ---------
+            args:
+                transforms - numpy.ndarray - (N,3,4) transforms of the boxes
+                halfSizes  - numpy.ndarray - (N,3)   half-sizes of the boxes
+                directions - numpy.ndarray - (K,3)   plane directions
+                offsets    - numpy.ndarray - (K,)    plane offsets
+                bodies     - list          - body of each box
+                normals    - list          - Vector direction of each plane, used as contact normal
+                data       - CollisionData
+        '''
+
+        if data.contactsLeft <= 0 or len(transforms) == 0 or len(directions) == 0: return 0
+        vertices, distances = BatchCollisionDetector.boxVertexDistances(transforms, halfSizes, directions)
+
+        contactsUsed = 0
+        for plane in range(len(directions)):
+            contactsUsed += BatchCollisionDetector.fillBoxContacts(vertices, distances[plane], directions[plane], offsets[plane], bodies, normals[plane], data)
+            if data.contactsLeft <= 0: break
+        return contactsUsed
+
+    @staticmethod
+    def fillBoxContacts(vertices, distances, direction, offset, bodies, normal, data: CollisionData):
+        '''
+            Write contacts of vertices behind a plane
+            return number of contacts used
+            ---------
+            args:
+                vertices  - numpy.ndarray - (N,8,3) world positions of vertices of the boxes
+                distances - numpy.ndarray - (N,8)   distances of vertices along the plane direction
+                direction - numpy.ndarray - (3,)    plane direction
+                offset    - double        - plane offset
+                bodies    - list          - body of each box
+                normal    - Vector        - plane direction, used as contact normal
+                data      - CollisionData
+        '''
+
+        boxIndex, vertexIndex = np.nonzero(distances <= offset)
+        count = min(len(boxIndex), data.contactsLeft)
+        if count == 0: return 0
+        boxIndex, vertexIndex = boxIndex[:count], vertexIndex[:count]
+
+        #The contact point is placed as in CollisionDetector.boxAndHalfSpace
+        penetration = offset - distances[boxIndex, vertexIndex]
+        points = vertices[boxIndex, vertexIndex] - direction * penetration[:, None]
+
+        for index, (body, feature, point, depth) in enumerate(zip([bodies[i] for i in boxIndex.tolist()], vertexIndex.tolist(), points.tolist(), penetration.tolist())):
+            contact = data.getContact(index)
+            contact.contactPoint = Vector(*point)
+            contact.contactNormal = normal
+            contact.penetration = depth
+            contact.setBodyData(body, None, data.friction, data.restitution)
+            contact.feature = feature
+
+        data.addContacts(count)
+        return count
+
+    @staticmethod
+    def spheresAndHalfSpaces(centres, radii, directions, offsets, bodies, normals, data: CollisionData):
+        '''
+            create contacts between spheres and planes, one for each sphere behind a plane
+            return number of contacts used
+            ---------
+            args:
+                centres    - numpy.ndarray - (N,3) centres of the spheres
+                radii      - numpy.ndarray - (N,)  radii of the spheres
+                directions - numpy.ndarray - (K,3) plane directions
+                offsets    - numpy.ndarray - (K,)  plane offsets
+                bodies     - list          - body of each sphere
+                normals    - list          - Vector direction of each plane, used as contact normal
+                data       - CollisionData
+        '''
+
+        if data.contactsLeft <= 0 or len(centres) == 0 or len(directions) == 0: return 0
+        distances = directions @ centres.T - radii[None, :] - offsets[:, None]
+
+        contactsUsed = 0
+        for plane in range(len(directions)):
+            contactsUsed += BatchCollisionDetector.fillSphereContacts(centres, radii, distances[plane], directions[plane], bodies, normals[plane], data)
+            if data.contactsLeft <= 0: break
+        return contactsUsed
+
+    @staticmethod
+    def fillSphereContacts(centres, radii, distances, direction, bodies, normal, data: CollisionData):
+        '''
+            Write contacts of spheres behind a plane
+            return number of contacts used
+            ---------
+            args:
+                centres   - numpy.ndarray - (N,3) centres of the spheres
+                radii     - numpy.ndarray - (N,)  radii of the spheres
+                distances - numpy.ndarray - (N,)  distances of the spheres from the plane, negative if penetrating
+                direction - numpy.ndarray - (3,)  plane direction
+                bodies    - list          - body of each sphere
+                normal    - Vector        - plane direction, used as contact normal
+                data      - CollisionData
+        '''
+
+        sphereIndex = np.flatnonzero(distances < 0)[:data.contactsLeft]
+        count = len(sphereIndex)
+        if count == 0: return 0
+
+        #The contact point is on the plane below the centre
+        distance = distances[sphereIndex]
+        points = centres[sphereIndex] - direction * (distance + radii[sphereIndex])[:, None]
+
+        for index, (body, point, depth) in enumerate(zip([bodies[i] for i in sphereIndex.tolist()], points.tolist(), (-distance).tolist())):
+            contact = data.getContact(index)
+            contact.contactPoint = Vector(*point)
+            contact.contactNormal = normal
+            contact.penetration = depth
+            contact.setBodyData(body, None, data.friction, data.restitution)
+            contact.feature = 0
+
+        data.addContacts(count)
+        return count
+
+    @staticmethod
+    def collideHalfSpaces(primitives, planes, data: CollisionData):
+        '''
+            create contacts between a list of primitives and a list of planes, their transforms have to be calculated
+            For each plane boxes are collided first then spheres
+            return number of contacts used
+            ---------
+            args:
+                primitives - list - list of CollisionPrimitive, primitives other than boxes and spheres are skipped
+                planes     - list - list of CollisionPlane
+                data       - CollisionData
+        '''
+
+        if data.contactsLeft <= 0 or not planes: return 0
+
+        boxes = [primitive for primitive in primitives if isinstance(primitive, CollisionBox)]
+        spheres = [primitive for primitive in primitives if isinstance(primitive, CollisionSphere)]
+        directions, offsets = BatchCollisionDetector.planeArrays(planes)
+        normals = [plane.direction for plane in planes]
+
+        if boxes:
+            transforms, halfSizes = BatchCollisionDetector.boxArrays(boxes)
+            vertices, boxDistances = BatchCollisionDetector.boxVertexDistances(transforms, halfSizes, directions)
+            boxBodies = [box.body for box in boxes]
+        if spheres:
+            centres, radii = BatchCollisionDetector.sphereArrays(spheres)
+            sphereDistances = directions @ centres.T - radii[None, :] - offsets[:, None]
+            sphereBodies = [sphere.body for sphere in spheres]
+
+        contactsUsed = 0
+        for plane in range(len(planes)):
+            if boxes and data.contactsLeft > 0:
+                contactsUsed += BatchCollisionDetector.fillBoxContacts(vertices, boxDistances[plane], directions[plane], offsets[plane], boxBodies, normals[plane], data)
+            if spheres and data.contactsLeft > 0:
+                contactsUsed += BatchCollisionDetector.fillSphereContacts(centres, radii, sphereDistances[plane], directions[plane], sphereBodies, normals[plane], data)
+        return contactsUsed
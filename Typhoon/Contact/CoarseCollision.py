@@ -0,0 +1,831 @@
+from Typhoon.Core import *
+from abc import ABC, abstractmethod
+from math import floor
+
+class BoundingSphere:
+    '''
+        Class represents a bounding sphere used in coarse collision detection
+        ---------
+        properties:
+            center - Vector - center of the sphere in world space
+            radius - double - radius of the sphere
+        ---------
+        methods:
+            fromPrimitive - Return a bounding sphere enclosing a collision primitive
+            combine       - Return a bounding sphere enclosing two bounding spheres
+            overlaps      - Return true if this sphere overlaps another sphere
+            encloses      - Return true if this sphere fully contains another sphere
+            getGrowth     - Return how much this sphere would grow to enclose another sphere
+            getSize       - Return a value proportional to the volume of the sphere
+    '''
+
+    def __init__(self, center, radius):
+        '''
+            Class constractor
+            ---------
+            args:
+                center - Vector - center of the sphere in world space
+                radius - double - radius of the sphere
+        '''
+
+        self.center = center
+        self.radius = radius
+
+    @staticmethod
+    def fromPrimitive(primitive, margin = 0):
+        '''
+            Return a bounding sphere enclosing a collision primitive, its transform has to be calculated
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                margin    - double = 0 - extra radius added to the sphere
+        '''
+
+        return BoundingSphere(primitive.getAxis(3), primitive.getBoundingRadius() + margin)
+
+    @staticmethod
+    def combine(one, two):
+        '''
+            Return a bounding sphere enclosing two bounding spheres
+            ---------
+            args:
+                one - BoundingSphere
+                two - BoundingSphere
+        '''
+
+        centerOffset = two.center - one.center
+        distance = centerOffset.squareMagnitude()
+        radiusDiff = two.radius - one.radius
+
+        #Check if the larger sphere encloses the small one
+        if radiusDiff*radiusDiff >= distance:
+            if one.radius > two.radius: return BoundingSphere(one.center.copy(), one.radius)
+            return BoundingSphere(two.center.copy(), two.radius)
+
+        #Otherwise we need to work with partially overlapping spheres
+        distance = distance**(1/2)
+        radius = (distance + one.radius + two.radius) * 0.5
+
+        #The new center is based on one's center, moved towards two's center by an ammount proportional to the spheres' radii
+        center = one.center.copy()
+        if distance > 0: center.addScaledVector(centerOffset, (radius - one.radius)/distance)
+        return BoundingSphere(center, radius)
+
+    def overlaps(self, other):
+        '''
+            Return true if this sphere overlaps another sphere
+            ---------
+            args:
+                other - BoundingSphere
+        '''
+
+        distanceSquared = (self.center - other.center).squareMagnitude()
+        return distanceSquared < (self.radius + other.radius)**2
+
+    def encloses(self, other):
+        '''
+            Return true if this sphere fully contains another sphere
+            ---------
+            args:
+                other - BoundingSphere
+        '''
+
+        if other.radius > self.radius: return False
+        distanceSquared = (self.center - other.center).squareMagnitude()
+        return distanceSquared <= (self.radius - other.radius)**2
+
+    def getGrowth(self, other):
+        '''
+            Return how much this sphere would grow to enclose another sphere
+            ---------
+            args:
+                other - BoundingSphere
+        '''
+
+        newSphere = BoundingSphere.combine(self, other)
+        #We return a value proportional to the change in surface area of the sphere
+        return newSphere.radius*newSphere.radius - self.radius*self.radius
+
+    def getSize(self):
+        '''
+            Return a value proportional to the volume of the sphere
+        '''
+
+        return 1.333333 * PI * self.radius**3
+
+class PotentialContact:
+    '''
+        Holds two primitives that might be in contact, generated by coarse collision detection
+        and passed to the CollisionDetector
+        ---------
+        properties:
+            primitives - list - two CollisionPrimitive which might be in contact
+    '''
+
+    def __init__(self, one, two):
+        '''
+            Class constractor
+            ---------
+            args:
+                one - CollisionPrimitive
+                two - CollisionPrimitive
+        '''
+
+        self.primitives = [one, two]
+
+class BroadPhase(ABC):
+    '''
+        Abstract class which all the coarse collision detection algorithms implements
+        Subclasses overriding __init__ have to call BroadPhase.__init__
+        ---------
+        properties:
+            sleeping - set - primitives of sleeping bodies which didn't move since they fell asleep
+        ---------
+        Abstract methods:
+            insert               - Add a primitive to the broad phase
+            remove               - Remove a primitive from the broad phase
+            update               - Update the broad phase after the bodies moved
+            getPotentialContacts - Return a list of PotentialContact
+        ---------
+        methods:
+            isResting            - Return true if a primitive of a sleeping body didn't move since last update
+            wake                 - Forget that a primitive was resting, its body was moved
+            clearSleeping        - Forget all resting primitives
+    '''
+
+    def __init__(self):
+        '''
+            Class constractor
+        '''
+
+        self.sleeping = set()
+
+    @abstractmethod
+    def insert(self, primitive, static = False):
+        '''
+            Add a primitive to the broad phase
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                static    - bool = False - True for level geometry which never moves
+        '''
+
+        pass
+
+    @abstractmethod
+    def remove(self, primitive):
+        '''
+            Remove a primitive from the broad phase
+            ---------
+            args:
+                primitive - CollisionPrimitive
+        '''
+
+        pass
+
+    @abstractmethod
+    def update(self):
+        '''
+            Update the broad phase after the bodies moved, primitives transforms have to be calculated
+        '''
+
+        pass
+
+    @abstractmethod
+    def getPotentialContacts(self, limit):
+        '''
+            Return a list of at most limit PotentialContact
+            ---------
+            args:
+                limit - int - max number of potential contacts
+        '''
+
+        pass
+
+    def isResting(self, primitive):
+        '''
+            Return true if the body of a primitive is sleeping and was already sleeping in the last update,
+            so the primitive didn't move since then, the sleeping set of the broad phase is updated
+            ---------
+            args:
+                primitive - CollisionPrimitive
+        '''
+
+        if primitive.body is None or primitive.body.isAwake:
+            self.sleeping.discard(primitive)
+            return False
+        if primitive in self.sleeping: return True
+        self.sleeping.add(primitive)
+        return False
+
+    def wake(self, primitive):
+        '''
+            Forget that a primitive was resting, used when its body was moved while sleeping
+            ---------
+            args:
+                primitive - CollisionPrimitive
+        '''
+
+        self.sleeping.discard(primitive)
+
+    def clearSleeping(self):
+        '''
+            Forget all resting primitives, used when the state of the bodies was replaced
+        '''
+
+        self.sleeping.clear()
+
+class SpatialHash(BroadPhase):
+    '''
+        Uniform grid broad phase, each primitive is hashed into every cell its bounding sphere touches
+        and only primitives sharing a cell are tested against each other.
+        Works best when the cell size is close to the size of the largest primitive
+        ---------
+        properties:
+            cellSize   - double - edge length of a grid cell
+            primitives - list   - all primitives in the grid
+            hashed     - list   - primitives hashed in the last update
+            cells      - dict   - maps cell coordinates to list of indices in hashed
+            spheres    - list   - bounding sphere of each hashed primitive
+            sleeping   - set    - primitives of sleeping bodies hashed while sleeping
+        ---------
+        methods:
+            insert               - Add a primitive to the grid
+            remove               - Remove a primitive from the grid
+            update               - Rehash all primitives after the bodies moved
+            getPotentialContacts - Return a list of PotentialContact of primitives with overlapping bounding spheres
+    '''
+
+    def __init__(self, cellSize = 0):
+        '''
+            Class constractor
+            ---------
+            args:
+                cellSize - double = 0 - edge length of a grid cell, 0 to use the diameter of the largest primitive
+        '''
+
+        self.cellSize = cellSize
+        self.primitives = []
+        self.hashed = []
+        self.cells = {}
+        self.spheres = []
+        super().__init__()
+
+    def insert(self, primitive, static = False):
+        '''
+            Add a primitive to the grid, it is hashed on next update
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                static    - bool = False - unused, static primitives are hashed as any other
+        '''
+
+        self.primitives.append(primitive)
+
+    def remove(self, primitive):
+        '''
+            Remove a primitive from the grid, it is removed from the cells on next update
+            ---------
+            args:
+                primitive - CollisionPrimitive
+        '''
+
+        if primitive in self.primitives: self.primitives.remove(primitive)
+        self.sleeping.discard(primitive)
+
+    def update(self):
+        '''
+            Rehash all primitives after the bodies moved, bounding spheres of sleeping bodies are reused
+        '''
+
+        self.cells.clear()
+        #Primitives of sleeping bodies don't move, so their last bounding sphere is kept
+        lastSpheres = dict(zip(self.hashed, self.spheres))
+        self.hashed = list(self.primitives)
+        self.spheres = [lastSpheres[primitive] if primitive in lastSpheres and self.isResting(primitive)
+                        else BoundingSphere.fromPrimitive(primitive) for primitive in self.hashed]
+        if not self.spheres: return
+
+        cellSize = self.cellSize
+        if cellSize <= 0: cellSize = max(2*sphere.radius for sphere in self.spheres) or 1
+        inverseCellSize = 1/cellSize
+
+        cells = self.cells
+        for index, sphere in enumerate(self.spheres):
+            center = sphere.center
+            radius = sphere.radius
+            x0, x1 = floor((center.x - radius)*inverseCellSize), floor((center.x + radius)*inverseCellSize)
+            y0, y1 = floor((center.y - radius)*inverseCellSize), floor((center.y + radius)*inverseCellSize)
+            z0, z1 = floor((center.z - radius)*inverseCellSize), floor((center.z + radius)*inverseCellSize)
+            for x in range(x0, x1+1):
+                for y in range(y0, y1+1):
+                    for z in range(z0, z1+1):
+                        cell = cells.get((x, y, z))
+                        if cell is None: cells[(x, y, z)] = [index]
+                        else: cell.append(index)
+
+    def getPotentialContacts(self, limit):
+        '''
+            Return a list of at most limit PotentialContact of primitives with overlapping bounding spheres
+            ---------
+            args:
+                limit - int - max number of potential contacts
+        '''
+
+        contacts = []
+        if limit <= 0: return contacts
+
+        tested = set()
+        for cell in self.cells.values():
+            if len(cell) < 2: continue
+            for a in range(len(cell)):
+                one = cell[a]
+                for b in range(a+1, len(cell)):
+                    two = cell[b]
+                    #Pairs sharing more than one cell are only reported once
+                    pair = (one, two) if one < two else (two, one)
+                    if pair in tested: continue
+                    tested.add(pair)
+
+                    if self.hashed[one].body is self.hashed[two].body: continue
+                    if not self.spheres[one].overlaps(self.spheres[two]): continue
+
+                    contacts.append(PotentialContact(self.hashed[pair[0]], self.hashed[pair[1]]))
+                    if len(contacts) >= limit: return contacts
+        return contacts
+
+class BVHNode:
+    '''
+        A node in a bounding volume hierarchy, leaves hold a primitive and branches hold two children
+        Each node's volume encloses the volumes of all its children
+        ---------
+        properties:
+            tree      - BoundingVolumeHierarchy - tree keeping track of the leaf of each primitive
+            parent    - BVHNode                 - parent node, None for the root
+            children  - list                    - two children nodes, None for leaves
+            volume    - BoundingSphere          - volume enclosing this node and all its children
+            primitive - CollisionPrimitive      - primitive held by a leaf, None for branches
+        ---------
+        methods:
+            isLeaf                      - Return true if the node holds a primitive
+            insert                      - Insert a primitive under this node
+            remove                      - Remove this node from the hierarchy
+            refit                       - Change volume of a leaf and recalculate volumes of its ancestors
+            recalculateBoundingVolume   - Recalculate the volume of a branch from its children
+            overlaps                    - Return true if the volumes of two nodes overlap
+            getPotentialContacts        - Add potential contacts between primitives under this node
+            getPotentialContactsWith    - Add potential contacts between primitives under this node and another one
+    '''
+
+    def __init__(self, tree, parent, volume, primitive = None):
+        '''
+            Class constractor
+            ---------
+            args:
+                tree      - BoundingVolumeHierarchy
+                parent    - BVHNode
+                volume    - BoundingSphere
+                primitive - CollisionPrimitive = None
+        '''
+
+        self.tree = tree
+        self.parent = parent
+        self.children = [None, None]
+        self.volume = volume
+        self.primitive = primitive
+        if primitive is not None: tree.leaves[primitive] = self
+
+    def isLeaf(self):
+        '''
+            Return true if the node holds a primitive
+        '''
+
+        return self.primitive is not None
+
+    def insert(self, primitive, volume):
+        '''
+            Insert a primitive under this node, it goes down the child that grows the least
+            return the new leaf
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                volume    - BoundingSphere
+        '''
+
+        node = self
+        while not node.isLeaf():
+            if node.children[0].volume.getGrowth(volume) < node.children[1].volume.getGrowth(volume):
+                node = node.children[0]
+            else:
+                node = node.children[1]
+
+        #Split the leaf into a branch holding the old primitive and the new one
+        node.children[0] = BVHNode(node.tree, node, node.volume, node.primitive)
+        node.children[1] = BVHNode(node.tree, node, volume, primitive)
+        node.primitive = None
+        node.recalculateBoundingVolume()
+        return node.children[1]
+
+    def remove(self):
+        '''
+            Remove this node from the hierarchy, its sibling takes the place of their parent
+        '''
+
+        if self.primitive is not None and self.tree.leaves.get(self.primitive) is self:
+            del self.tree.leaves[self.primitive]
+
+        parent = self.parent
+        if parent is None:
+            self.tree.setRoot(self, None)
+            return
+
+        sibling = parent.children[1] if parent.children[0] is self else parent.children[0]
+
+        #Parent takes the data of the sibling
+        parent.volume = sibling.volume
+        parent.primitive = sibling.primitive
+        parent.children = sibling.children
+        for child in parent.children:
+            if child is not None: child.parent = parent
+        if parent.primitive is not None: self.tree.leaves[parent.primitive] = parent
+
+        if parent.parent is not None: parent.parent.recalculateBoundingVolume()
+
+    def refit(self, volume):
+        '''
+            Change volume of a leaf and recalculate volumes of its ancestors
+            ---------
+            args:
+                volume - BoundingSphere
+        '''
+
+        self.volume = volume
+        if self.parent is not None: self.parent.recalculateBoundingVolume()
+
+    def recalculateBoundingVolume(self):
+        '''
+            Recalculate the volume of a branch from its children and go up the hierarchy
+        '''
+
+        node = self
+        while node is not None:
+            if node.isLeaf(): return
+            volume = BoundingSphere.combine(node.children[0].volume, node.children[1].volume)
+            node.volume = volume
+            node = node.parent
+
+    def overlaps(self, other):
+        '''
+            Return true if the volumes of two nodes overlap
+            ---------
+            args:
+                other - BVHNode
+        '''
+
+        return self.volume.overlaps(other.volume)
+
+    def getPotentialContacts(self, contacts, limit):
+        '''
+            Add potential contacts between primitives under this node
+            ---------
+            args:
+                contacts - list - list to add PotentialContact to
+                limit    - int  - max number of contacts in the list
+        '''
+
+        if self.isLeaf() or len(contacts) >= limit: return
+        self.children[0].getPotentialContacts(contacts, limit)
+        self.children[1].getPotentialContacts(contacts, limit)
+        self.children[0].getPotentialContactsWith(self.children[1], contacts, limit)
+
+    def getPotentialContactsWith(self, other, contacts, limit):
+        '''
+            Add potential contacts between primitives under this node and primitives under another node
+            ---------
+            args:
+                other    - BVHNode
+                contacts - list - list to add PotentialContact to
+                limit    - int  - max number of contacts in the list
+        '''
+
+        if len(contacts) >= limit or not self.overlaps(other): return
+
+        if self.isLeaf() and other.isLeaf():
+            if self.primitive.body is not other.primitive.body:
+                contacts.append(PotentialContact(self.primitive, other.primitive))
+            return
+
+        #Descend into the node which is a branch, if both are branches descend into the larger one
+        if other.isLeaf() or (not self.isLeaf() and self.volume.getSize() >= other.volume.getSize()):
+            self.children[0].getPotentialContactsWith(other, contacts, limit)
+            self.children[1].getPotentialContactsWith(other, contacts, limit)
+        else:
+            self.getPotentialContactsWith(other.children[0], contacts, limit)
+            self.getPotentialContactsWith(other.children[1], contacts, limit)
+
+class BoundingVolumeHierarchy(BroadPhase):
+    '''
+        Bounding sphere hierarchy broad phase, works well for scenes with mixed object sizes.
+        Static primitives are kept in their own tree which is never refitted,
+        dynamic primitives are stored with a margin so small motions do not touch the tree
+        ---------
+        properties:
+            margin      - double  - extra radius given to volumes of dynamic primitives
+            dynamicRoot - BVHNode - root of tree holding moving primitives
+            staticRoot  - BVHNode - root of tree holding static level geometry
+            leaves      - dict    - maps each primitive to its leaf
+            dynamic     - list    - primitives which are refitted on update
+            sleeping    - set     - primitives of sleeping bodies checked while sleeping, they aren't refitted
+        ---------
+        methods:
+            insert               - Add a primitive to the hierarchy
+            remove               - Remove a primitive from the hierarchy
+            update               - Refit leaves of dynamic primitives which moved out of their volume
+            getPotentialContacts - Return a list of PotentialContact of primitives with overlapping volumes
+    '''
+
+    def __init__(self, margin = 0.1):
+        '''
+            Class constractor
+            ---------
+            args:
+                margin - double = 0.1 - extra radius given to volumes of dynamic primitives
+        '''
+
+        self.margin = margin
+        self.dynamicRoot = None
+        self.staticRoot = None
+        self.leaves = {}
+        self.dynamic = []
+        super().__init__()
+
+    def setRoot(self, node, newRoot):
+        '''
+            Replace a root of one of the trees, used by BVHNode when the root leaf is removed
+            ---------
+            args:
+                node    - BVHNode - old root
+                newRoot - BVHNode
+        '''
+
+        if self.dynamicRoot is node: self.dynamicRoot = newRoot
+        elif self.staticRoot is node: self.staticRoot = newRoot
+
+    def insert(self, primitive, static = False):
+        '''
+            Add a primitive to the hierarchy, its transform has to be calculated
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                static    - bool = False - True for level geometry which never moves
+        '''
+
+        if primitive in self.leaves: return
+
+        if static:
+            volume = BoundingSphere.fromPrimitive(primitive)
+            if self.staticRoot is None: self.staticRoot = BVHNode(self, None, volume, primitive)
+            else: self.staticRoot.insert(primitive, volume)
+        else:
+            volume = BoundingSphere.fromPrimitive(primitive, self.margin)
+            if self.dynamicRoot is None: self.dynamicRoot = BVHNode(self, None, volume, primitive)
+            else: self.dynamicRoot.insert(primitive, volume)
+            self.dynamic.append(primitive)
+
+    def remove(self, primitive):
+        '''
+            Remove a primitive from the hierarchy
+            ---------
+            args:
+                primitive - CollisionPrimitive
+        '''
+
+        leaf = self.leaves.get(primitive)
+        if leaf is None: return
+        leaf.remove()
+        if primitive in self.dynamic: self.dynamic.remove(primitive)
+        self.sleeping.discard(primitive)
+
+    def update(self):
+        '''
+            Refit leaves of dynamic primitives which moved out of their volume,
+            primitives still inside their volume or of sleeping bodies do not touch the tree
+        '''
+
+        for primitive in self.dynamic:
+            if self.isResting(primitive): continue
+            leaf = self.leaves[primitive]
+            volume = BoundingSphere.fromPrimitive(primitive)
+            if not leaf.volume.encloses(volume):
+                volume.radius += self.margin
+                leaf.refit(volume)
+
+    def getPotentialContacts(self, limit):
+        '''
+            Return a list of at most limit PotentialContact of primitives with overlapping volumes,
+            static primitives are never paired with each other
+            ---------
+            args:
+                limit - int - max number of potential contacts
+        '''
+
+        contacts = []
+        if self.dynamicRoot is None or limit <= 0: return contacts
+        self.dynamicRoot.getPotentialContacts(contacts, limit)
+        if self.staticRoot is not None:
+            self.dynamicRoot.getPotentialContactsWith(self.staticRoot, contacts, limit)
+        return contacts
+
+class SweepAndPrune(BroadPhase):
+    '''
+        Sweep and prune broad phase, keeps the interval endpoints of all bounding spheres along one axis sorted
+        between frames. Since bodies barely move between frames the list is re-sorted with an insertion sort
+        in nearly linear time, and every swap of endpoints tells which pairs started or stopped overlapping.
+        Works best for mostly resting scenes like stacks and piles
+        ---------
+        properties:
+            axis        - int  - index of axis to sweep along, 0 for x, 1 for y, 2 for z
+            endpoints   - list - sorted interval endpoints as [value, isMin, proxy index]
+            proxies     - dict - maps proxy index to its primitive
+            proxyIndex  - dict - maps primitive to its proxy index
+            bounds      - dict - maps proxy index to its bounding box as (minimum Vector, maximum Vector)
+            axisPairs   - set  - pairs of proxy indices whose intervals overlap along the sweep axis
+            pairs       - dict - pairs of proxy indices whose bounding boxes overlap, mapped to their PotentialContact
+            added       - list - PotentialContact of pairs which started overlapping in last update
+            removed     - list - PotentialContact of pairs which stopped overlapping in last update
+            pending     - list - PotentialContact of pairs of primitives removed since last update
+            sleeping    - set  - primitives of sleeping bodies whose bounds were updated while sleeping
+        ---------
+        methods:
+            insert               - Add a primitive to the sweep
+            remove               - Remove a primitive from the sweep
+            update               - Re-sort the endpoints and update overlapping pairs
+            getPotentialContacts - Return a list of PotentialContact of all overlapping pairs
+            getAddedPairs        - Return PotentialContact of pairs which started overlapping in last update
+            getRemovedPairs      - Return PotentialContact of pairs which stopped overlapping in last update
+    '''
+
+    def __init__(self, axis = 0):
+        '''
+            Class constractor
+            ---------
+            args:
+                axis - int = 0 - index of axis to sweep along, 0 for x, 1 for y, 2 for z
+        '''
+
+        self.axis = axis
+        self.endpoints = []
+        self.proxies = {}
+        self.proxyIndex = {}
+        self.bounds = {}
+        self.axisPairs = set()
+        self.pairs = {}
+        self.added = []
+        self.removed = []
+        self.pending = []
+        self.nextProxy = 0
+        super().__init__()
+
+    def calculateBounds(self, primitive):
+        '''
+            Return the bounding box of the bounding sphere of a primitive as (minimum Vector, maximum Vector)
+            ---------
+            args:
+                primitive - CollisionPrimitive
+        '''
+
+        center = primitive.getAxis(3)
+        radius = primitive.getBoundingRadius()
+        return (Vector(center.x - radius, center.y - radius, center.z - radius),
+                Vector(center.x + radius, center.y + radius, center.z + radius))
+
+    def insert(self, primitive, static = False):
+        '''
+            Add a primitive to the sweep, its transform has to be calculated
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                static    - bool = False - unused, static primitives are swept as any other
+        '''
+
+        if primitive in self.proxyIndex: return
+        proxy = self.nextProxy
+        self.nextProxy += 1
+        self.proxies[proxy] = primitive
+        self.proxyIndex[primitive] = proxy
+        minimum, maximum = self.calculateBounds(primitive)
+        self.bounds[proxy] = (minimum, maximum)
+
+        low = minimum[self.axis]
+        high = maximum[self.axis]
+
+        #Find overlaps of the new interval by a single scan, then put the endpoints in place
+        for other, (otherMinimum, otherMaximum) in self.bounds.items():
+            if other != proxy and otherMinimum[self.axis] < high and low < otherMaximum[self.axis]:
+                self.axisPairs.add((other, proxy))
+
+        self.endpoints.append([low, True, proxy])
+        self.endpoints.append([high, False, proxy])
+        self.endpoints.sort(key=lambda endpoint: endpoint[0])
+
+    def remove(self, primitive):
+        '''
+            Remove a primitive from the sweep, its pairs are reported as removed on next update
+            ---------
+            args:
+                primitive - CollisionPrimitive
+        '''
+
+        proxy = self.proxyIndex.pop(primitive, None)
+        if proxy is None: return
+        self.sleeping.discard(primitive)
+        del self.proxies[proxy]
+        del self.bounds[proxy]
+        self.endpoints = [endpoint for endpoint in self.endpoints if endpoint[2] != proxy]
+        self.axisPairs = set(pair for pair in self.axisPairs if proxy not in pair)
+        for pair in [pair for pair in self.pairs if proxy in pair]:
+            self.pending.append(self.pairs.pop(pair))
+
+    def update(self):
+        '''
+            Re-sort the endpoints and update overlapping pairs, only pairs whose
+            overlap changed are added to added and removed
+        '''
+
+        axis = self.axis
+        bounds = self.bounds
+        for proxy, primitive in self.proxies.items():
+            if self.isResting(primitive): continue
+            bounds[proxy] = self.calculateBounds(primitive)
+
+        #Update endpoint values
+        endpoints = self.endpoints
+        for endpoint in endpoints:
+            minimum, maximum = bounds[endpoint[2]]
+            endpoint[0] = minimum[axis] if endpoint[1] else maximum[axis]
+
+        #Insertion sort, each swap of a minimum and a maximum changes overlap of a pair along the axis
+        axisPairs = self.axisPairs
+        for i in range(1, len(endpoints)):
+            endpoint = endpoints[i]
+            value = endpoint[0]
+            j = i - 1
+            while j >= 0 and endpoints[j][0] > value:
+                other = endpoints[j]
+                if endpoint[1] and not other[1]:
+                    #Minimum moved before other maximum, intervals start overlapping
+                    axisPairs.add((other[2], endpoint[2]))
+                elif not endpoint[1] and other[1]:
+                    #Maximum moved before other minimum, intervals stop overlapping
+                    axisPairs.discard((other[2], endpoint[2]))
+                    axisPairs.discard((endpoint[2], other[2]))
+                endpoints[j+1] = other
+                j -= 1
+            endpoints[j+1] = endpoint
+
+        #Check remaining axes of pairs overlapping along the sweep axis
+        overlapping = set()
+        for one, two in axisPairs:
+            minimumOne, maximumOne = bounds[one]
+            minimumTwo, maximumTwo = bounds[two]
+            if minimumOne < maximumTwo and minimumTwo < maximumOne:
+                if self.proxies[one].body is self.proxies[two].body: continue
+                overlapping.add((one, two) if one < two else (two, one))
+
+        self.added = []
+        self.removed = self.pending
+        self.pending = []
+        for pair in overlapping:
+            if pair not in self.pairs:
+                potentialContact = PotentialContact(self.proxies[pair[0]], self.proxies[pair[1]])
+                self.pairs[pair] = potentialContact
+                self.added.append(potentialContact)
+
+        for pair in [pair for pair in self.pairs if pair not in overlapping]:
+            self.removed.append(self.pairs.pop(pair))
+
+    def getPotentialContacts(self, limit):
+        '''
+            Return a list of at most limit PotentialContact of all overlapping pairs
+            ---------
+            args:
+                limit - int - max number of potential contacts
+        '''
+
+        contacts = list(self.pairs.values())
+        return contacts[:limit] if limit < len(contacts) else contacts
+
+    def getAddedPairs(self):
+        '''
+            Return PotentialContact of pairs which started overlapping in last update
+        '''
+
+        return self.added
+
+    def getRemovedPairs(self):
+        '''
+            Return PotentialContact of pairs which stopped overlapping in last update,
+            including pairs of primitives removed before it
+        '''
+
+        return self.removed
@@ -18,12 +18,20 @@ class Contact:
             contactVelocity         - Vector  - Hold closing velocity of the contact
             desiredDeltaVelocity    - double  - Holds change of velocity for which the contact will be resolved
             relativeContactPosition - list    - Holds a world coordinate of two contact points relative to center of each body
+            feature                 - int     - Identifies which feature of the bodies (e.g. vertex of a box) made the contact,
+                                                used to match contacts of the same body pair between frames
+            basisNormal             - tuple   - Normal from which contactToWorld was built, the basis is only rebuilt when it changes
+            ownPoint                - Vector  - Vector owned by the contact, generators filling pooled contacts can write contactPoint
+                                                into it instead of allocating one, contactPoint may also reference a shared vector
+            ownNormal               - Vector  - Vector owned by the contact, written as ownPoint for contactNormal, which may
+                                                reference a shared vector like the direction of a plane
         ---------
         setBodyData:
             setters                         - Set data of contact which doesnt depend on the position
             calculateInternals              - Calculate internal data from state data, not called manually (only in resolver)
             swapBodies                      - Swap body[0] with body[1] and inverse the contact normal
             matchAwakeState                 - When two bodies collides, if one is awake, the other is awaken
+            isAwake                         - Return true if a body of the contact is awake
             calculateDesiredDeltaVelocity   - Calculate and set value of desiredDeltaVelocity from acceleration
             calculateLocalVelocity          - Return the velocity of the contact relative to one of the bodies
             calculateContactBasis           - Construct and sets contactToWorld to an arbitrary matrix to convert contact space to world  
@@ -33,6 +41,10 @@ class Contact:
             calculateFrictionImpulse        - calculate impulse of a contact with friction
     '''
 
+    #Scratch objects shared by all contacts, only used within one method call so resolution doesn't allocate
+    scratchVectors = (Vector(), Vector(), Vector())
+    scratchMatrices = (Matrix3(), Matrix3(), Matrix3(), Matrix3())
+
     def __init__(self): 
         '''
             Class constractor
@@ -45,9 +57,13 @@ class Contact:
         self.contactNormal = None
         self.penetration = None
         self.contactToWorld = Matrix3()
-        self.contactVelocity = None
+        self.contactVelocity = Vector()
         self.desiredDeltaVelocity = 0
-        self.relativeContactPosition = [None, None]
+        self.relativeContactPosition = [Vector(), Vector()]
+        self.feature = 0
+        self.basisNormal = None
+        self.ownPoint = Vector()
+        self.ownNormal = Vector()
 
     def setBodyData(self, one, two, friction, restitution):
         '''
@@ -76,17 +92,18 @@ class Contact:
         if not self.body[0]: self.swapBodies()
         assert(self.body[0])
 
-        #Calculate axis of the contact point
-        self.calculateContactBasis()
+        #Calculate axis of the contact point, contacts are reused so the basis may be built already
+        normal = self.contactNormal
+        if self.basisNormal != (normal.x, normal.y, normal.z): self.calculateContactBasis()
 
         #Store the relative position of contact relative to each body
-        self.relativeContactPosition[0] = self.contactPoint - self.body[0].getPosition()
-        if self.body[1]: self.relativeContactPosition[1] = self.contactPoint - self.body[1].getPosition()
+        self.contactPoint.subInto(self.body[0].position, self.relativeContactPosition[0])
+        if self.body[1]: self.contactPoint.subInto(self.body[1].position, self.relativeContactPosition[1])
 
         #Store the relative velocity of contact relative to each body
-        self.contactVelocity = self.calculateLocalVelocity(0, duration);
+        self.calculateLocalVelocity(0, duration, self.contactVelocity)
         if self.body[1]:
-            self.contactVelocity -= self.calculateLocalVelocity(1, duration); 
+            self.contactVelocity -= self.calculateLocalVelocity(1, duration, Contact.scratchVectors[2])
 
         self.calculateDesiredDeltaVelocity(duration);
 
@@ -104,15 +121,26 @@ class Contact:
     def matchAwakeState(self):
         '''
             When two bodies collides, if one is awake, the other is awaken
+            Bodies with infinite mass never move, so they don't wake the other body
         '''
 
         if not self.body[1]: return
-        body0awake = self.body[0].isAwake
-        body1awake = self.body[1].isAwake
+        body0awake = self.body[0].isAwake and self.body[0].inverseMass > 0
+        body1awake = self.body[1].isAwake and self.body[1].inverseMass > 0
 
         if body0awake ^ body1awake:
-            if body0awake: body[1].isAwake = True
-            else: body[0].isAwake = True
+            if body0awake: self.body[1].setAwake()
+            else: self.body[0].setAwake()
+
+    def isAwake(self):
+        '''
+            Return true if a body of the contact with finite mass is awake,
+            contacts between sleeping bodies are not resolved
+        '''
+
+        for body in self.body:
+            if body is not None and body.isAwake and body.inverseMass > 0: return True
+        return False
 
     def calculateDesiredDeltaVelocity(self, duration):
         '''
@@ -127,36 +155,44 @@ class Contact:
         #Calculate velocity due to acceleration in this frame
         velocityFromAcc = 0
 
-        if self.body[0].isAwake: velocityFromAcc+= (self.body[0].getLastFrameAcceleration() * duration) * self.contactNormal
-        if self.body[1] and self.body[1].isAwake: velocityFromAcc -= (self.body[1].getLastFrameAcceleration() * duration) * self.contactNormal
+        normal = self.contactNormal
+        if self.body[0].isAwake:
+            acceleration = self.body[0].lastFrameAcceleration
+            velocityFromAcc += acceleration.x*duration*normal.x + acceleration.y*duration*normal.y + acceleration.z*duration*normal.z
+        if self.body[1] and self.body[1].isAwake:
+            acceleration = self.body[1].lastFrameAcceleration
+            velocityFromAcc -= acceleration.x*duration*normal.x + acceleration.y*duration*normal.y + acceleration.z*duration*normal.z
         #Limit restitution at low velocities
         thisRestitution = self.restitution
         if abs(self.contactVelocity.x) < velocityLimit: thisRestitution = 0
         #Remove acceleration velocity 
         self.desiredDeltaVelocity = -self.contactVelocity.x -thisRestitution * (self.contactVelocity.x - velocityFromAcc)
     
-    def calculateLocalVelocity(self, bodyIndex, duration):
+    def calculateLocalVelocity(self, bodyIndex, duration, out = None):
         '''
             Return the velocity of the contact relative to one of the bodies
             ---------
             args:
                 bodyIndex - int    - index of body 0 or 1
                 duration  - double - duration of time step
+                out       - Vector = None - receives the velocity, a new vector if None
         '''
 
+        if out is None: out = Vector()
+        velocity, accVelocity = Contact.scratchVectors[0], Contact.scratchVectors[1]
         thisBody = self.body[bodyIndex]
         #Velocity of the contact point
-        velocity = thisBody.getRotation() % self.relativeContactPosition[bodyIndex]
-        velocity += thisBody.getVelocity()
+        thisBody.rotation.vectorProductInto(self.relativeContactPosition[bodyIndex], velocity)
+        velocity += thisBody.velocity
         #Convert to contact coordinates
-        contactVelocity = self.contactToWorld.transformTranspose(velocity)
+        self.contactToWorld.transformTransposeInto(velocity, out)
         #Amount of velocity due to non reaction forces (acting directly on body as gravity)
-        accVelocity = thisBody.getLastFrameAcceleration() * duration
-        accVelocity = self.contactToWorld.transformTranspose(accVelocity)
+        thisBody.lastFrameAcceleration.scaleInto(duration, accVelocity)
+        self.contactToWorld.transformTransposeInto(accVelocity, accVelocity)
         #Ignore acceleration in direction of contact normal
         accVelocity.x = 0
-        contactVelocity += accVelocity
-        return contactVelocity
+        out += accVelocity
+        return out
 
 
     def calculateContactBasis(self):
@@ -164,7 +200,8 @@ class Contact:
             Construct an arbitrary matrix which convert contact space to world space
         '''
 
-        contactTangent = [Vector(), Vector()]
+        #Tangents are only copied into contactToWorld
+        contactTangent = Contact.scratchVectors
         #Check if worlds z-axis is nearer to y or x axis
         if abs(self.contactNormal.x) > abs(self.contactNormal.y):
             #For normalization
@@ -190,6 +227,7 @@ class Contact:
             contactTangent[1].z = self.contactNormal.x*contactTangent[0].y
 
         self.contactToWorld.setComponent(self.contactNormal,contactTangent[0], contactTangent[1])
+        self.basisNormal = (self.contactNormal.x, self.contactNormal.y, self.contactNormal.z)
 
     def applyVelocityChange(self, velocityChange, rotationChange):
         '''
@@ -200,41 +238,41 @@ class Contact:
                 rotationChange - list - list of 2 empty vectors to store rotation
         '''
 
-        #Get inverse of inertia tensor of two bodies
-        inverseInertiaTensor = [None, None]
-        inverseInertiaTensor[0] = self.body[0].getInverseInertiaTensorWorld()
-        if self.body[1]: inverseInertiaTensor[1] = self.body[1].getInverseInertiaTensorWorld()
+        #Get inverse of inertia tensor of two bodies, they are only read
+        inverseInertiaTensor = (self.body[0].inverseInertiaTensorWorld, self.body[1].inverseInertiaTensorWorld if self.body[1] else None)
+        if rotationChange[0] is None: rotationChange[0] = Vector()
+        if rotationChange[1] is None: rotationChange[1] = Vector()
 
         #Calculate impulse for each axes
-        impulseContact = None
+        impulse, impulsiveTorque = Contact.scratchVectors[0], Contact.scratchVectors[1]
         if self.friction == 0:
-            impulseContact = self.calculateFrictionlessImpulse(inverseInertiaTensor)
+            impulseContact = self.calculateFrictionlessImpulse(inverseInertiaTensor, impulse)
         else:
-            impulseContact = self.calculateFrictionImpulse(inverseInertiaTensor)
+            impulseContact = self.calculateFrictionImpulse(inverseInertiaTensor, impulse)
 
         #Impulse in world coordinates
-        impulse = self.contactToWorld.transform(impulseContact)
+        self.contactToWorld.transformInto(impulseContact, impulse)
 
         #Split impulse in both linear and rotational components
-        impulsiveTorque = self.relativeContactPosition[0] % impulse
-        rotationChange[0] = inverseInertiaTensor[0].transform(impulsiveTorque)
+        self.relativeContactPosition[0].vectorProductInto(impulse, impulsiveTorque)
+        inverseInertiaTensor[0].transformInto(impulsiveTorque, rotationChange[0])
         velocityChange[0].clear()
-        velocityChange[0].addScaledVector(impulse, self.body[0].getInverseMass())
+        velocityChange[0].addScaledVector(impulse, self.body[0].inverseMass)
 
         #Apply change
-        self.body[0].addVelocity(velocityChange[0])
-        self.body[0].addRotation(rotationChange[0])
+        self.body[0].velocity += velocityChange[0]
+        self.body[0].rotation += rotationChange[0]
 
         if self.body[1]:
             #Tourque is in opposite direction
-            impulsiveTorque = impulse % self.relativeContactPosition[1]
-            rotationChange[1] = inverseInertiaTensor[1].transform(impulsiveTorque)
+            impulse.vectorProductInto(self.relativeContactPosition[1], impulsiveTorque)
+            inverseInertiaTensor[1].transformInto(impulsiveTorque, rotationChange[1])
             velocityChange[1].clear()
-            velocityChange[1].addScaledVector(impulse, -self.body[1].getInverseMass())
+            velocityChange[1].addScaledVector(impulse, -self.body[1].inverseMass)
 
             #Apply change
-            self.body[1].addVelocity(velocityChange[1])
-            self.body[1].addRotation(rotationChange[1])
+            self.body[1].velocity += velocityChange[1]
+            self.body[1].rotation += rotationChange[1]
 
     def applyPositionChange(self, linearChange, angularChange,  penetration):
         '''
@@ -252,21 +290,23 @@ class Contact:
         totalInertia = 0
         linearInertia = [0,0]
         angularInertia = [0, 0]
+        normal = self.contactNormal
+        angularInertiaWorld, projection = Contact.scratchVectors[0], Contact.scratchVectors[1]
         
         #Get inertia of each object in direction of contactNormal
         #due to angular inertia only
         for i in range(2): 
             if (self.body[i]):
-                inverseInertiaTensor = self.body[i].getInverseInertiaTensorWorld()
+                inverseInertiaTensor = self.body[i].inverseInertiaTensorWorld
 
                 #Calculate angular inertia.
-                angularInertiaWorld = self.relativeContactPosition[i] % self.contactNormal
-                angularInertiaWorld = inverseInertiaTensor.transform(angularInertiaWorld)
-                angularInertiaWorld = angularInertiaWorld % self.relativeContactPosition[i]
-                angularInertia[i] = angularInertiaWorld * self.contactNormal
+                self.relativeContactPosition[i].vectorProductInto(normal, angularInertiaWorld)
+                inverseInertiaTensor.transformInto(angularInertiaWorld, angularInertiaWorld)
+                angularInertiaWorld.vectorProductInto(self.relativeContactPosition[i], angularInertiaWorld)
+                angularInertia[i] = angularInertiaWorld * normal
 
                 #The linear component is simply the inverse mass
-                linearInertia[i] = self.body[i].getInverseMass()
+                linearInertia[i] = self.body[i].inverseMass
 
                 #Keep track of the total inertia from all components
                 totalInertia += linearInertia[i] + angularInertia[i]
@@ -274,6 +314,10 @@ class Contact:
         #Loop through again calculating and applying the changes
         for i in range(2):
             if (self.body[i]):
+                body = self.body[i]
+                if linearChange[i] is None: linearChange[i] = Vector()
+                if angularChange[i] is None: angularChange[i] = Vector()
+
                 #The linear and angular movements
                 sign = 1 if i == 0 else -1
                 angularMove[i] = sign * penetration * (angularInertia[i] / totalInertia)
@@ -281,8 +325,8 @@ class Contact:
 
                 #To avoid angular projections that are too great (when mass is large
                 #but inertia tensor is small) limit the angular move.
-                projection = self.relativeContactPosition[i].copy()
-                projection.addScaledVector(self.contactNormal,-self.relativeContactPosition[i].scalarProduct(self.contactNormal))
+                self.relativeContactPosition[i].copyInto(projection)
+                projection.addScaledVector(normal,-self.relativeContactPosition[i].scalarProduct(normal))
 
                 #Use the small angle approximation for the sine of the angle the
                 #magnitude would be sine(angularLimit) * projection.magnitude
@@ -303,66 +347,64 @@ class Contact:
                     angularChange[i].clear()
                 else:
                     #Work out the direction we'd like to rotate in.
-                    targetAngularDirection = self.relativeContactPosition[i].vectorProduct(self.contactNormal)
-                    inverseInertiaTensor = self.body[i].getInverseInertiaTensorWorld()
+                    targetAngularDirection = self.relativeContactPosition[i].vectorProductInto(normal, projection)
 
                     #Work out the direction we'd need to rotate to achieve that
-                    angularChange[i] = inverseInertiaTensor.transform(targetAngularDirection) * (angularMove[i] / angularInertia[i])
+                    body.inverseInertiaTensorWorld.transformInto(targetAngularDirection, angularChange[i])
+                    angularChange[i] *= angularMove[i] / angularInertia[i]
                 
                 #Velocity change is just the linear movement along the contact normal.
-                linearChange[i] = self.contactNormal * linearMove[i]
+                normal.scaleInto(linearMove[i], linearChange[i])
 
                 #Apply the linear movement
-                pos = self.body[i].getPosition()
-                pos.addScaledVector(self.contactNormal, linearMove[i])
-                self.body[i].setPosition(pos.x,pos.y,pos.z)
+                body.position.addScaledVector(normal, linearMove[i])
                 #And the change in orientation
-                q = Quaternion()
-                self.body[i].getOrientation(q)
-                q.addScaledVector(angularChange[i], 1)
-                self.body[i].setOrientation(q.r,q.i,q.j,q.k)
+                body.orientation.addScaledVector(angularChange[i], 1)
+                body.orientation.normalize()
 
                 #We need to calculate the derived data for any body that is
                 #asleep, so that the changes are reflected in the object's
                 #data. Otherwise the resolution will not change the position
                 #of the object, and the next collision detection round will
                 #have the same penetration.
-                if not self.body[i].isAwake: self.body[i].calculateDerivedData()
+                if not body.isAwake: body.calculateDerivedData()
 
-    def calculateFrictionlessImpulse(self, inverseInertiaTensor):
+    def calculateFrictionlessImpulse(self, inverseInertiaTensor, out = None):
         '''
             calculate impulse of a frictionless contact
             ---------
             args:
-                inverseInertiaTensor - Matrix3 
+                inverseInertiaTensor - list - inverse inertia tensors (Matrix3) of the bodies in world space
+                out                  - Vector = None - receives the impulse in contact coordinates, a new vector if None
         '''
 
-        impulseContact = Vector()
+        impulseContact = Vector() if out is None else out
+        deltaVelWorld = Contact.scratchVectors[2]
 
         #Calculate change in velocity for unit impulse in 
         #direction of contactNormal in world space
-        deltaVelWorld = self.relativeContactPosition[0] % self.contactNormal
-        deltaVelWorld = inverseInertiaTensor[0].transform(deltaVelWorld)
-        deltaVelWorld = deltaVelWorld % self.relativeContactPosition[0]
+        self.relativeContactPosition[0].vectorProductInto(self.contactNormal, deltaVelWorld)
+        inverseInertiaTensor[0].transformInto(deltaVelWorld, deltaVelWorld)
+        deltaVelWorld.vectorProductInto(self.relativeContactPosition[0], deltaVelWorld)
 
         #Change in velocity in contact coordinates
         deltaVelocity = deltaVelWorld * self.contactNormal
 
         #Add linear component of change of velocity
-        deltaVelocity += self.body[0].getInverseMass()
+        deltaVelocity += self.body[0].inverseMass
 
         if self.body[1]:
             #Calculate change in velocity for unit impulse in 
             #direction of contactNormal in world space
-            deltaVelWorld = self.relativeContactPosition[1] % self.contactNormal
-            deltaVelWorld = inverseInertiaTensor[1].transform(deltaVelWorld)
-            deltaVelWorld = deltaVelWorld % self.relativeContactPosition[1]
+            self.relativeContactPosition[1].vectorProductInto(self.contactNormal, deltaVelWorld)
+            inverseInertiaTensor[1].transformInto(deltaVelWorld, deltaVelWorld)
+            deltaVelWorld.vectorProductInto(self.relativeContactPosition[1], deltaVelWorld)
 
             #Change in velocity in contact coordinates
             deltaVelocity += deltaVelWorld * self.contactNormal
 
             #Add linear component of change of velocity
-            deltaVelocity += self.body[1].getInverseMass()
+            deltaVelocity += self.body[1].inverseMass
 
         #Calculate the required size of the impulse
         impulseContact.x = self.desiredDeltaVelocity / deltaVelocity
@@ -370,23 +412,23 @@ class Contact:
         impulseContact.z = 0
         return impulseContact
 
-    def calculateFrictionImpulse(self, inverseInertiaTensor):
+    def calculateFrictionImpulse(self, inverseInertiaTensor, out = None):
         '''
             calculate impulse of a contact with friction
             ---------
             args:
-                inverseInertiaTensor - Matrix3 
+                inverseInertiaTensor - list - inverse inertia tensors (Matrix3) of the bodies in world space
+                out                  - Vector = None - receives the impulse in contact coordinates, a new vector if None
         '''
 
-        impulseContact = None
-        inverseMass = self.body[0].getInverseMass()
+        impulseToTorque, deltaVelWorld, deltaVelWorld2, deltaVelocity = Contact.scratchMatrices
+        inverseMass = self.body[0].inverseMass
 
         #Helper matrix to convert between linear and angular quantities
-        impulseToTorque = Matrix3()
         impulseToTorque.setSkewSymmetric(self.relativeContactPosition[0])
 
         #Convert Impulse into change in velocity 
-        deltaVelWorld = impulseToTorque.copy()
+        impulseToTorque.copyInto(deltaVelWorld)
         deltaVelWorld *= inverseInertiaTensor[0]
         deltaVelWorld *= impulseToTorque
         deltaVelWorld *= -1
@@ -395,17 +437,17 @@ class Contact:
             impulseToTorque.setSkewSymmetric(self.relativeContactPosition[1]);
 
             #Convert Impulse into change in velocity 
-            deltaVelWorld2 = impulseToTorque.copy()
+            impulseToTorque.copyInto(deltaVelWorld2)
             deltaVelWorld2 *= inverseInertiaTensor[1]
             deltaVelWorld2 *= impulseToTorque
             deltaVelWorld2 *= -1
 
             #Add second body's values to total
             deltaVelWorld += deltaVelWorld2
-            inverseMass += self.body[1].getInverseMass()
+            inverseMass += self.body[1].inverseMass
 
         #Convert into contact coordinates
-        deltaVelocity = self.contactToWorld.transpose().copy()
+        deltaVelocity.setTranspose(self.contactToWorld)
         deltaVelocity *= deltaVelWorld
         deltaVelocity *= self.contactToWorld
 
@@ -414,14 +456,17 @@ class Contact:
         deltaVelocity.data[4] += inverseMass
         deltaVelocity.data[8] += inverseMass
 
-        #Impulse needed per unit velocity
-        impulseMatrix = deltaVelocity.inverse().copy()
+        #Impulse needed per unit velocity, zero if deltaVelocity is singular
+        impulseMatrix = deltaVelWorld2
+        impulseMatrix.setDiagonal(0, 0, 0)
+        impulseMatrix.setInverse(deltaVelocity)
 
         #Kill following velocities by friction
-        velKill = Vector(self.desiredDeltaVelocity, -self.contactVelocity.y, -self.contactVelocity.z)
+        velKill = Contact.scratchVectors[2]
+        velKill.set(self.desiredDeltaVelocity, -self.contactVelocity.y, -self.contactVelocity.z)
 
         #Impulse needed to kill velocity
-        impulseContact = impulseMatrix.transform(velKill)
+        impulseContact = impulseMatrix.transformInto(velKill, Vector() if out is None else out)
         planarImpulse = ( impulseContact.y**2 + impulseContact.z**2)**(1/2)
 
         #check if friction is exceeding
@@ -437,6 +482,97 @@ class Contact:
         
         return impulseContact;
 
+class IndexedMaxHeap:
+    '''
+        Binary max heap over items 0..n-1 with a key each, the position of every item in the heap
+        is tracked so the key of any item can be changed in O(log n)
+        ---------
+        properties:
+            keys     - list - key of each item
+            heap     - list - items ordered as a binary heap, heap[0] has the largest key
+            position - list - index of each item in heap
+        ---------
+        methods:
+            top      - Return item with the largest key and its key
+            update   - Change key of an item and restore the heap
+            siftUp   - Move item up until its parent has a larger key
+            siftDown - Move item down until its children have smaller keys
+    '''
+
+    def __init__(self, keys):
+        '''
+            Class constractor, a list sorted by descending keys is a valid heap
+            ---------
+            args:
+                keys - list - key of each item
+        '''
+
+        self.keys = list(keys)
+        self.heap = sorted(range(len(self.keys)), key=self.keys.__getitem__, reverse=True)
+        self.position = [0] * len(self.keys)
+        for index, item in enumerate(self.heap):
+            self.position[item] = index
+
+    def top(self):
+        '''
+            Return item with the largest key and its key
+        '''
+
+        item = self.heap[0]
+        return item, self.keys[item]
+
+    def update(self, item, key):
+        '''
+            Change key of an item and restore the heap
+            ---------
+            args:
+                item - int    - index of the item
+                key  - double - new key
+        '''
+
+        oldKey = self.keys[item]
+        self.keys[item] = key
+        if key > oldKey: self.siftUp(self.position[item])
+        elif key < oldKey: self.siftDown(self.position[item])
+
+    def siftUp(self, index):
+        '''
+            Move item at index up until its parent has a larger key
+        '''
+
+        heap, keys, position = self.heap, self.keys, self.position
+        item = heap[index]
+        key = keys[item]
+        while index > 0:
+            parentIndex = (index - 1) >> 1
+            parent = heap[parentIndex]
+            if keys[parent] >= key: break
+            heap[index] = parent
+            position[parent] = index
+            index = parentIndex
+        heap[index] = item
+        position[item] = index
+
+    def siftDown(self, index):
+        '''
+            Move item at index down until its children have smaller keys
+        '''
+
+        heap, keys, position = self.heap, self.keys, self.position
+        size = len(heap)
+        item = heap[index]
+        key = keys[item]
+        while True:
+            child = 2 * index + 1
+            if child >= size: break
+            if child + 1 < size and keys[heap[child + 1]] > keys[heap[child]]: child += 1
+            if keys[heap[child]] <= key: break
+            heap[index] = heap[child]
+            position[heap[index]] = index
+            index = child
+        heap[index] = item
+        position[item] = index
+
 class ContactResolver:
     '''
         Contact resolver is used to resolve all contacts in simulation, one instance is shared across simulation
@@ -452,15 +588,20 @@ class ContactResolver:
             velocityIterationsUsed  - int    - number of iterations used for velocity resolving
             positionIterationsUsed  - int    - number of iterations used for position resolving
             validSettings           - bool   - Check validity of algorithm internal settings
+            useIslands              - bool   - True if contacts are split into islands of interacting bodies and resolved separately
+            useHeap                 - bool   - True if the worst contact is taken from a max heap instead of scanning all contacts
+            islandCount             - int    - number of islands resolved in the last call of resolveContacts
         ---------
         setBodyData:
             isValid         - Return True if setting of the resolver are set correctly
             setIterations   - set max number of iterations for velocity and position
             setEpsilon      - set epsilon of velocity and position
             resolveContacts - resolve all contacts in simulation
+            buildIslands    - split contacts into islands of bodies which touch each other
+            buildAdjacency  - map each body to the contacts it is involved in
     '''
 
-    def __init__(self, velocityIterations, positionIterations, velocityEpsilon = 0.01, positionEpsilon = 0.01):
+    def __init__(self, velocityIterations, positionIterations, velocityEpsilon = 0.01, positionEpsilon = 0.01, useIslands = True, useHeap = False):
         '''
             Class constractor
             ---------
@@ -469,6 +610,11 @@ class ContactResolver:
                 positionIterations  - int           - Max number of iterations for position resolving
                 velocityEpsilon     - double = 0.01 - Velocity smaller than this can be considered 0
                 positionEpsilon     - double = 0.01 - Values smaller than this value considered to not be interpenteration
+                useIslands          - bool = True   - resolve each island of interacting bodies separately,
+                                                      islands share the iterations by their number of contacts
+                useHeap             - bool = False  - keep contacts in a max heap so finding the worst contact and
+                                                      updating contacts touched by a resolution costs O(log n) each,
+                                                      pays off for large islands
         '''
 
         self.velocityIterations = velocityIterations
@@ -478,6 +624,9 @@ class ContactResolver:
         self.velocityIterationsUsed = 0
         self.positionIterationsUsed = 0
         self.validSettings = False
+        self.useIslands = useIslands
+        self.useHeap = useHeap
+        self.islandCount = 0
     
     def isValid(self):
         '''
@@ -515,35 +664,133 @@ class ContactResolver:
             resolve all contacts in simulation
             ---------
             args:
-                contactArray - double - Array of all contacts in simulation
-                numContacts  - int    - Number of contacts in the array
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
                 duration     - double - duration of time step
         '''
 
+        self.islandCount = 0
         if numContacts == 0: return
         if not self.isValid(): return
 
-        #Prepare contacts for processing
-        self.prepareContacts(contactArray, numContacts, duration)
+        if not self.useIslands:
+            #Contacts between sleeping bodies are left out
+            contactArray = [contact for contact in contactArray[:numContacts] if contact.isAwake()]
+            numContacts = len(contactArray)
+            if numContacts == 0: return
+
+            #Prepare contacts for processing
+            self.prepareContacts(contactArray, numContacts, duration)
+
+            #Resolve interpenetration
+            self.adjustPositions(contactArray, numContacts, duration)
+
+            #Resolve velocity
+            self.adjustVelocities(contactArray, numContacts, duration)
+            return
+
+        #Contacts of different islands never share a moving body, so resolving
+        #an island can't change contacts of another one
+        velocityIterations = self.velocityIterations
+        positionIterations = self.positionIterations
+        velocityIterationsUsed = 0
+        positionIterationsUsed = 0
+        for island in self.buildIslands(contactArray, numContacts):
+            #Each island gets a share of the iterations by its number of contacts
+            self.velocityIterations = -(-velocityIterations * len(island) // numContacts)
+            self.positionIterations = -(-positionIterations * len(island) // numContacts)
+
+            self.prepareContacts(island, len(island), duration)
+            self.adjustPositions(island, len(island), duration)
+            self.adjustVelocities(island, len(island), duration)
+
+            velocityIterationsUsed += self.velocityIterationsUsed
+            positionIterationsUsed += self.positionIterationsUsed
+            self.islandCount += 1
+
+        self.velocityIterations = velocityIterations
+        self.positionIterations = positionIterations
+        self.velocityIterationsUsed = velocityIterationsUsed
+        self.positionIterationsUsed = positionIterationsUsed
 
-        #Resolve interpenetration
-        self.adjustPositions(contactArray, numContacts, duration)
+    def buildIslands(self, contactArray, numContacts):
+        '''
+            Split contacts into islands, where an island holds contacts of bodies connected by a chain of contacts
+            Bodies with infinite mass (as the ground) don't connect islands as contacts never move them
+            return list of islands, each is a list of contacts, islands whose bodies are all asleep
+            and contacts between sleeping bodies are left out
+            ---------
+            args:
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
+        '''
+
+        #Union find over bodies, each body points to its parent until the root of its island
+        parent = {}
+
+        def find(body):
+            root = body
+            while parent[root] is not root: root = parent[root]
+            #Compress path so next finds are faster
+            while parent[body] is not root:
+                parent[body], body = root, parent[body]
+            return root
+
+        for index in range(numContacts):
+            contact = contactArray[index]
+            roots = []
+            for body in contact.body:
+                if body is None or body.inverseMass <= 0: continue
+                if body not in parent: parent[body] = body
+                roots.append(find(body))
+            if len(roots) == 2 and roots[0] is not roots[1]: parent[roots[1]] = roots[0]
+
+        awakeRoots = set()
+        for body in parent:
+            if body.isAwake: awakeRoots.add(find(body))
+
+        islands = {}
+        for index in range(numContacts):
+            contact = contactArray[index]
+            #Contacts between sleeping bodies are left out, sleeping bodies are woken by contacts with awake ones
+            if not contact.isAwake(): continue
+            for body in contact.body:
+                if body is not None and body in parent:
+                    root = find(body)
+                    if root in awakeRoots: islands.setdefault(root, []).append(contact)
+                    break
+
+        return list(islands.values())
+
+    def buildAdjacency(self, contactArray, numContacts):
+        '''
+            Map each body to the contacts it is involved in
+            return dict of body to list of (contact index, index of the body in the contact)
+            ---------
+            args:
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
+        '''
 
-        #Resolve velocity
-        self.adjustVelocities(contactArray, numContacts, duration)
+        adjacency = {}
+        for index in range(numContacts):
+            contact = contactArray[index]
+            for b in range(2):
+                if contact.body[b]: adjacency.setdefault(contact.body[b], []).append((index, b))
+        return adjacency
 
     def prepareContacts(self, contactArray,  numContacts,  duration):
         '''
             Prepare contacts for processing by calculating internal data
             ---------
             args:
-                contactArray - double - Array of all contacts in simulation
-                numContacts  - int    - Number of contacts in the array
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
                 duration     - double - duration of time step
         '''
 
-        for contact in contactArray:
-            contact.calculateInternals(duration)
+        for index in range(numContacts):
+            contactArray[index].calculateInternals(duration)
 
     def adjustVelocities(self, contactArray, numContacts, duration):
         '''
@@ -551,14 +798,18 @@ class ContactResolver:
             It is important to note that contact with max magnitude of velocity change is solved first
             ---------
             args:
-                contactArray - double - Array of all contacts in simulation
-                numContacts  - int    - Number of contacts in the array
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
                 duration     - double - duration of time step
         '''
 
+        if self.useHeap: return self.adjustVelocitiesByHeap(contactArray, numContacts, duration)
+
+        #Only the first numContacts contacts are used, the rest of the array is a pool
+        contactArray = contactArray[:numContacts]
         velocityChange = [Vector(),Vector()]
-        rotationChange = [None, None]
-        deltaVel = None
+        rotationChange = [Vector(),Vector()]
+        deltaVel = Vector()
 
         self.velocityIterationsUsed = 0
         while (self.velocityIterationsUsed < self.velocityIterations):
@@ -584,10 +835,11 @@ class ContactResolver:
                     if contact.body[b]:
                         for d in range(2):
                             if contact.body[b] == desiredContact.body[d]:
-                                deltaVel = velocityChange[d] + rotationChange[d].vectorProduct(contact.relativeContactPosition[b])
+                                rotationChange[d].vectorProductInto(contact.relativeContactPosition[b], deltaVel)
+                                deltaVel += velocityChange[d]
 
                                 #Negative change in second object
-                                contact.contactVelocity += contact.contactToWorld.transformTranspose(deltaVel) * (-1 if b else 1)
+                                contact.contactVelocity.addScaledVector(contact.contactToWorld.transformTransposeInto(deltaVel, deltaVel), -1 if b else 1)
                                 contact.calculateDesiredDeltaVelocity(duration)
             self.velocityIterationsUsed+=1
 
@@ -597,15 +849,19 @@ class ContactResolver:
             It is important to note that contact with max interpenteration is solved first
             ---------
             args:
-                contactArray - double - Array of all contacts in simulation
-                numContacts  - int    - Number of contacts in the array
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
                 duration     - double - duration of time step
         '''
 
-        linearChange = [None, None] 
+        if self.useHeap: return self.adjustPositionsByHeap(contactArray, numContacts, duration)
+
+        #Only the first numContacts contacts are used, the rest of the array is a pool
+        contactArray = contactArray[:numContacts]
+        linearChange = [Vector(), Vector()]
         angularChange = [Vector(), Vector()]
         max = 0
-        deltaPosition = None
+        deltaPosition = Vector()
 
         self.positionIterationsUsed = 0
         while self.positionIterationsUsed < self.positionIterations:
@@ -632,14 +888,120 @@ class ContactResolver:
                    if contact.body[b]:
                         for d in range(2):
                             if contact.body[b] == desiredContact.body[d]:
-                                deltaPosition = linearChange[d] + angularChange[d].vectorProduct(contact.relativeContactPosition[b]);
+                                angularChange[d].vectorProductInto(contact.relativeContactPosition[b], deltaPosition)
+                                deltaPosition += linearChange[d]
                                 
                                 #Sign is positive only for second body as we are subtracting position here
                                 contact.penetration += deltaPosition.scalarProduct(contact.contactNormal) * (1 if b else -1)
 
             self.positionIterationsUsed+=1
 
+    def adjustVelocitiesByHeap(self, contactArray, numContacts, duration):
+        '''
+            Same as adjustVelocities, but the contact with max velocity change is taken from a max heap
+            and only contacts sharing a body with the resolved contact are updated
+            ---------
+            args:
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
+                duration     - double - duration of time step
+        '''
+
+        velocityChange = [Vector(),Vector()]
+        rotationChange = [Vector(),Vector()]
+        deltaVel = Vector()
+
+        if numContacts == 0: return
+        adjacency = self.buildAdjacency(contactArray, numContacts)
+        heap = IndexedMaxHeap([contactArray[index].desiredDeltaVelocity for index in range(numContacts)])
+
+        self.velocityIterationsUsed = 0
+        while (self.velocityIterationsUsed < self.velocityIterations):
+            #Find contact with max magnitude of velocity change
+            index, max = heap.top()
+            if max <= self.velocityEpsilon: break
+            desiredContact = contactArray[index]
+
+            #Match awake state of two bodies in contact
+            desiredContact.matchAwakeState()
+
+            #Resolve contact velocity
+            desiredContact.applyVelocityChange(velocityChange, rotationChange)
+
+            #Only contacts of the two bodies need recalculation of closing velocity
+            for d in range(2):
+                if not desiredContact.body[d]: continue
+                for index, b in adjacency[desiredContact.body[d]]:
+                    contact = contactArray[index]
+                    rotationChange[d].vectorProductInto(contact.relativeContactPosition[b], deltaVel)
+                    deltaVel += velocityChange[d]
+
+                    #Negative change in second object
+                    contact.contactVelocity.addScaledVector(contact.contactToWorld.transformTransposeInto(deltaVel, deltaVel), -1 if b else 1)
+                    contact.calculateDesiredDeltaVelocity(duration)
+                    heap.update(index, contact.desiredDeltaVelocity)
+            self.velocityIterationsUsed+=1
+
+    def adjustPositionsByHeap(self, contactArray, numContacts, duration):
+        '''
+            Same as adjustPositions, but the contact with max interpenteration is taken from a max heap
+            and only contacts sharing a body with the resolved contact are updated
+            ---------
+            args:
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
+                duration     - double - duration of time step
+        '''
+
+        linearChange = [Vector(), Vector()]
+        angularChange = [Vector(), Vector()]
+        deltaPosition = Vector()
+
+        if numContacts == 0: return
+        adjacency = self.buildAdjacency(contactArray, numContacts)
+        heap = IndexedMaxHeap([contactArray[index].penetration for index in range(numContacts)])
+
+        self.positionIterationsUsed = 0
+        while self.positionIterationsUsed < self.positionIterations:
+            #Find contact with max interpenteration
+            index, max = heap.top()
+            if max <= self.positionEpsilon: break
+            desiredContact = contactArray[index]
+
+            #Match awake state of two bodies in contact
+            desiredContact.matchAwakeState()
+
+            #Resolve contact penetration
+            desiredContact.applyPositionChange(linearChange, angularChange, max)
+
+            #Only contacts of the two bodies need recalculation of penetration
+            for d in range(2):
+                if not desiredContact.body[d]: continue
+                for index, b in adjacency[desiredContact.body[d]]:
+                    contact = contactArray[index]
+                    angularChange[d].vectorProductInto(contact.relativeContactPosition[b], deltaPosition)
+                    deltaPosition += linearChange[d]
+
+                    #Sign is positive only for second body as we are subtracting position here
+                    contact.penetration += deltaPosition.scalarProduct(contact.contactNormal) * (1 if b else -1)
+                    heap.update(index, contact.penetration)
+
+            self.positionIterationsUsed+=1
+
 class ContactGenerator(ABC):
+    '''
+        Abstract class of contact generators registered in World.contactGenRegistry
+        addContact(contact, limit) writes at most limit contacts and returns how many it wrote
+        By default contact is a list to append new Contact objects to, generators setting usesPool to True
+        get the CollisionData of the world instead and fill contacts taken from its pool with
+        getContact(offset), which allocates nothing once the pool is large enough
+        ---------
+        properties:
+            usesPool - bool - True if addContact takes a CollisionData instead of a list
+    '''
+
+    usesPool = False
+
     @abstractmethod
     def addContact(self, contact, limit):
         pass
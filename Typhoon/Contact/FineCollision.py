@@ -9,6 +9,13 @@ class CollisionPrimitive:
             body      - RigidBody - Rigidbody which is surrounded by this primitive
             offset    - Matrix4   - Offset of the primitive from rigid body center
             transform - Matrix4   - Resultant tranformation of the primitive
+        ---------
+        methods:
+            calculateInternals  - Calculate transform matrix of primitaive from body transform matrix and offset
+            getAxis             - Return a specific axis vector of transform of primitive
+            getTransform        - Return the transform of the primitive
+            getBoundingRadius   - Return radius of a sphere centered at the primitive which encloses it
+            isAwake             - Return true if the primitive belongs to an awake body with finite mass
     '''
 
     def __init__(self):
@@ -26,7 +33,9 @@ class CollisionPrimitive:
             Calculate transform matrix of primitaive from body transform matrix and offset
         '''
 
-        self.transform = self.body.getTransform() * self.offset
+        #The transform is updated in place, ManifoldCache keeps copies of its data
+        if self.transform is None: self.transform = Matrix4()
+        self.body.transformMatrix.mulInto(self.offset, self.transform)
 
     def getAxis(self, index):
         '''
@@ -44,6 +53,20 @@ class CollisionPrimitive:
         '''
         return self.transform.copy()
 
+    def getBoundingRadius(self):
+        '''
+            Return radius of a sphere centered at the primitive which encloses it, used by coarse collision
+        '''
+
+        return 0
+
+    def isAwake(self):
+        '''
+            Return true if the primitive belongs to an awake body with finite mass, which can move
+        '''
+
+        return self.body is not None and self.body.isAwake and self.body.inverseMass > 0
+
 class CollisionSphere(CollisionPrimitive):
     '''
         Class representes a sphere which surroundes the body for approximate contact resolution
@@ -63,6 +86,13 @@ class CollisionSphere(CollisionPrimitive):
         super().__init__()
         self.radius = 0
 
+    def getBoundingRadius(self):
+        '''
+            Return radius of a sphere centered at the primitive which encloses it
+        '''
+
+        return self.radius
+
 class CollisionBox(CollisionPrimitive):
     '''
         Class representes a box which surroundes the body for approximate contact resolution
@@ -82,6 +112,13 @@ class CollisionBox(CollisionPrimitive):
         super().__init__()
         self.halfSize = None
 
+    def getBoundingRadius(self):
+        '''
+            Return radius of a sphere centered at the primitive which encloses it
+        '''
+
+        return self.halfSize.magnitude()
+
 class CollisionPlane: 
     '''
         Class representes an immovable plane in the world
@@ -103,8 +140,22 @@ class CollisionPlane:
 class IntersectionTests:
     '''
         Wrapper class for intersection tests, used to define early outs in corase collision detection
+        ---------
+        methods:
+            transformToAxis     - project box halfsizes onto an axis
+            overlapOnAxis       - return true if two boxes overlap along an axis
+            boundingSpheres     - return true if bounding spheres of two primitives overlap
+            boxAxesInto         - store the 15 separating axis candidates of two boxes and the vector between their centres
+            sphereAndSphere     - return true if two spheres intersect
+            boxAndSphere        - return true if a box and a sphere intersect
+            boxAndBox           - return true if two boxes intersect
+            boxAndHalfSpace     - return true if a box intersects a half space
     '''
 
+    #Scratch vectors of boxAndBox, the 15 candidate axes and the vector between the centres
+    scratchAxes = tuple(Vector() for i in range(15))
+    scratchCentre = Vector()
+
     @staticmethod
     def transformToAxis(box: CollisionBox, axis: Vector):
         '''
@@ -114,10 +165,119 @@ class IntersectionTests:
                 box  - CollisionBox
                 axis - Vector
         '''
-        return box.halfSize.x * abs(axis * box.getAxis(0)) +\
-               box.halfSize.y * abs(axis * box.getAxis(1)) +\
-               box.halfSize.z * abs(axis * box.getAxis(2))
 
+        #Columns of the box transform are read in place, this runs for every axis tested between boxes
+        data = box.transform.data
+        return box.halfSize.x * abs(axis.x * data[0] + axis.y * data[4] + axis.z * data[8]) +\
+               box.halfSize.y * abs(axis.x * data[1] + axis.y * data[5] + axis.z * data[9]) +\
+               box.halfSize.z * abs(axis.x * data[2] + axis.y * data[6] + axis.z * data[10])
+
+
+    @staticmethod
+    def overlapOnAxis(one: CollisionBox, two: CollisionBox, axis: Vector, toCentre: Vector):
+        '''
+            class method Return true if projections of two boxes on an axis overlap
+            ---------
+            args:
+                one      - CollisionBox
+                two      - CollisionBox
+                axis     - Vector - normalized axis
+                toCentre - Vector - vector from center of one to center of two
+        '''
+
+        oneProject = IntersectionTests.transformToAxis(one, axis)
+        twoProject = IntersectionTests.transformToAxis(two, axis)
+        distance = abs(toCentre * axis)
+        return distance < oneProject + twoProject
+
+    @staticmethod
+    def boundingSpheres(one: CollisionPrimitive, two: CollisionPrimitive):
+        '''
+            class method Return true if bounding spheres of two primitives overlap, used as the cheapest early out
+            ---------
+            args:
+                one - CollisionPrimitive
+                two - CollisionPrimitive
+        '''
+
+        a, b = one.transform.data, two.transform.data
+        radius = one.getBoundingRadius() + two.getBoundingRadius()
+        return (a[3]-b[3])**2 + (a[7]-b[7])**2 + (a[11]-b[11])**2 < radius * radius
+
+    @staticmethod
+    def boxAxesInto(one: CollisionBox, two: CollisionBox, axes, toCentre: Vector):
+        '''
+            class method Store the 3 face axes of one, the 3 face axes of two and the 9 cross products of
+            their edges in axes, and the vector from center of one to center of two in toCentre
+            Axes are read from the transform data and are not normalized, return axes, nothing is allocated
+            ---------
+            args:
+                one      - CollisionBox
+                two      - CollisionBox
+                axes     - sequence of 15 Vector - receives the axes
+                toCentre - Vector                - receives the vector between the centres
+        '''
+
+        a, b = one.transform.data, two.transform.data
+        for i in range(3):
+            axes[i].set(a[i], a[i+4], a[i+8])
+            axes[i+3].set(b[i], b[i+4], b[i+8])
+        for i in range(3):
+            for j in range(3):
+                axes[i].vectorProductInto(axes[j+3], axes[6 + i*3 + j])
+        toCentre.set(b[3]-a[3], b[7]-a[7], b[11]-a[11])
+        return axes
+
+    @staticmethod
+    def sphereAndSphere(one: CollisionSphere, two: CollisionSphere):
+        '''
+            class method Return true if two spheres intersect
+            ---------
+            args:
+                one - CollisionSphere
+                two - CollisionSphere
+        '''
+
+        midline = one.getAxis(3) - two.getAxis(3)
+        return midline.squareMagnitude() < (one.radius + two.radius)**2
+
+    @staticmethod
+    def boxAndSphere(box: CollisionBox, sphere: CollisionSphere):
+        '''
+            class method Return true if a box and a sphere intersect
+            ---------
+            args:
+                box    - CollisionBox
+                sphere - CollisionSphere
+        '''
+
+        #Sphere centre in box coordinates
+        centre = box.transform.transformInverse(sphere.getAxis(3))
+        closest = Vector(min(max(centre.x, -box.halfSize.x), box.halfSize.x),
+                         min(max(centre.y, -box.halfSize.y), box.halfSize.y),
+                         min(max(centre.z, -box.halfSize.z), box.halfSize.z))
+        return (closest - centre).squareMagnitude() <= sphere.radius * sphere.radius
+
+    @staticmethod
+    def boxAndBox(one: CollisionBox, two: CollisionBox):
+        '''
+            class method Return true if two boxes intersect, using separating axis test over
+            the 3 face axes of each box and the 9 cross products of their edges
+            ---------
+            args:
+                one - CollisionBox
+                two - CollisionBox
+        '''
+
+        if not IntersectionTests.boundingSpheres(one, two): return False
+        toCentre = IntersectionTests.scratchCentre
+        axes = IntersectionTests.boxAxesInto(one, two, IntersectionTests.scratchAxes, toCentre)
+        for axis in axes:
+            #Parallel edges give no axis
+            if axis.squareMagnitude() < 0.0001: continue
+            axis.normalize()
+            if not IntersectionTests.overlapOnAxis(one, two, axis, toCentre): return False
+        return True
 
     @staticmethod
     def boxAndHalfSpace(box: CollisionBox, plane: CollisionPlane):
@@ -136,27 +296,40 @@ class IntersectionTests:
 class CollisionData:
     '''
         Holds data for detecor to use in building contact data
+        Contacts are taken from a pool which is kept between frames, so no contacts are allocated
+        once the pool is large enough, only the first contactCount contacts of the pool are valid
         ---------
         properties:
-            contactArray - list   - Array to write contacts into, defined in the world, and passed here
+            contactArray - list   - Pool of contacts to write into, it can be defined in the world and passed here
             contactsLeft - int    - Contacts left
-            contactCount - int    - Contacts found until nw
+            contactCount - int    - Contacts found until now, index of the next free contact in the pool
             friction     - double - Frictin to write into any found collision
             restitution  - double - Restitution to write into any found collision
             tolerance    - double - Uncolliding objects this close should have collisions generated.
+        ---------
+        methods:
+            hasMoreContacts - Return true if we have contacts left
+            reset           - Reset data so it has no contacts used
+            reserve         - Grow the pool to hold a number of contacts
+            getContact      - Return a free contact from the pool
+            addContacts     - Add number of used contacts
     '''
 
-    def __init__(self):
+    def __init__(self, maxContacts = 0):
         '''
             Class constractor
+            ---------
+            args:
+                maxContacts - int = 0 - number of contacts to preallocate in the pool
         '''
 
-        self.contactArray = None
+        self.contactArray = []
         self.contactsLeft = 0
         self.contactCount = 0
         self.friction = 0
         self.restitution = 0
         self.tolerance = 0
+        self.reserve(maxContacts)
 
     def hasMoreContacts(self):
         '''
@@ -168,7 +341,8 @@ class CollisionData:
 
     def reset(self, maxContacts):
         '''
-            Reset data so it has no contacts used, It clears the countactArray as well
+            Reset data so it has no contacts used, contacts of the previous frame are kept
+            in the pool to be written over
             ---------
             args:
                 maxContacts - int
@@ -176,7 +350,30 @@ class CollisionData:
 
         self.contactsLeft = maxContacts
         self.contactCount = 0
-        self.contactArray.clear()
+        self.reserve(maxContacts)
+
+    def reserve(self, count):
+        '''
+            Grow the pool so it holds at least count contacts
+            ---------
+            args:
+                count - int
+        '''
+
+        for _ in range(count - len(self.contactArray)):
+            self.contactArray.append(Contact())
+
+    def getContact(self, offset = 0):
+        '''
+            Return a free contact from the pool, it is only used once addContacts is called
+            ---------
+            args:
+                offset - int = 0 - index of the contact after the last used contact
+        '''
+
+        index = self.contactCount + offset
+        if index >= len(self.contactArray): self.reserve(index + 1)
+        return self.contactArray[index]
 
     def addContacts(self, count):
         '''
@@ -193,8 +390,61 @@ class CollisionData:
 class CollisionDetector:
     '''
         Wrapper class holds the fine grained collision detection types
+        ---------
+        methods:
+            collide             - create contacts between any two primitives, used with coarse collision potential contacts
+            collideHalfSpace    - create contacts between any primitive and a plane
+            sphereAndSphere     - create a contact between two spheres
+            boxAndHalfSpace     - create contacts between box and plane
+            sphereAndHalfSpace  - create a contact with sphere and plane
+            boxAndSphere        - create a contact between a box and a sphere
+            boxAndBox           - create contacts between two boxes
     '''
 
+    #Scratch vectors of boxAndBox, the 15 candidate axes, the vector between the centres and a normalized axis
+    scratchAxes = tuple(Vector() for i in range(15))
+    scratchCentre = Vector()
+    scratchAxis = Vector()
+
+    @staticmethod
+    def collide(one, two, data):
+        '''
+            create contacts between two primitives by calling the matching test,
+            used to feed potential contacts of coarse collision detection
+            return number of contacts used, pairs without a test return 0
+            ---------
+            args:
+                one  - CollisionPrimitive
+                two  - CollisionPrimitive
+                data - CollisionData
+        '''
+
+        if isinstance(one, CollisionSphere):
+            if isinstance(two, CollisionSphere): return CollisionDetector.sphereAndSphere(one, two, data)
+            if isinstance(two, CollisionBox): return CollisionDetector.boxAndSphere(two, one, data)
+        elif isinstance(one, CollisionBox):
+            if isinstance(two, CollisionBox): return CollisionDetector.boxAndBox(one, two, data)
+            if isinstance(two, CollisionSphere): return CollisionDetector.boxAndSphere(one, two, data)
+        return 0
+
+    @staticmethod
+    def collideHalfSpace(primitive, plane, data):
+        '''
+            create contacts between a primitive and a plane by calling the matching test
+            return number of contacts used
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                plane     - CollisionPlane
+                data      - CollisionData
+        '''
+
+        if isinstance(primitive, CollisionBox):
+            return CollisionDetector.boxAndHalfSpace(primitive, plane, data)
+        if isinstance(primitive, CollisionSphere):
+            return CollisionDetector.sphereAndHalfSpace(primitive, plane, data)
+        return 0
+
     @staticmethod
     def sphereAndSphere(one: CollisionSphere, two: CollisionSphere, data: CollisionData):
         '''
@@ -219,11 +469,12 @@ class CollisionDetector:
         #Create normal
         normal = (midline * (1.0/size)).copy()
         #Create a contact with normal in planes direction
-        data.contactArray.append(Contact())
-        data.contactArray[-1].contactNormal = normal
-        data.contactArray[-1].contactPoint = positionOne + midline * 0.5
-        data.contactArray[-1].penetration = (one.radius+two.radius - size)
-        data.contactArray[-1].setBodyData(one.body, two.body,data.friction, data.restitution)
+        contact = data.getContact()
+        contact.contactNormal = normal
+        contact.contactPoint = positionOne + midline * 0.5
+        contact.penetration = (one.radius+two.radius - size)
+        contact.setBodyData(one.body, two.body,data.friction, data.restitution)
+        contact.feature = 0
         data.addContacts(1)
         
         return 1
@@ -261,20 +512,21 @@ class CollisionDetector:
             #Compare this to the plane's distance
             if vertexDistance <= plane.offset:
                 #Create the contact data
-                data.contactArray.append(Contact())
+                contact = data.getContact(contactsUsed)
                 #The contact point is halfway between the vertex and the
                 #plane - we multiply the direction by half the separation
                 #distance and add the vertex location.
-                data.contactArray[-1].contactPoint = plane.direction.copy()
-                data.contactArray[-1].contactPoint *= (vertexDistance-plane.offset)
-                data.contactArray[-1].contactPoint += vertexPos
-                data.contactArray[-1].contactNormal = plane.direction
-                data.contactArray[-1].penetration = plane.offset - vertexDistance
-                data.contactArray[-1].setBodyData(box.body, None, data.friction, data.restitution)
+                contact.contactPoint = plane.direction.copy()
+                contact.contactPoint *= (vertexDistance-plane.offset)
+                contact.contactPoint += vertexPos
+                contact.contactNormal = plane.direction
+                contact.penetration = plane.offset - vertexDistance
+                contact.setBodyData(box.body, None, data.friction, data.restitution)
+                contact.feature = i
 
                 #Check the next vertex
                 contactsUsed+=1
-                if contactsUsed == data.contactsLeft: return contactsUsed
+                if contactsUsed == data.contactsLeft: break
 
         data.addContacts(contactsUsed)
         return contactsUsed
@@ -299,11 +551,307 @@ class CollisionDetector:
         #Away or touching spheres
         if ballDistance >= 0: return 0
         #Create a contact with normal in plane's direction
-        data.contactArray.append(Contact())
-        data.contactArray[-1].contactNormal = plane.direction
-        data.contactArray[-1].penetration = -ballDistance
-        data.contactArray[-1].contactPoint = position - plane.direction * (ballDistance + sphere.radius)
-        data.contactArray[-1].setBodyData(sphere.body, None, data.friction, data.restitution)
+        contact = data.getContact()
+        contact.contactNormal = plane.direction
+        contact.penetration = -ballDistance
+        contact.contactPoint = position - plane.direction * (ballDistance + sphere.radius)
+        contact.setBodyData(sphere.body, None, data.friction, data.restitution)
+        contact.feature = 0
 
         data.addContacts(1);
-        return 1
\ No newline at end of file
+        return 1
+
+    @staticmethod
+    def boxAndSphere(box: CollisionBox, sphere: CollisionSphere, data: CollisionData):
+        '''
+            create a contact between a box and a sphere
+            return number of contacts used
+            ---------
+            args:
+                box    - CollisionBox
+                sphere - CollisionSphere
+                data   - CollisionData
+        '''
+
+        if data.contactsLeft <= 0: return 0
+
+        #Transform the centre of the sphere into box coordinates
+        centre = sphere.getAxis(3)
+        relCentre = box.transform.transformInverse(centre)
+        halfSize = box.halfSize
+
+        #Early out check to see if we can exclude the contact
+        if abs(relCentre.x) - sphere.radius > halfSize.x or\
+           abs(relCentre.y) - sphere.radius > halfSize.y or\
+           abs(relCentre.z) - sphere.radius > halfSize.z:
+            return 0
+
+        #Clamp each coordinate to the box
+        closestPt = Vector(min(max(relCentre.x, -halfSize.x), halfSize.x),
+                           min(max(relCentre.y, -halfSize.y), halfSize.y),
+                           min(max(relCentre.z, -halfSize.z), halfSize.z))
+
+        dist = (closestPt - relCentre).squareMagnitude()
+        if dist > sphere.radius * sphere.radius: return 0
+
+        if dist > 0:
+            closestPtWorld = box.transform.transform(closestPt)
+            normal = closestPtWorld - centre
+            normal.normalize()
+            penetration = sphere.radius - dist**(1/2)
+        else:
+            #Centre is inside the box, push it out through the nearest face
+            depths = [halfSize[i] - abs(relCentre[i]) for i in range(3)]
+            axis = depths.index(min(depths))
+            normal = box.getAxis(axis) * (-1 if relCentre[axis] > 0 else 1)
+            closestPtWorld = centre
+            penetration = sphere.radius + depths[axis]
+
+        contact = data.getContact()
+        contact.contactNormal = normal
+        contact.contactPoint = closestPtWorld
+        contact.penetration = penetration
+        contact.setBodyData(box.body, sphere.body, data.friction, data.restitution)
+        contact.feature = 0
+        data.addContacts(1)
+        return 1
+
+    @staticmethod
+    def penetrationOnAxis(one: CollisionBox, two: CollisionBox, axis: Vector, toCentre: Vector):
+        '''
+            Return how much two boxes overlap along an axis, negative if they are separated
+            ---------
+            args:
+                one      - CollisionBox
+                two      - CollisionBox
+                axis     - Vector - normalized axis
+                toCentre - Vector - vector from center of one to center of two
+        '''
+
+        oneProject = IntersectionTests.transformToAxis(one, axis)
+        twoProject = IntersectionTests.transformToAxis(two, axis)
+        distance = abs(toCentre * axis)
+        return oneProject + twoProject - distance
+
+    @staticmethod
+    def contactPoint(pOne, dOne, oneSize, pTwo, dTwo, twoSize, useOne):
+        '''
+            Return the point of closest approach of two edges, if the edges don't cross within their length
+            the middle of an edge is used, of edge one if useOne is true (an edge of one touches a face of two)
+            ---------
+            args:
+                pOne    - Vector - point on the middle of edge one
+                dOne    - Vector - direction of edge one
+                oneSize - double - half length of edge one
+                pTwo    - Vector - point on the middle of edge two
+                dTwo    - Vector - direction of edge two
+                twoSize - double - half length of edge two
+                useOne  - bool
+        '''
+
+        smOne = dOne.squareMagnitude()
+        smTwo = dTwo.squareMagnitude()
+        dpOneTwo = dTwo * dOne
+
+        toSt = pOne - pTwo
+        dpStaOne = dOne * toSt
+        dpStaTwo = dTwo * toSt
+
+        denom = smOne * smTwo - dpOneTwo * dpOneTwo
+
+        #Zero denominator indicates parrallel lines
+        if abs(denom) < 0.0001: return pOne if useOne else pTwo
+
+        mua = (dpOneTwo * dpStaTwo - smTwo * dpStaOne) / denom
+        mub = (smOne * dpStaTwo - dpOneTwo * dpStaOne) / denom
+
+        #If either of the edges has the nearest point out of bounds, then the edges
+        #aren't crossed, we have an edge-face contact
+        if mua > oneSize or mua < -oneSize or mub > twoSize or mub < -twoSize:
+            return pOne if useOne else pTwo
+
+        cOne = pOne + dOne * mua
+        cTwo = pTwo + dTwo * mub
+        return cOne * 0.5 + cTwo * 0.5
+
+    @staticmethod
+    def fillPointFaceBoxBox(one: CollisionBox, two: CollisionBox, toCentre: Vector, data: CollisionData, best: int, penetration):
+        '''
+            Write contacts between box two and a face of box one (the reference face)
+            The face of two facing the reference face is clipped by the sides of the reference face,
+            and a contact is used for each point of it behind the reference face, so a box resting on
+            a face gets up to 8 contacts, if there is none the deepest vertex of two is used
+            return number of contacts used
+            ---------
+            args:
+                one         - CollisionBox
+                two         - CollisionBox
+                toCentre    - Vector        - vector from center of one to center of two
+                data        - CollisionData
+                best        - int           - index of the axis of one which is the face normal
+                penetration - double        - penetration of the deepest vertex
+        '''
+
+        #The collision normal is one of the face axes of one, pointing from two to one
+        normal = one.getAxis(best)
+        if normal * toCentre > 0: normal = normal * -1
+
+        #The face of two most facing the reference face
+        twoAxes = [two.getAxis(i) for i in range(3)]
+        incident = max(range(3), key = lambda i: abs(twoAxes[i] * normal))
+        faceCentre = two.getAxis(3) + twoAxes[incident] * (two.halfSize[incident] if twoAxes[incident] * normal > 0 else -two.halfSize[incident])
+        u, v = [i for i in range(3) if i != incident]
+        edgeU = twoAxes[u] * two.halfSize[u]
+        edgeV = twoAxes[v] * two.halfSize[v]
+        polygon = [faceCentre + edgeU + edgeV, faceCentre - edgeU + edgeV, faceCentre - edgeU - edgeV, faceCentre + edgeU - edgeV]
+
+        #Clip the incident face by the four sides of the reference face
+        centre = one.getAxis(3)
+        for side in range(3):
+            if side == best: continue
+            axis = one.getAxis(side)
+            for sign in (1, -1):
+                offset = sign * (axis * centre) + one.halfSize[side]
+                clipped = []
+                for index, point in enumerate(polygon):
+                    nextPoint = polygon[(index + 1) % len(polygon)]
+                    distance = sign * (axis * point) - offset
+                    nextDistance = sign * (axis * nextPoint) - offset
+                    if distance <= 0: clipped.append(point)
+                    if (distance < 0 < nextDistance) or (nextDistance < 0 < distance):
+                        clipped.append(point + (nextPoint - point) * (distance / (distance - nextDistance)))
+                polygon = clipped
+                if not polygon: break
+            if not polygon: break
+
+        #Keep points behind the reference face
+        faceOffset = one.halfSize[best] - normal * centre
+        points = []
+        for point in polygon:
+            depth = faceOffset + normal * point
+            if depth >= 0: points.append((point, min(depth, penetration)))
+
+        if not points:
+            #Find the vertex of two colliding with the face
+            vertex = two.halfSize.copy()
+            if twoAxes[0] * normal < 0: vertex.x = -vertex.x
+            if twoAxes[1] * normal < 0: vertex.y = -vertex.y
+            if twoAxes[2] * normal < 0: vertex.z = -vertex.z
+            points.append((two.transform.transform(vertex), penetration))
+
+        contactsUsed = min(len(points), data.contactsLeft)
+        for index in range(contactsUsed):
+            point, depth = points[index]
+            contact = data.getContact(index)
+            contact.contactNormal = normal.copy()
+            contact.penetration = depth
+            contact.contactPoint = point
+            contact.setBodyData(one.body, two.body, data.friction, data.restitution)
+            contact.feature = best * 8 + index
+
+        return contactsUsed
+
+    @staticmethod
+    def boxAndBox(one: CollisionBox, two: CollisionBox, data: CollisionData):
+        '''
+            create contacts between two boxes, the separating axis with least penetration among
+            the 3 face axes of each box and 9 cross products of their edges gives the contact,
+            which are vertex-face contacts for face axes or an edge-edge contact otherwise
+            return number of contacts used
+            ---------
+            args:
+                one  - CollisionBox
+                two  - CollisionBox
+                data - CollisionData
+        '''
+
+        if data.contactsLeft <= 0: return 0
+        #Cheapest early out
+        if not IntersectionTests.boundingSpheres(one, two): return 0
+
+        #Vector between the two centres and the candidate axes, read from the transforms without allocating
+        toCentre = CollisionDetector.scratchCentre
+        axes = IntersectionTests.boxAxesInto(one, two, CollisionDetector.scratchAxes, toCentre)
+
+        #Assume there is no contact and find the axis with least penetration
+        pen = float('inf')
+        best = None
+        bestSingleAxis = None
+        for index, axis in enumerate(axes):
+            #Keep the best face axis in case of a parallel edge collision
+            if index == 6: bestSingleAxis = best
+
+            #Parallel edges give no axis
+            if axis.squareMagnitude() < 0.0001: continue
+            #Normalized into scratch, face axes are used unnormalized by the edge-edge case
+            axis = axis.copyInto(CollisionDetector.scratchAxis)
+            axis.normalize()
+
+            penetration = CollisionDetector.penetrationOnAxis(one, two, axis, toCentre)
+            #Separating axis found, early out
+            if penetration < 0: return 0
+            #Face axes are preferred over nearly equal edge axes, so resting boxes keep their face contacts
+            if index >= 6 and penetration * EDGE_AXIS_BIAS + EDGE_AXIS_SLOP >= pen: continue
+            if penetration < pen:
+                pen = penetration
+                best = index
+
+        if best is None: return 0
+
+        #Vertex of box two on a face of box one
+        if best < 3:
+            contactsUsed = CollisionDetector.fillPointFaceBoxBox(one, two, toCentre, data, best, pen)
+            data.addContacts(contactsUsed)
+            return contactsUsed
+
+        #Vertices of box one on a face of box two
+        if best < 6:
+            contactsUsed = CollisionDetector.fillPointFaceBoxBox(two, one, toCentre * -1, data, best - 3, pen)
+            #The contacts are between the same bodies as the other cases
+            for i in range(contactsUsed):
+                contact = data.getContact(i)
+                contact.swapBodies()
+                contact.feature += 24
+            data.addContacts(contactsUsed)
+            return contactsUsed
+
+        #Edge-edge contact, find out which axes, the normal is written into the contact's own vector
+        contact = data.getContact()
+        axis = axes[best].copyInto(contact.ownNormal)
+        axis.normalize()
+        best -= 6
+        oneAxisIndex = best // 3
+        twoAxisIndex = best % 3
+        oneAxis = axes[oneAxisIndex]
+        twoAxis = axes[twoAxisIndex + 3]
+
+        #The axis should point from box two to box one
+        if axis * toCentre > 0: axis.invert()
+
+        #Find the point in the middle of the colliding edge of each box, the edge runs along the
+        #collision axis so its component is 0, others are the side of the box facing the other one
+        ptOnOneEdge = [one.halfSize.x, one.halfSize.y, one.halfSize.z]
+        ptOnTwoEdge = [two.halfSize.x, two.halfSize.y, two.halfSize.z]
+        for i in range(3):
+            if i == oneAxisIndex: ptOnOneEdge[i] = 0
+            elif axes[i] * axis > 0: ptOnOneEdge[i] = -ptOnOneEdge[i]
+
+            if i == twoAxisIndex: ptOnTwoEdge[i] = 0
+            elif axes[i + 3] * axis < 0: ptOnTwoEdge[i] = -ptOnTwoEdge[i]
+
+        #Move them into world coordinates
+        ptOnOneEdge = one.transform.transform(Vector(*ptOnOneEdge))
+        ptOnTwoEdge = two.transform.transform(Vector(*ptOnTwoEdge))
+
+        #Point of closest approach of the two edges
+        vertex = CollisionDetector.contactPoint(ptOnOneEdge, oneAxis, one.halfSize[oneAxisIndex],
+                                                ptOnTwoEdge, twoAxis, two.halfSize[twoAxisIndex],
+                                                bestSingleAxis is not None and bestSingleAxis > 2)
+
+        contact.penetration = pen
+        contact.contactNormal = axis
+        contact.contactPoint = vertex
+        contact.setBodyData(one.body, two.body, data.friction, data.restitution)
+        contact.feature = 48 + best
+        data.addContacts(1)
+        return 1
@@ -0,0 +1,282 @@
+from Typhoon.Core import *
+from Typhoon.Contact.FineCollision import CollisionDetector, CollisionPlane
+
+class ManifoldPoint:
+    '''
+        A contact point kept by a manifold, stored in the space of the primitives so it follows them
+        ---------
+        properties:
+            localPoint  - Vector - contact point in the space of the first primitive
+            localAnchor - Vector - point in the space of the second primitive where penetration is measured, None for planes
+            localNormal - Vector - contact normal in the space of the second primitive, None for planes
+            planeOffset - double - for planes, difference between plane distance of the contact point and penetration
+            feature     - int    - feature of the contact, used by the resolver to match contacts between frames
+    '''
+
+    def __init__(self, localPoint, localAnchor, localNormal, planeOffset, feature):
+        '''
+            Class constractor
+            ---------
+            args:
+                localPoint  - Vector
+                localAnchor - Vector
+                localNormal - Vector
+                planeOffset - double
+                feature     - int
+        '''
+
+        self.localPoint = localPoint
+        self.localAnchor = localAnchor
+        self.localNormal = localNormal
+        self.planeOffset = planeOffset
+        self.feature = feature
+
+class ContactManifold:
+    '''
+        Contacts between two primitives, or a primitive and a plane, kept between frames
+        While the primitives barely moved since the contacts were generated, contacts are rebuilt
+        from the kept points instead of running the narrow phase again
+        ---------
+        properties:
+            primitives - list - the two primitives, the second one can be a CollisionPlane
+            isPlane    - bool - True if second primitive is a plane
+            points     - list - kept ManifoldPoints
+            transforms - list - transform data of each primitive when the points were generated
+            frame      - int  - last frame in which the manifold was used
+        ---------
+        methods:
+            build    - keep contacts generated by the narrow phase
+            getDrift - return how far any point of the primitives moved since the manifold was built
+            refresh  - write contacts of kept points with their current penetration
+    '''
+
+    def __init__(self, one, two):
+        '''
+            Class constractor
+            ---------
+            args:
+                one - CollisionPrimitive
+                two - CollisionPrimitive or CollisionPlane
+        '''
+
+        self.primitives = [one, two]
+        self.isPlane = isinstance(two, CollisionPlane)
+        self.points = []
+        self.transforms = [None, None]
+        self.frame = 0
+
+    def build(self, data, start, count):
+        '''
+            Keep contacts generated by the narrow phase, the first primitive is the first body of the contacts
+            ---------
+            args:
+                data  - CollisionData
+                start - int - index of first contact in data.contactArray
+                count - int - number of contacts
+        '''
+
+        one, two = self.primitives
+        self.points = []
+        self.transforms[0] = list(one.transform.data)
+        if not self.isPlane: self.transforms[1] = list(two.transform.data)
+
+        for index in range(start, start + count):
+            contact = data.contactArray[index]
+            localPoint = one.transform.transformInverse(contact.contactPoint)
+            if self.isPlane:
+                planeOffset = two.offset - contact.contactPoint * two.direction - contact.penetration
+                self.points.append(ManifoldPoint(localPoint, None, None, planeOffset, contact.feature))
+            else:
+                #Anchor is placed so that penetration = (anchor - point) . normal
+                anchor = contact.contactPoint + contact.contactNormal * contact.penetration
+                localAnchor = two.transform.transformInverse(anchor)
+                localNormal = two.transform.transformInverseDirection(contact.contactNormal)
+                self.points.append(ManifoldPoint(localPoint, localAnchor, localNormal, 0, contact.feature))
+
+    def getDrift(self):
+        '''
+            Return the max distance any point of the primitives moved since the manifold was built
+            taken as movement of the center plus bounding radius times change in rotation
+        '''
+
+        drift = 0
+        for primitive, snapshot in zip(self.primitives, self.transforms):
+            if snapshot is None: continue
+            data = primitive.transform.data
+            move = ((data[3]-snapshot[3])**2 + (data[7]-snapshot[7])**2 + (data[11]-snapshot[11])**2) ** 0.5
+            turn = sum((data[i]-snapshot[i])**2 for i in (0, 1, 2, 4, 5, 6, 8, 9, 10)) ** 0.5
+            drift += move + primitive.getBoundingRadius() * turn
+        return drift
+
+    def refresh(self, data, maxDrift, breakingDistance):
+        '''
+            Write contacts of kept points with their current penetration, points which separated
+            or slid more than breakingDistance are dropped
+            return number of contacts used, or None if the narrow phase has to run again
+            ---------
+            args:
+                data             - CollisionData
+                maxDrift         - double - max distance the primitives can move before narrow phase runs again
+                breakingDistance - double - max separation or sliding of a kept point
+        '''
+
+        if not self.points or self.getDrift() > maxDrift: return None
+
+        one, two = self.primitives
+        kept = []
+        used = 0
+        for point in self.points:
+            position = one.transform.transform(point.localPoint)
+            if self.isPlane:
+                normal = two.direction
+                penetration = two.offset - position * normal - point.planeOffset
+            else:
+                normal = two.transform.transformDirection(point.localNormal)
+                separation = two.transform.transform(point.localAnchor) - position
+                penetration = separation * normal
+                separation.addScaledVector(normal, -penetration)
+                if separation.magnitude() > breakingDistance: continue
+
+            if penetration < -breakingDistance: continue
+            kept.append(point)
+
+            if penetration < 0 or used >= data.contactsLeft: continue
+            contact = data.getContact(used)
+            contact.contactPoint = position
+            contact.contactNormal = normal
+            contact.penetration = penetration
+            contact.setBodyData(one.body, None if self.isPlane else two.body, data.friction, data.restitution)
+            contact.feature = point.feature
+            used += 1
+
+        self.points = kept
+        if not kept: return None
+        data.addContacts(used)
+        return used
+
+class ManifoldCache:
+    '''
+        Keeps a contact manifold for each colliding pair of primitives or primitive and plane,
+        so resting primitives skip the narrow phase and keep the features of their contacts
+        Used in place of CollisionDetector.collide and CollisionDetector.collideHalfSpace
+        ---------
+        properties:
+            manifolds        - dict   - manifold of each pair
+            maxDrift         - double - max distance primitives can move before narrow phase runs again for their pair
+            breakingDistance - double - kept points which separated or slid more than this are dropped
+            frame            - int    - current frame, manifolds not used in a frame are dropped by prune
+            reused           - int    - number of pairs which reused their manifold in this frame
+            built            - int    - number of pairs which ran the narrow phase in this frame
+        ---------
+        methods:
+            collide          - create contacts between two primitives
+            collideHalfSpace - create contacts between a primitive and a plane
+            prune            - start a new frame, dropping manifolds of pairs not collided in the last one
+            clear            - drop all manifolds
+    '''
+
+    def __init__(self, maxDrift = 0.05, breakingDistance = 0.02):
+        '''
+            Class constractor
+            ---------
+            args:
+                maxDrift         - double = 0.05 - max distance primitives can move before narrow phase runs again
+                breakingDistance - double = 0.02 - kept points which separated or slid more than this are dropped
+        '''
+
+        self.manifolds = {}
+        self.maxDrift = maxDrift
+        self.breakingDistance = breakingDistance
+        self.frame = 0
+        self.reused = 0
+        self.built = 0
+
+    def collide(self, one, two, data):
+        '''
+            create contacts between two primitives, from their manifold if they barely moved
+            return number of contacts used
+            ---------
+            args:
+                one  - CollisionPrimitive
+                two  - CollisionPrimitive
+                data - CollisionData
+        '''
+
+        key = (one, two) if id(one) < id(two) else (two, one)
+        return self.generate(key, one, two, data, CollisionDetector.collide)
+
+    def collideHalfSpace(self, primitive, plane, data):
+        '''
+            create contacts between a primitive and a plane, from their manifold if the primitive barely moved
+            return number of contacts used
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                plane     - CollisionPlane
+                data      - CollisionData
+        '''
+
+        return self.generate((primitive, plane), primitive, plane, data, CollisionDetector.collideHalfSpace)
+
+    def generate(self, key, one, two, data, narrowPhase):
+        '''
+            Refresh manifold of a pair, or run the narrow phase and keep its contacts
+            return number of contacts used
+            ---------
+            args:
+                key         - tuple    - key of the pair
+                one         - CollisionPrimitive
+                two         - CollisionPrimitive or CollisionPlane
+                data        - CollisionData
+                narrowPhase - function - collision test of the pair
+        '''
+
+        if data.contactsLeft <= 0: return 0
+
+        manifold = self.manifolds.get(key)
+        if manifold is not None:
+            manifold.frame = self.frame
+            used = manifold.refresh(data, self.maxDrift, self.breakingDistance)
+            if used is not None:
+                self.reused += 1
+                return used
+
+        start = data.contactCount
+        used = narrowPhase(one, two, data)
+        self.built += 1
+
+        if used == 0:
+            self.manifolds.pop(key, None)
+            return 0
+
+        #Points are kept on the primitive whose body is the first body of the contacts
+        if not isinstance(two, CollisionPlane) and data.contactArray[start].body[0] is not one.body:
+            one, two = two, one
+
+        if manifold is None:
+            manifold = ContactManifold(one, two)
+            manifold.frame = self.frame
+            self.manifolds[key] = manifold
+        else:
+            manifold.primitives = [one, two]
+        manifold.build(data, start, used)
+        return used
+
+    def prune(self):
+        '''
+            Start a new frame, dropping manifolds of pairs which weren't collided in the last one
+            Called once at the start of collision detection of each frame
+        '''
+
+        for key in [key for key, manifold in self.manifolds.items() if manifold.frame != self.frame]:
+            del self.manifolds[key]
+        self.frame += 1
+        self.reused = 0
+        self.built = 0
+
+    def clear(self):
+        '''
+            Drop all manifolds
+        '''
+
+        self.manifolds.clear()
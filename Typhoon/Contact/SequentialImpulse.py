@@ -0,0 +1,208 @@
+from Typhoon.Core import *
+from Typhoon.Contact.Contact import ContactResolver
+
+class ContactConstraint:
+    '''
+        Holds data of a contact used by the sequential impulse resolver, calculated once per frame
+        Each contact is constrained along three axes, the contact normal and two tangents for friction
+        A sleeping body is held still as if it had infinite mass, it is woken when position resolution moves it
+        ---------
+        properties:
+            contact            - Contact - contact which is constrained
+            key                - tuple   - (body one, body two, feature) used to match the contact in next frame
+            axis               - list    - three world axes of the contact, normal first
+            relativeAxis       - list    - for each body, the cross product of its contact position with each axis
+            angularChange      - list    - for each body, rotation change per unit impulse along each axis
+            effectiveMass      - list    - impulse needed for a unit change of velocity along each axis
+            targetVelocity     - list    - closing velocity wanted along each axis
+            accumulatedImpulse - list    - impulse applied along each axis until now in this frame
+    '''
+
+    def __init__(self, contact):
+        '''
+            Class constractor, contact internals must be calculated first
+            ---------
+            args:
+                contact - Contact
+        '''
+
+        self.contact = contact
+        self.key = (contact.body[0], contact.body[1], contact.feature)
+        self.axis = [contact.contactToWorld.getAxisVector(i) for i in range(3)]
+        self.relativeAxis = [None, None]
+        self.angularChange = [None, None]
+        self.effectiveMass = [0, 0, 0]
+        self.accumulatedImpulse = [0, 0, 0]
+
+        #Change in velocity along an axis due to unit impulse along it
+        deltaVelocity = [0, 0, 0]
+        for b in range(2):
+            body = contact.body[b]
+            if body is None or not body.isAwake: continue
+            relativeAxis = [contact.relativeContactPosition[b] % axis for axis in self.axis]
+            angularChange = [body.inverseInertiaTensorWorld.transform(r) for r in relativeAxis]
+            for i in range(3):
+                deltaVelocity[i] += body.inverseMass + angularChange[i] * relativeAxis[i]
+            self.relativeAxis[b] = relativeAxis
+            self.angularChange[b] = angularChange
+
+        for i in range(3):
+            if deltaVelocity[i] > 0: self.effectiveMass[i] = 1/deltaVelocity[i]
+
+        #Bounce is taken from the velocity of the contact before resolution, friction stops sliding
+        self.targetVelocity = [contact.contactVelocity.x + contact.desiredDeltaVelocity, 0, 0]
+
+    def getRelativeVelocity(self, i):
+        '''
+            Return closing velocity of the contact along one of its axes
+            ---------
+            args:
+                i - int - index of the axis, 0 for the normal
+        '''
+
+        velocity = 0
+        for b in range(2):
+            body = self.contact.body[b]
+            if body is None or not body.isAwake: continue
+            #(w x r).a = w.(r x a)
+            bodyVelocity = body.velocity * self.axis[i] + body.rotation * self.relativeAxis[b][i]
+            velocity += bodyVelocity if b == 0 else -bodyVelocity
+        return velocity
+
+    def applyImpulse(self, i, impulse):
+        '''
+            Apply an impulse along one of the axes, on first body and its opposite on the second body
+            ---------
+            args:
+                i       - int    - index of the axis, 0 for the normal
+                impulse - double - magnitude of the impulse
+        '''
+
+        for b in range(2):
+            body = self.contact.body[b]
+            if body is None or not body.isAwake: continue
+            sign = 1 if b == 0 else -1
+            body.velocity.addScaledVector(self.axis[i], sign * impulse * body.inverseMass)
+            body.rotation.addScaledVector(self.angularChange[b][i], sign * impulse)
+
+    def getImpulse(self):
+        '''
+            Return the total impulse applied on the contact as a world vector
+        '''
+
+        impulse = Vector()
+        for i in range(3):
+            impulse.addScaledVector(self.axis[i], self.accumulatedImpulse[i])
+        return impulse
+
+class SequentialImpulseResolver(ContactResolver):
+    '''
+        Contact resolver which resolves velocity by sweeping over all contacts each iteration (Gauss-Seidel),
+        applying the impulse each contact needs. The impulse accumulated on a contact during a frame is clamped
+        instead of each applied impulse, so the contact can only push and friction stays inside its cone
+        Impulses of the previous frame are applied first (warm starting), so resting contacts as stacks
+        converge in a few iterations. Interpenetration is resolved as in ContactResolver
+        Can be used in World in place of ContactResolver, velocityIterations limits the number of sweeps
+        ---------
+        properties:
+            warmStartFactor - double - fraction of previous frame impulses applied at frame start, 0 disables warm starting
+            impulseCache    - dict   - total impulse of each contact in last frame keyed by (body one, body two, feature)
+        ---------
+        methods:
+            resolveContacts  - resolve all contacts in simulation
+            adjustVelocities - resolve velocity of contacts by sequential impulses
+    '''
+
+    def __init__(self, velocityIterations, positionIterations, velocityEpsilon = 0.01, positionEpsilon = 0.01, useIslands = True, useHeap = False, warmStartFactor = 1):
+        '''
+            Class constractor
+            ---------
+            args:
+                velocityIterations  - int           - Max number of sweeps over contacts for velocity resolving
+                positionIterations  - int           - Max number of iterations for position resolving
+                velocityEpsilon     - double = 0.01 - Sweeps stop when no contact velocity changes more than this
+                positionEpsilon     - double = 0.01 - Values smaller than this value considered to not be interpenteration
+                useIslands          - bool = True   - resolve each island of interacting bodies separately
+                useHeap             - bool = False  - use a max heap to find the worst interpenetration
+                warmStartFactor     - double = 1    - fraction of previous frame impulses applied at frame start
+        '''
+
+        super().__init__(velocityIterations, positionIterations, velocityEpsilon, positionEpsilon, useIslands, useHeap)
+        self.warmStartFactor = warmStartFactor
+        self.impulseCache = {}
+        self.nextImpulseCache = {}
+
+    def resolveContacts(self, contactArray, numContacts, duration):
+        '''
+            resolve all contacts in simulation
+            ---------
+            args:
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
+                duration     - double - duration of time step
+        '''
+
+        #Contacts which aren't resolved this frame are dropped from the cache
+        self.nextImpulseCache = {}
+        super().resolveContacts(contactArray, numContacts, duration)
+        self.impulseCache = self.nextImpulseCache
+
+    def adjustVelocities(self, contactArray, numContacts, duration):
+        '''
+            Resolve velocity of contacts by sweeping over them and applying impulses until velocities
+            change less than velocityEpsilon or velocityIterations sweeps are done
+            ---------
+            args:
+                contactArray - list   - Array of all contacts in simulation
+                numContacts  - int    - Number of contacts used from the start of the array
+                duration     - double - duration of time step
+        '''
+
+        constraints = [ContactConstraint(contactArray[index]) for index in range(numContacts)]
+
+        #Warm start, impulses are projected on the new axes of the contact
+        if self.warmStartFactor > 0:
+            for constraint in constraints:
+                impulse = self.impulseCache.get(constraint.key)
+                if impulse is None: continue
+                normalImpulse = max(impulse * constraint.axis[0], 0) * self.warmStartFactor
+                constraint.accumulatedImpulse[0] = normalImpulse
+                constraint.applyImpulse(0, normalImpulse)
+
+                maxFriction = constraint.contact.friction * normalImpulse
+                for i in (1, 2):
+                    frictionImpulse = min(max(impulse * constraint.axis[i] * self.warmStartFactor, -maxFriction), maxFriction)
+                    constraint.accumulatedImpulse[i] = frictionImpulse
+                    constraint.applyImpulse(i, frictionImpulse)
+
+        self.velocityIterationsUsed = 0
+        while self.velocityIterationsUsed < self.velocityIterations:
+            maxChange = 0
+            for constraint in constraints:
+                accumulatedImpulse = constraint.accumulatedImpulse
+                for i in range(3):
+                    if i == 0:
+                        low, high = 0, float('inf')
+                    else:
+                        #Friction can't be larger than friction coefficient times normal impulse
+                        high = constraint.contact.friction * accumulatedImpulse[0]
+                        if high <= 0: break
+                        low = -high
+
+                    velocityChange = constraint.targetVelocity[i] - constraint.getRelativeVelocity(i)
+                    impulse = velocityChange * constraint.effectiveMass[i]
+
+                    #Clamp total impulse, then apply what is left of the change
+                    total = min(max(accumulatedImpulse[i] + impulse, low), high)
+                    impulse = total - accumulatedImpulse[i]
+                    accumulatedImpulse[i] = total
+                    if impulse == 0: continue
+                    constraint.applyImpulse(i, impulse)
+
+                    if constraint.effectiveMass[i] > 0: maxChange = max(maxChange, abs(impulse / constraint.effectiveMass[i]))
+
+            self.velocityIterationsUsed += 1
+            if maxChange < self.velocityEpsilon: break
+
+        for constraint in constraints:
+            self.nextImpulseCache[constraint.key] = constraint.getImpulse()
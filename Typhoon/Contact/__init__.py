@@ -1,3 +1,6 @@
-#from Typhoon.Contact.CoarseCollision import *
+from Typhoon.Contact.CoarseCollision import *
 from Typhoon.Contact.FineCollision import *
-from Typhoon.Contact.Contact import *
\ No newline at end of file
+from Typhoon.Contact.BatchCollision import *
+from Typhoon.Contact.Manifold import *
+from Typhoon.Contact.Contact import *
+from Typhoon.Contact.SequentialImpulse import *
@@ -5,6 +5,9 @@ import sys
 #Any value under which will be rendered zero
 REAL_EPSILON = 10**-9
 
+#Quaternions whose dot product is above 1 minus this are interpolated by nlerp instead of slerp
+SLERP_EPSILON = 10**-6
+
 #Holds energy under which the object will be sleeping and wont react 
 SLEEP_EPSILON = 0.3
 
@@ -15,3 +18,7 @@ MAX_FLOAT = float_info.max
 
 #Max int value in python
 MAX_INT = maxsize
+
+#Box-box collision uses an edge axis only if its penetration times bias plus slop is smaller than the best face axis
+EDGE_AXIS_BIAS = 1.05
+EDGE_AXIS_SLOP = 0.001
@@ -1,11 +1,12 @@
 from Typhoon.Core.Vector import Vector
+from Typhoon.Core.Vector3Array import Vector3Array
 
 class Matrix3:
     '''
         Class responsible for representing a 3x3 Matrix
         ---------
         properties:
-            data - List - hold 9 components of matrix in 1D array
+            data - List - hold 9 components of matrix in 1D array, its size never changes
         ---------
         methods:
             setComponent            -   Set matrix components from 3 vectors
@@ -26,14 +27,22 @@ class Matrix3:
             setOrientation          -   Set matrix to be a rotational matrix of a quaternion
             linearInterpolate       -   Return a matrix with interploation of 2 other matrices
             copy                    -   Return a deep copied version of current matrix
+            transformInto           -   Store a vector transformed by this matrix in out
+            transformTransposeInto  -   Store a vector transformed by transpose of this matrix in out
+            mulInto                 -   Store product of this matrix and another one in out
+            copyInto                -   Store components of this matrix in out
+            transformArray          -   Return a vector array transformed by this matrix
+            transformTransposeArray -   Return a vector array transformed by transpose of this matrix
         ---------
         opertaion overload:
             *=  -   multiply current matrix by a scaler or matrix
             *   -   Returns matrix3 or a vector depending on input
             +=  -   adds a matrix to current matrix
     '''
-     
-    
+
+    #Fixed attributes, instances have no __dict__
+    __slots__ = ('data',)
+
     def __init__(self, d0 = 0, d1 = 0, d2 = 0, d3 = 0, d4 = 0, d5 = 0, d6 = 0, d7 = 0, d8 = 0):
         '''
             Class constractor
@@ -42,16 +51,7 @@ class Matrix3:
                 d0-d8 - double = 0 - represent 9 components of 3x3 Matrix, filled as rows
         '''
 
-        self.data = []  
-        self.data.append(d0)
-        self.data.append(d1)
-        self.data.append(d2)
-        self.data.append(d3)
-        self.data.append(d4)
-        self.data.append(d5)
-        self.data.append(d6)
-        self.data.append(d7)
-        self.data.append(d8)
+        self.data = [d0, d1, d2, d3, d4, d5, d6, d7, d8]
 
     def setComponent(self, compOne , compTwo , compThree):
         '''
@@ -284,6 +284,110 @@ class Matrix3:
             vector.x * self.data[1] + vector.y * self.data[4] + vector.z * self.data[7], 
             vector.x * self.data[2] + vector.y * self.data[5] + vector.z * self.data[8])
            
+    def transformInto(self, vector, out):
+        '''
+            Store a vector transformed by this matrix in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be vector
+        '''
+
+        data = self.data
+        x = vector.x * data[0] + vector.y * data[1] + vector.z * data[2]
+        y = vector.x * data[3] + vector.y * data[4] + vector.z * data[5]
+        z = vector.x * data[6] + vector.y * data[7] + vector.z * data[8]
+        out.x = x
+        out.y = y
+        out.z = z
+        return out
+
+    def transformTransposeInto(self, vector, out):
+        '''
+            Store a vector transformed by transpose of this matrix in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be vector
+        '''
+
+        data = self.data
+        x = vector.x * data[0] + vector.y * data[3] + vector.z * data[6]
+        y = vector.x * data[1] + vector.y * data[4] + vector.z * data[7]
+        z = vector.x * data[2] + vector.y * data[5] + vector.z * data[8]
+        out.x = x
+        out.y = y
+        out.z = z
+        return out
+
+    def mulInto(self, matrix, out):
+        '''
+            Store this matrix multiplied by another one in out and return out, nothing is allocated
+            ---------
+            args:
+                matrix - Matrix3
+                out    - Matrix3 - receives the result, may be this matrix or matrix
+        '''
+
+        a = self.data
+        b = matrix.data
+        out.data[:] = (
+            a[0]*b[0] + a[1]*b[3] + a[2]*b[6],
+            a[0]*b[1] + a[1]*b[4] + a[2]*b[7],
+            a[0]*b[2] + a[1]*b[5] + a[2]*b[8],
+
+            a[3]*b[0] + a[4]*b[3] + a[5]*b[6],
+            a[3]*b[1] + a[4]*b[4] + a[5]*b[7],
+            a[3]*b[2] + a[4]*b[5] + a[5]*b[8],
+
+            a[6]*b[0] + a[7]*b[3] + a[8]*b[6],
+            a[6]*b[1] + a[7]*b[4] + a[8]*b[7],
+            a[6]*b[2] + a[7]*b[5] + a[8]*b[8])
+        return out
+
+    def copyInto(self, out):
+        '''
+            Store the components of this matrix in out and return out
+            ---------
+            args:
+                out - Matrix3
+        '''
+
+        out.data[:] = self.data
+        return out
+
+    def transformArray(self, vectors, out = None):
+        '''
+            Return a vector array of the vectors transformed by this matrix, same arithmetic as transform
+            ---------
+            args:
+                vectors - Vector3Array
+                out     - Vector3Array = None - receives the result, may be vectors, a new vector array if None
+        '''
+
+        d = self.data
+        x, y, z = vectors.x, vectors.y, vectors.z
+        return Vector3Array.fromComponents(
+            x*d[0] + y*d[1] + z*d[2],
+            x*d[3] + y*d[4] + z*d[5],
+            x*d[6] + y*d[7] + z*d[8], out)
+
+    def transformTransposeArray(self, vectors, out = None):
+        '''
+            Return a vector array of the vectors transformed by transpose of this matrix, same arithmetic as transformTranspose
+            ---------
+            args:
+                vectors - Vector3Array
+                out     - Vector3Array = None - receives the result, may be vectors, a new vector array if None
+        '''
+
+        d = self.data
+        x, y, z = vectors.x, vectors.y, vectors.z
+        return Vector3Array.fromComponents(
+            x*d[0] + y*d[3] + z*d[6],
+            x*d[1] + y*d[4] + z*d[7],
+            x*d[2] + y*d[5] + z*d[8], out)
+
     def getRowVector(self, i):
         '''
             return a vector representing row i in this matrix
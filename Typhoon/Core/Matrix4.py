@@ -1,5 +1,6 @@
 from Typhoon.Core.Vector import Vector
 from Typhoon.Core.Quaternion import Quaternion
+from Typhoon.Core.Vector3Array import Vector3Array
 
 class Matrix4:
     '''
@@ -8,7 +9,7 @@ class Matrix4:
         It holds the rotation matrix of an object as well as a position
         ---------
         properties:
-            data - List - hold 12 components of matrix in 1D array
+            data - List - hold 12 components of matrix in 1D array, its size never changes
         ---------
         methods:
             setDiagonal                 -   Set matrx to be a diagonal matrix
@@ -23,10 +24,25 @@ class Matrix4:
             getAxisVector               -   Return a new vector representing a column in this matrix
             setOrientationAndPos        -   Sets this matrix to be the rotation matrix corresponding to  the given quaternion
             copy                        -   Return a deep copied version of current matrix
+            transformInto               -   Store a vector transformed by this matrix in out
+            transformDirectionInto      -   Store a direction transformed by this matrix in out
+            transformInverseDirectionInto - Store a direction transformed by inverse of this matrix in out
+            transformInverseInto        -   Store a vector transformed by transformational inverse of this matrix in out
+            getAxisVectorInto           -   Store a column of this matrix in out
+            mulInto                     -   Store product of this matrix and another one in out
+            copyInto                    -   Store components of this matrix in out
+            transformArray                      -   Return a vector array of points transformed by this matrix
+            transformDirectionArray             -   Return a vector array of directions transformed by this matrix
+            transformInverseArray               -   Return a vector array of points transformed by inverse of this matrix
+            transformInverseDirectionArray      -   Return a vector array of directions transformed by inverse of this matrix
         ---------
         opertaion overload:
             *  -   multiply current matrix by a matrix or vector
     '''
+
+    #Fixed attributes, instances have no __dict__
+    __slots__ = ('data',)
+
     def __init__(self, d0 = 1, d1 = 0,d2 = 0, d3 = 0,d4 = 0, d5 = 1,d6 = 0, d7 = 0,d8 = 0, d9=0, d10=1, d11=0):
         '''
             Class constractor
@@ -34,19 +50,7 @@ class Matrix4:
             args:
                 d0-d11 - double = 0
         '''
-        self.data = []  
-        self.data.append(d0)
-        self.data.append(d1)
-        self.data.append(d2)
-        self.data.append(d3)
-        self.data.append(d4)
-        self.data.append(d5)
-        self.data.append(d6)
-        self.data.append(d7)
-        self.data.append(d8)
-        self.data.append(d9)
-        self.data.append(d10)
-        self.data.append(d11)
+        self.data = [d0, d1, d2, d3, d4, d5, d6, d7, d8, d9, d10, d11]
 
     def setDiagonal(self,a,b,c):
         '''
@@ -266,6 +270,198 @@ class Matrix4:
 
         return Vector(self.data[i], self.data[i+4], self.data[i+8])
 
+    def transformInto(self, vector, out):
+        '''
+            Store a vector transformed by this matrix in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be vector
+        '''
+
+        data = self.data
+        x = vector.x * data[0] + vector.y * data[1] + vector.z * data[2] + data[3]
+        y = vector.x * data[4] + vector.y * data[5] + vector.z * data[6] + data[7]
+        z = vector.x * data[8] + vector.y * data[9] + vector.z * data[10] + data[11]
+        out.x = x
+        out.y = y
+        out.z = z
+        return out
+
+    def transformDirectionInto(self, vector, out):
+        '''
+            Store a direction transformed by this matrix in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be vector
+        '''
+
+        data = self.data
+        x = vector.x * data[0] + vector.y * data[1] + vector.z * data[2]
+        y = vector.x * data[4] + vector.y * data[5] + vector.z * data[6]
+        z = vector.x * data[8] + vector.y * data[9] + vector.z * data[10]
+        out.x = x
+        out.y = y
+        out.z = z
+        return out
+
+    def transformInverseDirectionInto(self, vector, out):
+        '''
+            Store a direction transformed by inverse of this matrix in out and return out, nothing is allocated
+            It is assumed that this matrix is a pure rotation matrix (inverse is transpose)
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be vector
+        '''
+
+        data = self.data
+        x = vector.x * data[0] + vector.y * data[4] + vector.z * data[8]
+        y = vector.x * data[1] + vector.y * data[5] + vector.z * data[9]
+        z = vector.x * data[2] + vector.y * data[6] + vector.z * data[10]
+        out.x = x
+        out.y = y
+        out.z = z
+        return out
+
+    def transformInverseInto(self, vector, out):
+        '''
+            Store a vector transformed by transformational inverse of this matrix in out and return out, nothing is allocated
+            It is assumed that this matrix is a pure rotation matrix (inverse is transpose)
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be vector
+        '''
+
+        data = self.data
+        tx = vector.x - data[3]
+        ty = vector.y - data[7]
+        tz = vector.z - data[11]
+        out.x = tx * data[0] + ty * data[4] + tz * data[8]
+        out.y = tx * data[1] + ty * data[5] + tz * data[9]
+        out.z = tx * data[2] + ty * data[6] + tz * data[10]
+        return out
+
+    def getAxisVectorInto(self, i, out):
+        '''
+            Store a column of this matrix in out and return out
+            ---------
+            args:
+                i   - int    - index of column
+                out - Vector - receives the column
+        '''
+
+        out.x = self.data[i]
+        out.y = self.data[i+4]
+        out.z = self.data[i+8]
+        return out
+
+    def mulInto(self, matrix, out):
+        '''
+            Store this matrix multiplied by another one in out and return out, nothing is allocated
+            ---------
+            args:
+                matrix - Matrix4
+                out    - Matrix4 - receives the result, may be this matrix or matrix
+        '''
+
+        a = self.data
+        b = matrix.data
+        out.data[:] = (
+            (b[0]*a[0]) + (b[4]*a[1]) + (b[8]*a[2]),
+            (b[1]*a[0]) + (b[5]*a[1]) + (b[9]*a[2]),
+            (b[2]*a[0]) + (b[6]*a[1]) + (b[10]*a[2]),
+            (b[3]*a[0]) + (b[7]*a[1]) + (b[11]*a[2]) + a[3],
+
+            (b[0]*a[4]) + (b[4]*a[5]) + (b[8]*a[6]),
+            (b[1]*a[4]) + (b[5]*a[5]) + (b[9]*a[6]),
+            (b[2]*a[4]) + (b[6]*a[5]) + (b[10]*a[6]),
+            (b[3]*a[4]) + (b[7]*a[5]) + (b[11]*a[6]) + a[7],
+
+            (b[0]*a[8]) + (b[4]*a[9]) + (b[8]*a[10]),
+            (b[1]*a[8]) + (b[5]*a[9]) + (b[9]*a[10]),
+            (b[2]*a[8]) + (b[6]*a[9]) + (b[10]*a[10]),
+            (b[3]*a[8]) + (b[7]*a[9]) + (b[11]*a[10]) + a[11])
+        return out
+
+    def copyInto(self, out):
+        '''
+            Store the components of this matrix in out and return out
+            ---------
+            args:
+                out - Matrix4
+        '''
+
+        out.data[:] = self.data
+        return out
+
+    def transformArray(self, vectors, out = None):
+        '''
+            Return a vector array of the points transformed by this matrix, same arithmetic as transform
+            ---------
+            args:
+                vectors - Vector3Array
+                out     - Vector3Array = None - receives the result, may be vectors, a new vector array if None
+        '''
+
+        d = self.data
+        x, y, z = vectors.x, vectors.y, vectors.z
+        return Vector3Array.fromComponents(
+            x*d[0] + y*d[1] + z*d[2] + d[3],
+            x*d[4] + y*d[5] + z*d[6] + d[7],
+            x*d[8] + y*d[9] + z*d[10] + d[11], out)
+
+    def transformDirectionArray(self, vectors, out = None):
+        '''
+            Return a vector array of the directions transformed by this matrix, same arithmetic as transformDirection
+            ---------
+            args:
+                vectors - Vector3Array
+                out     - Vector3Array = None - receives the result, may be vectors, a new vector array if None
+        '''
+
+        d = self.data
+        x, y, z = vectors.x, vectors.y, vectors.z
+        return Vector3Array.fromComponents(
+            x*d[0] + y*d[1] + z*d[2],
+            x*d[4] + y*d[5] + z*d[6],
+            x*d[8] + y*d[9] + z*d[10], out)
+
+    def transformInverseArray(self, vectors, out = None):
+        '''
+            Return a vector array of the points transformed by inverse of this matrix, assumed to be a pure rotation and translation, same arithmetic as transformInverse
+            ---------
+            args:
+                vectors - Vector3Array
+                out     - Vector3Array = None - receives the result, may be vectors, a new vector array if None
+        '''
+
+        d = self.data
+        x, y, z = vectors.x, vectors.y, vectors.z
+        x, y, z = x - d[3], y - d[7], z - d[11]
+        return Vector3Array.fromComponents(
+            x*d[0] + y*d[4] + z*d[8],
+            x*d[1] + y*d[5] + z*d[9],
+            x*d[2] + y*d[6] + z*d[10], out)
+
+    def transformInverseDirectionArray(self, vectors, out = None):
+        '''
+            Return a vector array of the directions transformed by inverse of this matrix, assumed to be a pure rotation, same arithmetic as transformInverseDirection
+            ---------
+            args:
+                vectors - Vector3Array
+                out     - Vector3Array = None - receives the result, may be vectors, a new vector array if None
+        '''
+
+        d = self.data
+        x, y, z = vectors.x, vectors.y, vectors.z
+        return Vector3Array.fromComponents(
+            x*d[0] + y*d[4] + z*d[8],
+            x*d[1] + y*d[5] + z*d[9],
+            x*d[2] + y*d[6] + z*d[10], out)
+
     def setOrientationAndPos(self,q,pos):
         '''
             Sets this matrix to be the rotation matrix corresponding to  the given quaternion
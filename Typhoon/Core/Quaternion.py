@@ -1,23 +1,58 @@
 from Typhoon.Core.Constants import *
+from Typhoon.Core.Vector import Vector
+from Typhoon.Core.Matrix3 import Matrix3
+from math import sin, cos, acos, atan2
+from Typhoon.Core.Vector3Array import Vector3Array
 
 class Quaternion:
     '''
-        Class responsible for representing a 3x3 Matrix
+        Class responsible for representing an orientation quaternion
         ---------
         properties:
-            data - List - hold 9 components of matrix in 1D array
+            r - double - real component
+            i - double - first complex component
+            j - double - second complex component
+            k - double - third complex component
         ---------
         methods:
             setComponent    -  Set matrix components from 3 vectors
             normalize       -  normalizes quartenion
             addScaledVector -  Add a scaled vector to the quaternion
             rotateByVector  -  rotate quaternion by current vector
+            mulInto         -  Store product of this quaternion and another one in out
+            copy            -  Return a copy of the quaternion
+            copyInto        -  Store components of this quaternion in out
+            rotateArray     -  Return a vector array rotated by this quaternion
+            squareMagnitude -  Return square magnitude of the quaternion
+            magnitude       -  Return magnitude of the quaternion
+            scalarProduct   -  Return the 4D dot product with another quaternion
+            conjugate       -  Return the conjugate quaternion
+            inverse         -  Return the inverse quaternion
+            invert          -  Set the quaternion to its inverse
+            rotate          -  Return a vector rotated by this quaternion
+            rotateInto      -  Store a vector rotated by this quaternion in out
+            rotateInverse   -  Return a vector rotated by the inverse of this quaternion
+            setAxisAngle    -  Set the quaternion to a rotation around an axis
+            fromAxisAngle   -  Return a quaternion of a rotation around an axis
+            toAxisAngle     -  Return the axis and angle of the rotation
+            setFromMatrix   -  Set the quaternion from a rotation matrix
+            fromMatrix      -  Return a quaternion of a rotation matrix
+            toMatrix3       -  Return the rotation matrix of the quaternion
+            toMatrix4       -  Return the transform matrix of the quaternion and a position
+            nlerp           -  Return normalized linear interpolation of 2 quaternions
+            slerp           -  Return spherical linear interpolation of 2 quaternions
+        ---------
+        Rotation matrices follow RigidBody.calculateDerivedData, data[1] = 2ij - 2rk, the rotation of a
+        vector v is q v q*
 
         ---------
         opertaion overload:
             *=  -   multiply current quaternion by another quaternion
     '''
 
+    #Fixed attributes, instances have no __dict__
+    __slots__ = ('r', 'i', 'j', 'k')
+
     ##Initialize zero rotation quaternion
     def __init__(self,r = 1,i = 0,j = 0,k = 0):
         '''
@@ -94,12 +129,19 @@ class Quaternion:
                 vector - Vector
                 scale  - double
         '''
-        q = Quaternion(0, vector.x * scale, vector.y * scale, vector.z * scale)
-        q *= self;
-        self.r += q.r * 0.5
-        self.i += q.i * 0.5
-        self.j += q.j * 0.5
-        self.k += q.k * 0.5
+
+        #Product of quaternion (0, vector * scale) and this one, without building the quaternion
+        x = vector.x * scale
+        y = vector.y * scale
+        z = vector.z * scale
+        r = - x*self.i - y*self.j - z*self.k
+        i = x*self.r + y*self.k - z*self.j
+        j = y*self.r + z*self.i - x*self.k
+        k = z*self.r + x*self.j - y*self.i
+        self.r += r * 0.5
+        self.i += i * 0.5
+        self.j += j * 0.5
+        self.k += k * 0.5
 
     def rotateByVector(self,vector):
         '''
@@ -113,6 +155,316 @@ class Quaternion:
         self *= q
         
 
+    def mulInto(self, multiplier, out):
+        '''
+            Store this quaternion multiplied by another one in out and return out, nothing is allocated
+            ---------
+            args:
+                multiplier - Quaternion
+                out        - Quaternion - receives the result, may be this quaternion or multiplier
+        '''
+
+        r = self.r*multiplier.r - self.i*multiplier.i - self.j*multiplier.j - self.k*multiplier.k
+        i = self.r*multiplier.i + self.i*multiplier.r + self.j*multiplier.k - self.k*multiplier.j
+        j = self.r*multiplier.j + self.j*multiplier.r + self.k*multiplier.i - self.i*multiplier.k
+        k = self.r*multiplier.k + self.k*multiplier.r + self.i*multiplier.j - self.j*multiplier.i
+        out.r = r
+        out.i = i
+        out.j = j
+        out.k = k
+        return out
+
+    def copy(self):
+        '''
+            Return a copy of the quaternion
+        '''
+
+        return Quaternion(self.r, self.i, self.j, self.k)
+
+    def copyInto(self, out):
+        '''
+            Store the components of this quaternion in out and return out
+            ---------
+            args:
+                out - Quaternion
+        '''
+
+        out.r = self.r
+        out.i = self.i
+        out.j = self.j
+        out.k = self.k
+        return out
+
+    def rotateArray(self, vectors, out = None):
+        '''
+            Return a vector array of the vectors rotated by this unit quaternion, using the rotation matrix
+            RigidBody.calculateDerivedData builds from its orientation
+            ---------
+            args:
+                vectors - Vector3Array
+                out     - Vector3Array = None - receives the result, may be vectors, a new vector array if None
+        '''
+
+        r, i, j, k = self.r, self.i, self.j, self.k
+        x, y, z = vectors.x, vectors.y, vectors.z
+        return Vector3Array.fromComponents(
+            x*(1-2*j*j-2*k*k) + y*(2*i*j - 2*r*k) + z*(2*i*k + 2*r*j),
+            x*(2*i*j + 2*r*k) + y*(1-2*i*i-2*k*k) + z*(2*j*k - 2*r*i),
+            x*(2*i*k - 2*r*j) + y*(2*j*k + 2*r*i) + z*(1-2*i*i-2*j*j), out)
+
+    def squareMagnitude(self):
+        '''
+            Return square magnitude of the quaternion
+        '''
+
+        return self.r*self.r + self.i*self.i + self.j*self.j + self.k*self.k
+
+    def magnitude(self):
+        '''
+            Return magnitude of the quaternion
+        '''
+
+        return self.squareMagnitude()**0.5
+
+    def scalarProduct(self, quaternion):
+        '''
+            Return the 4D dot product of this quaternion and another one
+            ---------
+            args:
+                quaternion - Quaternion
+        '''
+
+        return self.r*quaternion.r + self.i*quaternion.i + self.j*quaternion.j + self.k*quaternion.k
+
+    def conjugate(self):
+        '''
+            Return a new quaternion of the conjugate, the inverse rotation of a unit quaternion
+        '''
+
+        return Quaternion(self.r, -self.i, -self.j, -self.k)
+
+    def inverse(self):
+        '''
+            Return a new quaternion of the inverse
+        '''
+
+        result = self.copy()
+        result.invert()
+        return result
+
+    def invert(self):
+        '''
+            Set the quaternion to its inverse, a zero quaternion is left as it is
+        '''
+
+        d = self.squareMagnitude()
+        if d < REAL_EPSILON: return
+        d = 1/d
+        self.r *= d
+        self.i *= -d
+        self.j *= -d
+        self.k *= -d
+
+    def rotate(self, vector):
+        '''
+            Return a new vector of the given vector rotated by this unit quaternion, without building a matrix
+            ---------
+            args:
+                vector - Vector
+        '''
+
+        return self.rotateInto(vector, Vector())
+
+    def rotateInto(self, vector, out):
+        '''
+            Store the given vector rotated by this unit quaternion in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be vector
+        '''
+
+        #v + r*t + u x t where u is the vector part and t = 2 u x v
+        r, i, j, k = self.r, self.i, self.j, self.k
+        x, y, z = vector.x, vector.y, vector.z
+        tx = 2*(j*z - k*y)
+        ty = 2*(k*x - i*z)
+        tz = 2*(i*y - j*x)
+        out.x = x + r*tx + j*tz - k*ty
+        out.y = y + r*ty + k*tx - i*tz
+        out.z = z + r*tz + i*ty - j*tx
+        return out
+
+    def rotateInverse(self, vector):
+        '''
+            Return a new vector of the given vector rotated by the inverse of this unit quaternion
+            ---------
+            args:
+                vector - Vector
+        '''
+
+        return self.conjugate().rotateInto(vector, Vector())
+
+    def setAxisAngle(self, axis, angle):
+        '''
+            Set the quaternion to a rotation around an axis
+            ---------
+            args:
+                axis  - Vector - axis of the rotation, it doesn't need to be a unit vector
+                angle - double - angle of the rotation in radians
+        '''
+
+        length = axis.magnitude()
+        if length < REAL_EPSILON:
+            self.setComponent(1, 0, 0, 0)
+            return
+        s = sin(angle/2) / length
+        self.setComponent(cos(angle/2), axis.x*s, axis.y*s, axis.z*s)
+
+    @staticmethod
+    def fromAxisAngle(axis, angle):
+        '''
+            Return a new quaternion of a rotation around an axis
+            ---------
+            args:
+                axis  - Vector - axis of the rotation
+                angle - double - angle of the rotation in radians
+        '''
+
+        result = Quaternion()
+        result.setAxisAngle(axis, angle)
+        return result
+
+    def toAxisAngle(self):
+        '''
+            Return a tuple of the unit axis (Vector) and angle in radians (0 to 2pi) of the rotation of this
+            unit quaternion, the axis is x for a zero rotation
+        '''
+
+        s = (self.i*self.i + self.j*self.j + self.k*self.k)**0.5
+        if s < REAL_EPSILON: return Vector(1, 0, 0), 0
+        return Vector(self.i/s, self.j/s, self.k/s), 2*atan2(s, self.r)
+
+    def setFromMatrix(self, matrix):
+        '''
+            Set the quaternion from the rotation part of a matrix
+            ---------
+            args:
+                matrix - Matrix3 or Matrix4 - pure rotation (and translation) matrix
+        '''
+
+        d = matrix.data
+        #Matrix4 rows hold 4 values
+        stride = 4 if len(d) == 12 else 3
+        m00, m01, m02 = d[0], d[1], d[2]
+        m10, m11, m12 = d[stride], d[stride+1], d[stride+2]
+        m20, m21, m22 = d[2*stride], d[2*stride+1], d[2*stride+2]
+
+        #Components are found from the largest one to keep the square root away from zero
+        trace = m00 + m11 + m22
+        if trace > 0:
+            s = 2*(trace + 1)**0.5
+            self.setComponent(s/4, (m21 - m12)/s, (m02 - m20)/s, (m10 - m01)/s)
+        elif m00 > m11 and m00 > m22:
+            s = 2*(1 + m00 - m11 - m22)**0.5
+            self.setComponent((m21 - m12)/s, s/4, (m01 + m10)/s, (m02 + m20)/s)
+        elif m11 > m22:
+            s = 2*(1 + m11 - m00 - m22)**0.5
+            self.setComponent((m02 - m20)/s, (m01 + m10)/s, s/4, (m12 + m21)/s)
+        else:
+            s = 2*(1 + m22 - m00 - m11)**0.5
+            self.setComponent((m10 - m01)/s, (m02 + m20)/s, (m12 + m21)/s, s/4)
+        self.normalize()
+
+    @staticmethod
+    def fromMatrix(matrix):
+        '''
+            Return a new quaternion of the rotation part of a matrix
+            ---------
+            args:
+                matrix - Matrix3 or Matrix4
+        '''
+
+        result = Quaternion()
+        result.setFromMatrix(matrix)
+        return result
+
+    def toMatrix3(self):
+        '''
+            Return a new Matrix3 of the rotation of this unit quaternion
+        '''
+
+        r, i, j, k = self.r, self.i, self.j, self.k
+        return Matrix3(
+            1-2*j*j-2*k*k, 2*i*j - 2*r*k, 2*i*k + 2*r*j,
+            2*i*j + 2*r*k, 1-2*i*i-2*k*k, 2*j*k - 2*r*i,
+            2*i*k - 2*r*j, 2*j*k + 2*r*i, 1-2*i*i-2*j*j)
+
+    def toMatrix4(self, position = None):
+        '''
+            Return a new Matrix4 of the rotation of this unit quaternion and a translation, as
+            RigidBody.calculateDerivedData builds it
+            ---------
+            args:
+                position - Vector = None - translation, none if None
+        '''
+
+        #Matrix4 imports this module
+        from Typhoon.Core.Matrix4 import Matrix4
+        r, i, j, k = self.r, self.i, self.j, self.k
+        x, y, z = (position.x, position.y, position.z) if position is not None else (0, 0, 0)
+        return Matrix4(
+            1-2*j*j-2*k*k, 2*i*j - 2*r*k, 2*i*k + 2*r*j, x,
+            2*i*j + 2*r*k, 1-2*i*i-2*k*k, 2*j*k - 2*r*i, y,
+            2*i*k - 2*r*j, 2*j*k + 2*r*i, 1-2*i*i-2*j*j, z)
+
+    @staticmethod
+    def nlerp(a, b, prop):
+        '''
+            Return a new unit quaternion of the normalized linear interpolation of 2 quaternions along the
+            shortest path, cheaper than slerp but its speed isn't constant
+            ---------
+            args:
+                a    - Quaternion - value at prop 0
+                b    - Quaternion - value at prop 1
+                prop - double     - interpolation value
+        '''
+
+        #q and -q are the same rotation, b is flipped to take the shortest path
+        sign = -1 if a.scalarProduct(b) < 0 else 1
+        result = Quaternion(
+            a.r*(1-prop) + sign*b.r*prop,
+            a.i*(1-prop) + sign*b.i*prop,
+            a.j*(1-prop) + sign*b.j*prop,
+            a.k*(1-prop) + sign*b.k*prop)
+        result.normalize()
+        return result
+
+    @staticmethod
+    def slerp(a, b, prop):
+        '''
+            Return a new unit quaternion of the spherical linear interpolation of 2 unit quaternions along the
+            shortest path, the rotation is at constant speed
+            ---------
+            args:
+                a    - Quaternion - value at prop 0
+                b    - Quaternion - value at prop 1
+                prop - double     - interpolation value
+        '''
+
+        dot = a.scalarProduct(b)
+        sign = 1
+        if dot < 0:
+            dot = -dot
+            sign = -1
+        #Nearly equal rotations divide by a vanishing sine, nlerp is used as they barely differ
+        if dot > 1 - SLERP_EPSILON: return Quaternion.nlerp(a, b, prop)
+        angle = acos(dot)
+        s = 1/sin(angle)
+        wa = sin((1-prop)*angle) * s
+        wb = sign * sin(prop*angle) * s
+        return Quaternion(a.r*wa + b.r*wb, a.i*wa + b.i*wb, a.j*wa + b.j*wb, a.k*wa + b.k*wb)
+
     def __str__(self):
         return "" +str(self.r) +" + " + str(self.i) + "i + " + str(self.j) + "j + " + str(self.k) + "k"
 
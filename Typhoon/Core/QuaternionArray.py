@@ -0,0 +1,466 @@
+from Typhoon.Core.Constants import *
+from Typhoon.Core.Quaternion import Quaternion
+from Typhoon.Core.Vector3Array import Vector3Array
+import numpy as np
+
+class QuaternionArray:
+    '''
+        Class responsible for representing many quaternions in one (N,4) float64 numpy array of r, i, j, k rows,
+        the layout of RigidBodyBatch.orientation, operations work on all quaternions at once and mirror the
+        ones of Quaternion
+        Operations taking another quaternion accept a Quaternion (used for every row), a QuaternionArray of the
+        same length or an (N,4) array
+        ---------
+        properties:
+            data - numpy.ndarray - (N,4) components of the quaternions, one quaternion per row
+            r    - numpy.ndarray - (N,)  view of the real components
+            i    - numpy.ndarray - (N,)  view of the first complex components
+            j    - numpy.ndarray - (N,)  view of the second complex components
+            k    - numpy.ndarray - (N,)  view of the third complex components
+        ---------
+        methods:
+            wrap            -  Return a quaternion array sharing the given (N,4) array
+            fromQuaternions -  Return a quaternion array holding copies of the given quaternions
+            toQuaternions   -  Return a list of Quaternion of the rows
+            copy            -  Return a copy of the quaternion array
+            normalize       -  normalize all quaternions
+            squareMagnitude -  Return an (N,) array of square magnitudes
+            magnitude       -  Return an (N,) array of magnitudes
+            scalarProduct   -  Return an (N,) array of 4D dot products
+            conjugate       -  Return a quaternion array of conjugates
+            inverse         -  Return a quaternion array of inverses
+            invert          -  Set all quaternions to their inverses
+            rotate          -  Return a vector array rotated by the quaternions
+            rotateInverse   -  Return a vector array rotated by the inverses of the quaternions
+            fromAxisAngle   -  Return a quaternion array of rotations around axes
+            toAxisAngle     -  Return the axes and angles of the rotations
+            fromMatrices    -  Return a quaternion array of rotation matrices
+            toMatrices      -  Return the (N,3,3) rotation matrices
+            nlerp           -  Return normalized linear interpolation of 2 quaternion arrays
+            slerp           -  Return spherical linear interpolation of 2 quaternion arrays
+        ---------
+        opertaion overload:
+            []  -   an int returns a copy Quaternion of the row, slices and masks return a quaternion array as numpy does,
+                    rows can be set from a Quaternion, a quaternion array or an array
+            len -   number of quaternions
+            *=  -   multiply the quaternions by other quaternions
+            *   -   Return a quaternion array of products
+    '''
+
+    #Fixed attributes, instances have no __dict__
+    __slots__ = ('data',)
+
+    def __init__(self, data = 0):
+        '''
+            Class constractor
+            ---------
+            args:
+                data - int = 0 - number of identity quaternions
+                data - array like - (N,4) components r, i, j, k of the quaternions, they are copied
+        '''
+
+        if isinstance(data, (int, np.integer)):
+            self.data = np.zeros((data, 4))
+            self.data[:, 0] = 1
+        else: self.data = np.array(data, dtype=np.float64).reshape(-1, 4)
+
+    @staticmethod
+    def wrap(array):
+        '''
+            Return a quaternion array sharing the given array, changes show in both
+            ---------
+            args:
+                array - numpy.ndarray - (N,4) float64 array, like RigidBodyBatch.orientation
+        '''
+
+        if array.dtype != np.float64 or array.ndim != 2 or array.shape[1] != 4: raise ValueError('wrap needs an (N,4) float64 array')
+        result = QuaternionArray.__new__(QuaternionArray)
+        result.data = array
+        return result
+
+    @staticmethod
+    def fromQuaternions(quaternions):
+        '''
+            Return a quaternion array holding copies of the given quaternions
+            ---------
+            args:
+                quaternions - iterable of Quaternion
+        '''
+
+        return QuaternionArray([(q.r, q.i, q.j, q.k) for q in quaternions])
+
+    @staticmethod
+    def fromComponents(r, i, j, k, out = None):
+        '''
+            Return a quaternion array of the given component arrays, written into out if given
+            ---------
+            args:
+                r   - (N,) array
+                i   - (N,) array
+                j   - (N,) array
+                k   - (N,) array
+                out - QuaternionArray = None - receives the components, may share data with r, i, j and k
+        '''
+
+        if out is None:
+            out = QuaternionArray.__new__(QuaternionArray)
+            out.data = np.column_stack((r, i, j, k))
+            return out
+        out.data[:, 0] = r
+        out.data[:, 1] = i
+        out.data[:, 2] = j
+        out.data[:, 3] = k
+        return out
+
+    @staticmethod
+    def components(value):
+        '''
+            Return the r, i, j, k components of value, (N,) arrays or doubles for a single Quaternion
+            ---------
+            args:
+                value - Quaternion, QuaternionArray or (N,4) array like
+        '''
+
+        if isinstance(value, Quaternion): return value.r, value.i, value.j, value.k
+        data = value.data if isinstance(value, QuaternionArray) else np.asarray(value, dtype=np.float64)
+        return data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+
+    @property
+    def r(self):
+        return self.data[:, 0]
+
+    @property
+    def i(self):
+        return self.data[:, 1]
+
+    @property
+    def j(self):
+        return self.data[:, 2]
+
+    @property
+    def k(self):
+        return self.data[:, 3]
+
+    def toQuaternions(self):
+        '''
+            Return a list of Quaternion, copies of the rows
+        '''
+
+        return [Quaternion(r, i, j, k) for r, i, j, k in self.data.tolist()]
+
+    def copy(self):
+        '''
+            Return a copy of the quaternion array
+        '''
+
+        return QuaternionArray(self.data)
+
+    def squareMagnitude(self):
+        '''
+            Return an (N,) array of the square magnitudes
+        '''
+
+        return self.r*self.r + self.i*self.i + self.j*self.j + self.k*self.k
+
+    def magnitude(self):
+        '''
+            Return an (N,) array of the magnitudes
+        '''
+
+        return np.sqrt(self.squareMagnitude())
+
+    def normalize(self):
+        '''
+            normalizes all quaternions, quaternions near zero become the identity as in Quaternion.normalize
+        '''
+
+        d = self.squareMagnitude()
+        small = d < REAL_EPSILON
+        self.data[~small] /= np.sqrt(d[~small])[:, None]
+        self.data[small, 0] = 1
+
+    def scalarProduct(self, quaternion):
+        '''
+            Return an (N,) array of the 4D dot products
+            ---------
+            args:
+                quaternion - Quaternion or QuaternionArray
+        '''
+
+        r, i, j, k = QuaternionArray.components(quaternion)
+        return self.r*r + self.i*i + self.j*j + self.k*k
+
+    def conjugate(self):
+        '''
+            Return a new quaternion array of the conjugates, the inverse rotations of unit quaternions
+        '''
+
+        result = self.copy()
+        result.data[:, 1:] *= -1
+        return result
+
+    def inverse(self):
+        '''
+            Return a new quaternion array of the inverses
+        '''
+
+        result = self.copy()
+        result.invert()
+        return result
+
+    def invert(self):
+        '''
+            Set the quaternions to their inverses, zero quaternions are left as they are
+        '''
+
+        d = self.squareMagnitude()
+        nonZero = d >= REAL_EPSILON
+        self.data[nonZero] /= d[nonZero, None]
+        self.data[:, 1:] *= -1
+
+    def rotate(self, vectors, out = None):
+        '''
+            Return a vector array of the vectors rotated by the unit quaternions, row by row, without building matrices
+            ---------
+            args:
+                vectors - Vector3Array or Vector - a single Vector is rotated by every quaternion
+                out     - Vector3Array = None   - receives the result, may be vectors, a new vector array if None
+        '''
+
+        return self.rotateBy(self.r, self.i, self.j, self.k, vectors, out)
+
+    def rotateInverse(self, vectors, out = None):
+        '''
+            Return a vector array of the vectors rotated by the inverses of the unit quaternions, row by row
+            ---------
+            args:
+                vectors - Vector3Array or Vector
+                out     - Vector3Array = None - receives the result, may be vectors, a new vector array if None
+        '''
+
+        return self.rotateBy(self.r, -self.i, -self.j, -self.k, vectors, out)
+
+    @staticmethod
+    def rotateBy(r, i, j, k, vectors, out):
+        '''
+            Return a vector array of vectors rotated by quaternions given as component arrays
+            ---------
+            args:
+                r, i, j, k - (N,) arrays             - components of unit quaternions
+                vectors    - Vector3Array or Vector  - vectors to rotate
+                out        - Vector3Array or None    - receives the result, may be vectors
+        '''
+
+        #v + r*t + u x t where u is the vector part and t = 2 u x v, as Quaternion.rotateInto
+        v = Vector3Array.components(vectors)
+        x, y, z = (v[0], v[1], v[2]) if v.ndim == 1 else (v[:, 0], v[:, 1], v[:, 2])
+        tx = 2*(j*z - k*y)
+        ty = 2*(k*x - i*z)
+        tz = 2*(i*y - j*x)
+        return Vector3Array.fromComponents(x + r*tx + j*tz - k*ty, y + r*ty + k*tx - i*tz, z + r*tz + i*ty - j*tx, out)
+
+    @staticmethod
+    def fromAxisAngle(axes, angles):
+        '''
+            Return a quaternion array of rotations around axes, zero axes give the identity
+            ---------
+            args:
+                axes   - Vector3Array or Vector - axes of the rotations, they don't need to be unit vectors
+                angles - (N,) array or double   - angles of the rotations in radians
+        '''
+
+        axes = Vector3Array.components(axes)
+        angles = np.asarray(angles, dtype=np.float64)
+        count = max(len(axes) if axes.ndim == 2 else 1, angles.size)
+        axes = np.broadcast_to(axes, (count, 3))
+        angles = np.broadcast_to(angles, (count,))
+
+        length = np.sqrt(np.einsum('ij,ij->i', axes, axes))
+        valid = length >= REAL_EPSILON
+        result = QuaternionArray(count)
+        s = np.sin(angles[valid]/2) / length[valid]
+        result.data[valid, 0] = np.cos(angles[valid]/2)
+        result.data[valid, 1:] = axes[valid] * s[:, None]
+        return result
+
+    def toAxisAngle(self):
+        '''
+            Return a tuple of the unit axes (Vector3Array) and angles in radians (0 to 2pi, (N,) array) of the
+            rotations of these unit quaternions, the axis is x for zero rotations
+        '''
+
+        s = np.sqrt(self.i*self.i + self.j*self.j + self.k*self.k)
+        valid = s >= REAL_EPSILON
+        axes = Vector3Array(len(self.data))
+        axes.data[:, 0] = 1
+        axes.data[valid] = self.data[valid, 1:] / s[valid, None]
+        angles = np.where(valid, 2*np.arctan2(s, self.r), 0.0)
+        return axes, angles
+
+    @staticmethod
+    def fromMatrices(matrices):
+        '''
+            Return a quaternion array of the rotation part of matrices, row by row as Quaternion.setFromMatrix
+            ---------
+            args:
+                matrices - numpy.ndarray - (N,3,3) rotation matrices or (N,3,4) transforms like RigidBodyBatch.transformMatrix
+        '''
+
+        m = np.asarray(matrices, dtype=np.float64)
+        m00, m01, m02 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+        m10, m11, m12 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+        m20, m21, m22 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+        trace = m00 + m11 + m22
+
+        #Each row uses the case of its largest component to keep the square root away from zero
+        caseR = trace > 0
+        caseI = ~caseR & (m00 > m11) & (m00 > m22)
+        caseJ = ~caseR & ~caseI & (m11 > m22)
+        caseK = ~(caseR | caseI | caseJ)
+
+        result = QuaternionArray(len(m))
+        d = result.data
+        rows = caseR
+        s = 2*np.sqrt(trace[rows] + 1)
+        d[rows] = np.column_stack((s/4, (m21 - m12)[rows]/s, (m02 - m20)[rows]/s, (m10 - m01)[rows]/s))
+        rows = caseI
+        s = 2*np.sqrt(1 + m00[rows] - m11[rows] - m22[rows])
+        d[rows] = np.column_stack(((m21 - m12)[rows]/s, s/4, (m01 + m10)[rows]/s, (m02 + m20)[rows]/s))
+        rows = caseJ
+        s = 2*np.sqrt(1 + m11[rows] - m00[rows] - m22[rows])
+        d[rows] = np.column_stack(((m02 - m20)[rows]/s, (m01 + m10)[rows]/s, s/4, (m12 + m21)[rows]/s))
+        rows = caseK
+        s = 2*np.sqrt(1 + m22[rows] - m00[rows] - m11[rows])
+        d[rows] = np.column_stack(((m10 - m01)[rows]/s, (m02 + m20)[rows]/s, (m12 + m21)[rows]/s, s/4))
+        result.normalize()
+        return result
+
+    def toMatrices(self):
+        '''
+            Return (N,3,3) rotation matrices of these unit quaternions, same values as Quaternion.toMatrix3
+        '''
+
+        r, i, j, k = self.r, self.i, self.j, self.k
+        matrices = np.empty((len(r), 3, 3))
+        matrices[:, 0, 0] = 1-2*j*j-2*k*k
+        matrices[:, 0, 1] = 2*i*j - 2*r*k
+        matrices[:, 0, 2] = 2*i*k + 2*r*j
+        matrices[:, 1, 0] = 2*i*j + 2*r*k
+        matrices[:, 1, 1] = 1-2*i*i-2*k*k
+        matrices[:, 1, 2] = 2*j*k - 2*r*i
+        matrices[:, 2, 0] = 2*i*k - 2*r*j
+        matrices[:, 2, 1] = 2*j*k + 2*r*i
+        matrices[:, 2, 2] = 1-2*i*i-2*j*j
+        return matrices
+
+    @staticmethod
+    def nlerp(a, b, prop):
+        '''
+            Return a new quaternion array of the normalized linear interpolations along the shortest path
+            ---------
+            args:
+                a    - QuaternionArray or Quaternion - values at prop 0
+                b    - QuaternionArray or Quaternion - values at prop 1
+                prop - (N,) array or double          - interpolation values
+        '''
+
+        ar, ai, aj, ak = QuaternionArray.components(a)
+        br, bi, bj, bk = QuaternionArray.components(b)
+        prop = np.asarray(prop, dtype=np.float64)
+        #q and -q are the same rotation, b is flipped to take the shortest path
+        sign = np.where(ar*br + ai*bi + aj*bj + ak*bk < 0, -1.0, 1.0)
+        result = QuaternionArray.fromComponents(
+            *np.broadcast_arrays(ar*(1-prop) + sign*br*prop, ai*(1-prop) + sign*bi*prop,
+                                 aj*(1-prop) + sign*bj*prop, ak*(1-prop) + sign*bk*prop))
+        result.normalize()
+        return result
+
+    @staticmethod
+    def slerp(a, b, prop):
+        '''
+            Return a new quaternion array of the spherical linear interpolations of unit quaternions along the
+            shortest path, nearly equal rotations are interpolated by nlerp as in Quaternion.slerp
+            ---------
+            args:
+                a    - QuaternionArray or Quaternion - values at prop 0
+                b    - QuaternionArray or Quaternion - values at prop 1
+                prop - (N,) array or double          - interpolation values
+        '''
+
+        ar, ai, aj, ak = QuaternionArray.components(a)
+        br, bi, bj, bk = QuaternionArray.components(b)
+        prop = np.asarray(prop, dtype=np.float64)
+        dot = ar*br + ai*bi + aj*bj + ak*bk
+        sign = np.where(dot < 0, -1.0, 1.0)
+        dot = np.abs(dot)
+        near = dot > 1 - SLERP_EPSILON
+
+        angle = np.arccos(np.minimum(dot, 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = 1/np.sin(angle)
+            wa = np.where(near, 1-prop, np.sin((1-prop)*angle) * s)
+            wb = sign * np.where(near, prop, np.sin(prop*angle) * s)
+        result = QuaternionArray.fromComponents(*np.broadcast_arrays(ar*wa + br*wb, ai*wa + bi*wb, aj*wa + bj*wb, ak*wa + bk*wb))
+        #Rows interpolated linearly are normalized as nlerp does
+        if np.any(near):
+            rows = np.broadcast_to(near, (len(result.data),))
+            result.data[rows] /= np.sqrt(np.einsum('ij,ij->i', result.data[rows], result.data[rows]))[:, None]
+        return result
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        '''
+            operation overload for [] operator
+            ---------
+            args:
+                key - int              - index of a quaternion, a copy Quaternion is returned
+                key - slice or indices - a quaternion array is returned, slices share the data as numpy does
+        '''
+
+        if isinstance(key, (int, np.integer)):
+            r, i, j, k = self.data[key].tolist()
+            return Quaternion(r, i, j, k)
+        result = QuaternionArray.__new__(QuaternionArray)
+        result.data = self.data[key]
+        return result
+
+    def __setitem__(self, key, value):
+        '''
+            operation overload for [] operator, sets rows
+            ---------
+            args:
+                key   - int, slice or indices
+                value - Quaternion, QuaternionArray or array like
+        '''
+
+        if isinstance(value, Quaternion): self.data[key] = (value.r, value.i, value.j, value.k)
+        elif isinstance(value, QuaternionArray): self.data[key] = value.data
+        else: self.data[key] = value
+
+    def __iter__(self):
+        return iter(self.toQuaternions())
+
+    def __mul__(self, multiplier):
+        '''
+            operation overload for * operator, returns the products row by row in the order of Quaternion *=
+            ---------
+            args:
+                multiplier - Quaternion or QuaternionArray
+        '''
+
+        r, i, j, k = QuaternionArray.components(multiplier)
+        sr, si, sj, sk = self.r, self.i, self.j, self.k
+        return QuaternionArray.fromComponents(
+            sr*r - si*i - sj*j - sk*k,
+            sr*i + si*r + sj*k - sk*j,
+            sr*j + sj*r + sk*i - si*k,
+            sr*k + sk*r + si*j - sj*i)
+
+    def __imul__(self, multiplier):
+        self.data[:] = (self * multiplier).data
+        return self
+
+    def __str__(self):
+        return str(self.data)
@@ -0,0 +1,117 @@
+from time import perf_counter
+import sys
+
+class PhysicsStats:
+    '''
+        Opt-in instrumentation of World and ParticleWorld runPhysics, worlds without stats only pay
+        a None check per phase
+        Phase times are measured between marks, time since the last mark is added to the named phase
+        ---------
+        properties:
+            phases                  - dict     - wall time in seconds of each phase in the last frame
+            totals                  - dict     - wall time in seconds of each phase summed over all frames
+            frameTime               - double   - wall time of the last frame
+            totalTime               - double   - wall time summed over all frames
+            frames                  - int      - number of frames measured
+            contacts                - int      - contacts generated in the last frame
+            velocityIterationsUsed  - int      - velocity iterations used by the resolver in the last frame
+            positionIterationsUsed  - int      - position iterations used by the resolver in the last frame
+            awakeBodies             - int      - awake bodies (or particles) after the last frame
+            allocations             - int      - net memory blocks allocated by the interpreter during the last frame
+            callback                - callable - called with the stats after each frame, None for no callback
+        ---------
+        methods:
+            begin    - start measuring a frame
+            mark     - add time since last mark to a phase
+            end      - finish measuring a frame and call the callback
+            averages - return average wall time of each phase per frame
+            reset    - clear all measurements
+    '''
+
+    def __init__(self, callback = None):
+        '''
+            Class constractor
+            ---------
+            args:
+                callback - callable = None - called with the stats after each frame
+        '''
+
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        '''
+            Clear all measurements
+        '''
+
+        self.phases = {}
+        self.totals = {}
+        self.frameTime = 0
+        self.totalTime = 0
+        self.frames = 0
+        self.contacts = 0
+        self.velocityIterationsUsed = 0
+        self.positionIterationsUsed = 0
+        self.awakeBodies = 0
+        self.allocations = 0
+        self.frameStart = 0
+        self.lastMark = 0
+        self.blocks = 0
+
+    def begin(self):
+        '''
+            Start measuring a frame
+        '''
+
+        self.phases = {}
+        self.blocks = sys.getallocatedblocks()
+        self.frameStart = self.lastMark = perf_counter()
+
+    def mark(self, phase):
+        '''
+            Add wall time since the last mark to a phase
+            ---------
+            args:
+                phase - str - name of the phase
+        '''
+
+        now = perf_counter()
+        elapsed = now - self.lastMark
+        self.lastMark = now
+        self.phases[phase] = self.phases.get(phase, 0) + elapsed
+        self.totals[phase] = self.totals.get(phase, 0) + elapsed
+
+    def end(self, contacts, velocityIterationsUsed, positionIterationsUsed, awakeBodies):
+        '''
+            Finish measuring a frame, then call the callback
+            ---------
+            args:
+                contacts                - int - contacts generated in the frame
+                velocityIterationsUsed  - int - velocity iterations used by the resolver
+                positionIterationsUsed  - int - position iterations used by the resolver
+                awakeBodies             - int - awake bodies (or particles) after the frame
+        '''
+
+        self.frameTime = perf_counter() - self.frameStart
+        self.totalTime += self.frameTime
+        self.frames += 1
+        self.contacts = contacts
+        self.velocityIterationsUsed = velocityIterationsUsed
+        self.positionIterationsUsed = positionIterationsUsed
+        self.awakeBodies = awakeBodies
+        self.allocations = sys.getallocatedblocks() - self.blocks
+
+        if self.callback is not None: self.callback(self)
+
+    def averages(self):
+        '''
+            Return a dict of the average wall time in seconds of each phase per frame
+        '''
+
+        if self.frames == 0: return {}
+        return {phase: total / self.frames for phase, total in self.totals.items()}
+
+    def __str__(self):
+        phases = ', '.join('%s %.3f ms' % (phase, time*1000) for phase, time in self.phases.items())
+        return 'frame %.3f ms (%s), %d contacts, %d/%d iterations, %d awake, %d allocations' % (
+            self.frameTime*1000, phases, self.contacts, self.velocityIterationsUsed, self.positionIterationsUsed, self.awakeBodies, self.allocations)
@@ -0,0 +1,70 @@
+from Typhoon.Core.Constants import REAL_EPSILON
+
+class FixedTimestep:
+    '''
+        Turns elapsed wall clock time into a whole number of fixed simulation steps,
+        time left over is kept for the next call and tells how far between the last two
+        simulated states the wall clock is, which is used to interpolate states for rendering
+        When a frame is so slow that more than maxSubsteps steps are due, the extra time is dropped
+        so one slow frame can't make every next frame slower (spiral of death), the simulation
+        then runs slower than the wall clock
+        ---------
+        properties:
+            timestep    - double - duration of a simulation step
+            maxSubsteps - int    - max number of steps run for one call of advance
+            accumulator - double - wall clock time not simulated yet, less than timestep after advance
+            alpha       - double - accumulator / timestep, fraction of a step the wall clock is past the last state
+            droppedTime - double - total wall clock time dropped by the substep cap
+            steps       - int    - total number of steps taken
+        ---------
+        methods:
+            advance - add elapsed time and return the number of steps to run
+            reset   - drop the accumulated time
+    '''
+
+    def __init__(self, timestep = 1/60, maxSubsteps = 5):
+        '''
+            Class constractor
+            ---------
+            args:
+                timestep    - double = 1/60 - duration of a simulation step
+                maxSubsteps - int = 5       - max number of steps run for one call of advance
+        '''
+
+        assert(timestep > 0 and maxSubsteps > 0)
+        self.timestep = timestep
+        self.maxSubsteps = maxSubsteps
+        self.accumulator = 0
+        self.alpha = 0
+        self.droppedTime = 0
+        self.steps = 0
+
+    def advance(self, elapsed):
+        '''
+            Add elapsed wall clock time and return the number of fixed steps to run, at most maxSubsteps
+            ---------
+            args:
+                elapsed - double - wall clock time since last call, negative values are ignored
+        '''
+
+        if elapsed > 0: self.accumulator += elapsed
+
+        #Small epsilon so rounding of summed frame times doesn't lose a step
+        substeps = int((self.accumulator + REAL_EPSILON) // self.timestep)
+        if substeps > self.maxSubsteps:
+            self.droppedTime += (substeps - self.maxSubsteps) * self.timestep
+            self.accumulator -= (substeps - self.maxSubsteps) * self.timestep
+            substeps = self.maxSubsteps
+
+        self.accumulator = max(self.accumulator - substeps * self.timestep, 0)
+        self.alpha = min(self.accumulator / self.timestep, 1)
+        self.steps += substeps
+        return substeps
+
+    def reset(self):
+        '''
+            Drop the accumulated time, used after a pause so the simulation doesn't try to catch up
+        '''
+
+        self.accumulator = 0
+        self.alpha = 0
@@ -1,5 +1,3 @@
-from vpython import vector
-
 class Vector:
     '''
         Class responsible for representing 3D vectors
@@ -26,6 +24,12 @@ class Vector:
             vectorProduct           -   Return a copy vector of the vector product
             componentProduct        -   Return a copy vector of the component wise product
             scalarProduct           -   Return scaler product
+            addInto                 -   Store sum of current vector and another one in out
+            subInto                 -   Store difference of current vector and another one in out
+            scaleInto               -   Store current vector scaled by a value in out
+            vectorProductInto       -   Store vector product in out
+            componentProductInto    -   Store component wise product in out
+            copyInto                -   Store components of current vector in out
         ---------
         opertaion overload:
             []  -   treats vector as 1D array
@@ -44,6 +48,9 @@ class Vector:
             >=  -   Return true if vector is larger than or equal the second vector (Not single value comparison) 
     '''
 
+    #Fixed attributes, instances have no __dict__
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x=0, y=0, z=0):
         '''
             Class constractor
@@ -288,9 +295,12 @@ class Vector:
                 vector - Vector 
         '''
 
-        self.x = y * vector.z - vector.y * z;
-        self.y = z * vector.x - vector.z * x;
-        self.z = x * vector.y - vector.x * y;
+        x = self.y * vector.z - vector.y * self.z
+        y = self.z * vector.x - vector.z * self.x
+        z = self.x * vector.y - vector.x * self.y
+        self.x = x
+        self.y = y
+        self.z = z
         
     def vectorProduct(self,vector):
         '''
@@ -302,6 +312,92 @@ class Vector:
 
         return Vector(self.y * vector.z - vector.y * self.z, self.z * vector.x - vector.z * self.x, self.x * vector.y - vector.x * self.y);
 
+    def addInto(self, vector, out):
+        '''
+            Store the sum of this vector and another one in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be this vector or vector
+        '''
+
+        out.x = self.x + vector.x
+        out.y = self.y + vector.y
+        out.z = self.z + vector.z
+        return out
+
+    def subInto(self, vector, out):
+        '''
+            Store this vector minus another one in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be this vector or vector
+        '''
+
+        out.x = self.x - vector.x
+        out.y = self.y - vector.y
+        out.z = self.z - vector.z
+        return out
+
+    def scaleInto(self, value, out):
+        '''
+            Store this vector scaled by a value in out and return out, nothing is allocated
+            ---------
+            args:
+                value - double
+                out   - Vector - receives the result, may be this vector
+        '''
+
+        out.x = self.x * value
+        out.y = self.y * value
+        out.z = self.z * value
+        return out
+
+    def vectorProductInto(self, vector, out):
+        '''
+            Store the vector product in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be this vector or vector
+        '''
+
+        x = self.y * vector.z - vector.y * self.z
+        y = self.z * vector.x - vector.z * self.x
+        z = self.x * vector.y - vector.x * self.y
+        out.x = x
+        out.y = y
+        out.z = z
+        return out
+
+    def componentProductInto(self, vector, out):
+        '''
+            Store the component wise product in out and return out, nothing is allocated
+            ---------
+            args:
+                vector - Vector
+                out    - Vector - receives the result, may be this vector or vector
+        '''
+
+        out.x = self.x * vector.x
+        out.y = self.y * vector.y
+        out.z = self.z * vector.z
+        return out
+
+    def copyInto(self, out):
+        '''
+            Store the components of this vector in out and return out
+            ---------
+            args:
+                out - Vector
+        '''
+
+        out.x = self.x
+        out.y = self.y
+        out.z = self.z
+        return out
+
     def magnitude(self):
         '''
             return magnitude of vector
@@ -344,7 +440,7 @@ class Vector:
                 size - double - max magnitude of the vector 
         '''
 
-        if self.squareMagnitude > size*size:
+        if self.squareMagnitude() > size*size:
             self.normalize()
             self.x *= size
             self.y *= size
@@ -383,8 +479,10 @@ class Vector:
     def toVPython(self):
         '''
             Return a vector which is used by the graphics library
+            vpython is imported on first use, so the engine runs headless without it
         '''
 
+        from vpython import vector
         return vector(self.x, self.y, self.z)
 
     def __str__(self):
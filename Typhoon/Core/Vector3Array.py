@@ -0,0 +1,342 @@
+from Typhoon.Core.Vector import Vector
+import numpy as np
+
+class Vector3Array:
+    '''
+        Class responsible for representing many 3D vectors in one (N,3) float64 numpy array,
+        operations work on all vectors at once and mirror the ones of Vector
+        Operations taking another vector accept a Vector (used for every row), a Vector3Array of the same
+        length or an (N,3) array, scales accept a double or an (N,) array of one value per vector
+        ---------
+        properties:
+            data - numpy.ndarray - (N,3) components of the vectors, one vector per row
+            x    - numpy.ndarray - (N,)  view of the x components
+            y    - numpy.ndarray - (N,)  view of the y components
+            z    - numpy.ndarray - (N,)  view of the z components
+        ---------
+        methods:
+            wrap                - Return a vector array sharing the given (N,3) array
+            fromVectors         - Return a vector array holding copies of the given vectors
+            fromComponents      - Return a vector array of x, y and z arrays
+            toVectors           - Return a list of Vector of the rows
+            copy                - Return a copy of the vector array
+            clear               - set all vectors to 0,0,0
+            invert              - Invert all vectors to opposite direction
+            scalarProduct       - Return an (N,) array of scalar products
+            vectorProduct       - Return a vector array of vector products
+            componentProduct    - Return a vector array of component wise products
+            squareMagnitude     - Return an (N,) array of square magnitudes
+            magnitude           - Return an (N,) array of magnitudes
+            normalize           - normalize all non zero vectors
+            unit                - Return a normalized copy of the vector array
+            trim                - limit magnitude of all vectors to a certain value
+            addScaledVector     - Add scaled vectors to the vectors
+        ---------
+        opertaion overload:
+            []  -   an int returns a copy Vector of the row, slices and masks return a vector array as numpy does,
+                    rows can be set from a Vector, a vector array or an array
+            len -   number of vectors
+            *=  -   Multiplication of vectors with a scalar or (N,) array
+            *   -   Returns an (N,) array of scalar products or a new scaled vector array depending on input
+            +=  -   add vectors to current ones
+            +   -   Return a vector array of addition
+            -=  -   subtract vectors from current ones
+            -   -   Return a vector array of subtraction
+            %   -   Return a new vector array of vector products
+    '''
+
+    #Fixed attributes, instances have no __dict__
+    __slots__ = ('data',)
+
+    def __init__(self, data = 0):
+        '''
+            Class constractor
+            ---------
+            args:
+                data - int = 0 - number of zero vectors
+                data - array like - (N,3) components of the vectors, they are copied
+        '''
+
+        if isinstance(data, (int, np.integer)): self.data = np.zeros((data, 3))
+        else: self.data = np.array(data, dtype=np.float64).reshape(-1, 3)
+
+    @staticmethod
+    def wrap(array):
+        '''
+            Return a vector array sharing the given array, changes show in both
+            ---------
+            args:
+                array - numpy.ndarray - (N,3) float64 array, like the arrays of ParticleStore and RigidBodyBatch
+        '''
+
+        if array.dtype != np.float64 or array.ndim != 2 or array.shape[1] != 3: raise ValueError('wrap needs an (N,3) float64 array')
+        result = Vector3Array.__new__(Vector3Array)
+        result.data = array
+        return result
+
+    @staticmethod
+    def fromVectors(vectors):
+        '''
+            Return a vector array holding copies of the given vectors
+            ---------
+            args:
+                vectors - iterable of Vector
+        '''
+
+        return Vector3Array([(vector.x, vector.y, vector.z) for vector in vectors])
+
+    @staticmethod
+    def fromComponents(x, y, z, out = None):
+        '''
+            Return a vector array of the given component arrays, written into out if given
+            ---------
+            args:
+                x   - (N,) array
+                y   - (N,) array
+                z   - (N,) array
+                out - Vector3Array = None - receives the components, may share data with x, y and z
+        '''
+
+        if out is None:
+            out = Vector3Array.__new__(Vector3Array)
+            out.data = np.column_stack((x, y, z))
+            return out
+        #Components are computed before being stored, so out may alias the input of a transform
+        out.data[:, 0] = x
+        out.data[:, 1] = y
+        out.data[:, 2] = z
+        return out
+
+    @staticmethod
+    def components(value):
+        '''
+            Return the components of value in a shape which broadcasts with an (N,3) array
+            ---------
+            args:
+                value - Vector, Vector3Array or array like
+        '''
+
+        if isinstance(value, Vector): return np.array((value.x, value.y, value.z))
+        if isinstance(value, Vector3Array): return value.data
+        return np.asarray(value, dtype=np.float64)
+
+    @staticmethod
+    def scale(value):
+        '''
+            Return a scale in a shape which broadcasts with an (N,3) array
+            ---------
+            args:
+                value - double or (N,) array like
+        '''
+
+        if np.ndim(value) == 1: return np.asarray(value, dtype=np.float64)[:, None]
+        return value
+
+    @property
+    def x(self):
+        return self.data[:, 0]
+
+    @property
+    def y(self):
+        return self.data[:, 1]
+
+    @property
+    def z(self):
+        return self.data[:, 2]
+
+    def toVectors(self):
+        '''
+            Return a list of Vector, copies of the rows
+        '''
+
+        return [Vector(x, y, z) for x, y, z in self.data.tolist()]
+
+    def copy(self):
+        '''
+            Return a copy of the vector array
+        '''
+
+        return Vector3Array(self.data)
+
+    def clear(self):
+        '''
+            set all vectors to 0,0,0
+        '''
+
+        self.data[:] = 0
+
+    def invert(self):
+        '''
+            Invert all vectors to opposite direction
+        '''
+
+        np.negative(self.data, out=self.data)
+
+    def scalarProduct(self, vector):
+        '''
+            Return an (N,) array of the scalar products
+            ---------
+            args:
+                vector - Vector or Vector3Array
+        '''
+
+        other = Vector3Array.components(vector)
+        if other.ndim == 1: return self.x*other[0] + self.y*other[1] + self.z*other[2]
+        return self.x*other[:, 0] + self.y*other[:, 1] + self.z*other[:, 2]
+
+    def vectorProduct(self, vector):
+        '''
+            Return a new vector array of the vector products
+            ---------
+            args:
+                vector - Vector or Vector3Array
+        '''
+
+        other = Vector3Array.components(vector)
+        ox, oy, oz = (other[0], other[1], other[2]) if other.ndim == 1 else (other[:, 0], other[:, 1], other[:, 2])
+        x, y, z = self.x, self.y, self.z
+        return Vector3Array.fromComponents(y*oz - oy*z, z*ox - oz*x, x*oy - ox*y)
+
+    def componentProduct(self, vector):
+        '''
+            Return a new vector array of the component wise products
+            ---------
+            args:
+                vector - Vector or Vector3Array
+        '''
+
+        result = Vector3Array.__new__(Vector3Array)
+        result.data = self.data * Vector3Array.components(vector)
+        return result
+
+    def squareMagnitude(self):
+        '''
+            Return an (N,) array of the square magnitudes
+        '''
+
+        return self.x*self.x + self.y*self.y + self.z*self.z
+
+    def magnitude(self):
+        '''
+            Return an (N,) array of the magnitudes
+        '''
+
+        return np.sqrt(self.squareMagnitude())
+
+    def normalize(self):
+        '''
+            change non zero vectors to unit vectors, zero vectors are left as they are
+        '''
+
+        length = self.magnitude()
+        nonZero = length > 0
+        self.data[nonZero] /= length[nonZero, None]
+
+    def unit(self):
+        '''
+            Return a normalized copy of the vector array
+        '''
+
+        result = self.copy()
+        result.normalize()
+        return result
+
+    def trim(self, size):
+        '''
+            limit vectors to a certain magnitude, shorter vectors are left as they are
+            ---------
+            args:
+                size - double or (N,) array - max magnitude of the vectors
+        '''
+
+        size = np.broadcast_to(np.asarray(size, dtype=np.float64), (len(self.data),))
+        square = self.squareMagnitude()
+        over = square > size*size
+        self.data[over] *= (size[over] / np.sqrt(square[over]))[:, None]
+
+    def addScaledVector(self, vector, value):
+        '''
+            Add scaled vectors to the vectors
+            ---------
+            args:
+                vector - Vector or Vector3Array
+                value  - double or (N,) array - scale of the other vectors
+        '''
+
+        self.data += Vector3Array.components(vector) * Vector3Array.scale(value)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        '''
+            operation overload for [] operator
+            ---------
+            args:
+                key - int              - index of a vector, a copy Vector is returned
+                key - slice or indices - a vector array is returned, slices share the data as numpy does
+        '''
+
+        if isinstance(key, (int, np.integer)):
+            x, y, z = self.data[key].tolist()
+            return Vector(x, y, z)
+        result = Vector3Array.__new__(Vector3Array)
+        result.data = self.data[key]
+        return result
+
+    def __setitem__(self, key, value):
+        '''
+            operation overload for [] operator, sets rows
+            ---------
+            args:
+                key   - int, slice or indices
+                value - Vector, Vector3Array or array like
+        '''
+
+        self.data[key] = Vector3Array.components(value)
+
+    def __iter__(self):
+        return iter(self.toVectors())
+
+    def __iadd__(self, vector):
+        self.data += Vector3Array.components(vector)
+        return self
+
+    def __add__(self, vector):
+        result = Vector3Array.__new__(Vector3Array)
+        result.data = self.data + Vector3Array.components(vector)
+        return result
+
+    def __isub__(self, vector):
+        self.data -= Vector3Array.components(vector)
+        return self
+
+    def __sub__(self, vector):
+        result = Vector3Array.__new__(Vector3Array)
+        result.data = self.data - Vector3Array.components(vector)
+        return result
+
+    def __imul__(self, value):
+        self.data *= Vector3Array.scale(value)
+        return self
+
+    def __mul__(self, value):
+        '''
+            operation overload for * operator
+                - returns an (N,) array of scalar products if value is Vector or Vector3Array
+                - returns a vector array scaled by value if value is a double or an (N,) array
+            ---------
+            args:
+                value - double, (N,) array, Vector or Vector3Array
+        '''
+
+        if isinstance(value, (Vector, Vector3Array)): return self.scalarProduct(value)
+        result = Vector3Array.__new__(Vector3Array)
+        result.data = self.data * Vector3Array.scale(value)
+        return result
+
+    def __mod__(self, vector):
+        return self.vectorProduct(vector)
+
+    def __str__(self):
+        return str(self.data)
@@ -1,5 +1,9 @@
 from Typhoon.Core.Vector import Vector
+from Typhoon.Core.Vector3Array import Vector3Array
 from Typhoon.Core.Matrix3 import Matrix3
 from Typhoon.Core.Matrix4 import Matrix4
 from Typhoon.Core.Quaternion import Quaternion
-from Typhoon.Core.Constants import *
\ No newline at end of file
+from Typhoon.Core.QuaternionArray import QuaternionArray
+from Typhoon.Core.Constants import *
+from Typhoon.Core.Timestep import FixedTimestep
+from Typhoon.Core.Stats import PhysicsStats
\ No newline at end of file
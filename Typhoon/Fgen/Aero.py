@@ -45,11 +45,9 @@ class Aero(ForceGenerator):
 
         #Calculate the velocity in body coordinates
         bodyVel = body.getDirectionInLocalSpace(velocity)
-        print('velocity', bodyVel)
 
         #Calculate the force in body coordinates
         bodyForce = tensor.transform(bodyVel)
-        print('bodyForce', bodyForce)
         force = body.getDirectionInWorldSpace(bodyForce)
 
         
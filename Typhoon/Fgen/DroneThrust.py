@@ -1,6 +1,5 @@
 from Typhoon.Fgen.Fgen import ForceGenerator
 from Typhoon.Core import *    
-from vpython import *
 
 class DroneThrust(ForceGenerator):
     '''
@@ -55,13 +55,14 @@ class ForceRegistry:
 
 	def updateForces(self, duration):
 		'''
-			Update all bodies by forces acting on it
+			Update all bodies by forces acting on it, sleeping bodies are skipped
 			---------
 			args:
 				duration - double - duration of time step  
 		'''
 
 		for registeration in self.registerations:
+			if not registeration.body.isAwake: continue
 			registeration.ForceGenerator.updateForce(registeration.body,duration)
 	
 	def clear(self):
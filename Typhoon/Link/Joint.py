@@ -12,8 +12,15 @@ class Joint(ContactGenerator):
         ---------
         methods:
             addContact - return length between two particles
+        ---------
+        Joints fill contacts from the pool of the world's CollisionData (usesPool), they still accept a list
     '''
 
+    usesPool = True
+
+    #Scratch vectors shared by all joints, only used within addContact
+    scratch = (Vector(), Vector(), Vector())
+
     def __init__(self):
         '''
             Class constractor
@@ -44,33 +51,40 @@ class Joint(ContactGenerator):
         self.error = error
 
 
-    def addContact(self, contact : list, limit: int):
+    def addContact(self, contact, limit: int):
         '''
             Fills the given contact structure with the generated
             contact and return the number of contacts that have been written.
+            When given a CollisionData the contact is taken from its pool, the caller
+            then marks it as used with CollisionData.addContacts
         ---------
             args:
-                contact - list - contacts list 
+                contact - CollisionData or list - contacts pool or contacts list to append to
                 limit   - int  - maximum number of contacts in the array that can be written to
         '''
 
-        a_pos_world = self.body[0].getPointInWorldSpace(self.position[0])
-        b_pos_world = self.body[1].getPointInWorldSpace(self.position[1])
+        if limit <= 0: return 0
+
+        a_pos_world = self.body[0].transformMatrix.transformInto(self.position[0], Joint.scratch[0])
+        b_pos_world = self.body[1].transformMatrix.transformInto(self.position[1], Joint.scratch[1])
 
-        a_to_b = b_pos_world - a_pos_world
-        normal = a_to_b.copy()
-        normal.normalize()
+        a_to_b = b_pos_world.subInto(a_pos_world, Joint.scratch[2])
         length = a_to_b.magnitude()
 
         if abs(length) > self.error:
-            contact.append(Contact())
-            contact[-1].body[0] = self.body[0]
-            contact[-1].body[1] = self.body[1]
-            contact[-1].contactNormal = normal 
-            contact[-1].contactPoint = (a_pos_world + b_pos_world) * 0.5
-            contact[-1].penetration = length-self.error
-            contact[-1].friction = 1
-            contact[-1].restitution = 0
+            if isinstance(contact, CollisionData):
+                newContact = contact.getContact()
+            else:
+                newContact = Contact()
+                contact.append(newContact)
+            newContact.setBodyData(self.body[0], self.body[1], 1, 0)
+            newContact.feature = 0
+            #Normal and point are written into the contact's own vectors, nothing is allocated
+            newContact.contactNormal = a_to_b.copyInto(newContact.ownNormal)
+            newContact.contactNormal.normalize()
+            newContact.contactPoint = a_pos_world.addInto(b_pos_world, newContact.ownPoint)
+            newContact.contactPoint *= 0.5
+            newContact.penetration = length-self.error
             return 1
 
         return 0
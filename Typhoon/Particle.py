@@ -12,6 +12,8 @@ class Particle:
             damping - double - represent damping applied to velocity of particle each time step
             inverseMass - double - store inverse mass of particle 
             forceAccum - vector - represent force applied to particle in the next time step only
+            store - ParticleStore - store holding the particle state, None if the particle holds its own state
+            index - int - row of the particle in the store
         ---------
         methods:
             setters & getters
@@ -19,6 +21,8 @@ class Particle:
             hasFiniteMass - Return true if object is movable
             clearAccumulator - clears the force applied to the particle in this time step
             addForce - add force to the forceAccum in this time step
+            bindStore - make the particle a view onto a row of a ParticleStore
+            unbindStore - copy the state back from the store and detach from it
     '''
 
     def __init__(self):
@@ -26,17 +30,111 @@ class Particle:
             Class constractor
         '''
 
-        self.position =  Vector(0,0,0)
-        self.velocity = Vector(0,0,0)
-        self.acceleration = Vector(0,0,0)
+        self.store = None
+        self.index = -1
+        self._position =  Vector(0,0,0)
+        self._velocity = Vector(0,0,0)
+        self._acceleration = Vector(0,0,0)
         #Daming is used to make the paricle lose energy
         #damping = 0 -> object stops, damping = 1 -> velocity doesnt change
-        self.damping = 1
+        self._damping = 1
         #inverse mass = 0 -> infinte mass whichis dealt to immovable objects
         #inverse mass = infinity -> object is super fast (which is not useful in games)
-        self.inverseMass = 0
+        self._inverseMass = 0
         #the value of the forceAccum is zeroed in each intergration step
-        self.forceAccum = Vector(0,0,0)
+        self._forceAccum = Vector(0,0,0)
+
+    ####State properties, they read and write the store row if the particle is bound to a store
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, vector):
+        if self.store is None: self._position = vector
+        else: self._position.set(vector.x, vector.y, vector.z)
+
+    @property
+    def velocity(self):
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, vector):
+        if self.store is None: self._velocity = vector
+        else: self._velocity.set(vector.x, vector.y, vector.z)
+
+    @property
+    def acceleration(self):
+        return self._acceleration
+
+    @acceleration.setter
+    def acceleration(self, vector):
+        if self.store is None: self._acceleration = vector
+        else: self._acceleration.set(vector.x, vector.y, vector.z)
+
+    @property
+    def forceAccum(self):
+        return self._forceAccum
+
+    @forceAccum.setter
+    def forceAccum(self, vector):
+        if self.store is None: self._forceAccum = vector
+        else: self._forceAccum.set(vector.x, vector.y, vector.z)
+
+    @property
+    def damping(self):
+        if self.store is None: return self._damping
+        return float(self.store.damping[self.index])
+
+    @damping.setter
+    def damping(self, damping):
+        if self.store is None: self._damping = damping
+        else: self.store.damping[self.index] = damping
+
+    @property
+    def inverseMass(self):
+        if self.store is None: return self._inverseMass
+        return float(self.store.inverseMass[self.index])
+
+    @inverseMass.setter
+    def inverseMass(self, inverseMass):
+        if self.store is None: self._inverseMass = inverseMass
+        else: self.store.inverseMass[self.index] = inverseMass
+
+    def bindStore(self, store, index):
+        '''
+            Make the particle a view onto a row of the store, called by ParticleStore
+            the row is expected to already hold the particle state
+            ---------
+            args:
+                store - ParticleStore
+                index - int - row of the particle in the store
+        '''
+
+        from Typhoon.Pworld.ParticleStore import ParticleStoreVector
+
+        self.store = store
+        self.index = index
+        self._position = ParticleStoreVector(store.position, index)
+        self._velocity = ParticleStoreVector(store.velocity, index)
+        self._acceleration = ParticleStoreVector(store.acceleration, index)
+        self._forceAccum = ParticleStoreVector(store.forceAccum, index)
+
+    def unbindStore(self):
+        '''
+            Copy the particle state out of its store row and detach from the store, called by ParticleStore
+        '''
+
+        if self.store is None: return
+        self._position = Vector(self._position.x, self._position.y, self._position.z)
+        self._velocity = Vector(self._velocity.x, self._velocity.y, self._velocity.z)
+        self._acceleration = Vector(self._acceleration.x, self._acceleration.y, self._acceleration.z)
+        self._forceAccum = Vector(self._forceAccum.x, self._forceAccum.y, self._forceAccum.z)
+        self._damping = float(self.store.damping[self.index])
+        self._inverseMass = float(self.store.inverseMass[self.index])
+        self.store = None
+        self.index = -1
 
     def integrate(self, duration):
         '''
@@ -0,0 +1,265 @@
+from Typhoon.Core.Vector import Vector
+from Typhoon.Particle import Particle
+import numpy as np
+
+class ParticleStoreVector(Vector):
+    '''
+        Vector which reads and writes its components from a row in one of the ParticleStore arrays,
+        used by particles bound to a store so that setters and getters keep working
+        ---------
+        properties:
+            array - numpy.ndarray - (N,3) array holding the vector
+            index - int           - row of the vector in the array
+    '''
+
+    #x, y and z are properties reading the row, the slots of Vector are left unused
+    __slots__ = ('array', 'index')
+
+    def __init__(self, array, index):
+        '''
+            Class constractor
+            ---------
+            args:
+                array - numpy.ndarray - (N,3) array holding the vector
+                index - int           - row of the vector in the array
+        '''
+
+        self.array = array
+        self.index = index
+
+    @property
+    def x(self):
+        return float(self.array[self.index, 0])
+
+    @x.setter
+    def x(self, value):
+        self.array[self.index, 0] = value
+
+    @property
+    def y(self):
+        return float(self.array[self.index, 1])
+
+    @y.setter
+    def y(self, value):
+        self.array[self.index, 1] = value
+
+    @property
+    def z(self):
+        return float(self.array[self.index, 2])
+
+    @z.setter
+    def z(self, value):
+        self.array[self.index, 2] = value
+
+    def set(self, x, y, z):
+        self.array[self.index] = (x, y, z)
+
+    def clear(self):
+        self.array[self.index] = 0
+
+class ParticleStore:
+    '''
+        Structure of arrays holding the state of many particles in contiguous numpy arrays,
+        particles added to the store become views onto their row
+        ---------
+        properties:
+            capacity     - int           - number of rows allocated
+            count        - int           - number of rows used
+            particles    - list          - particle bound to each used row
+            custom       - list          - bound particles whose class overrides Particle.integrate, they are
+                                           integrated by their own method instead of the vectorized pass
+            position     - numpy.ndarray - (capacity,3) positions
+            velocity     - numpy.ndarray - (capacity,3) velocities
+            acceleration - numpy.ndarray - (capacity,3) constant accelerations
+            forceAccum   - numpy.ndarray - (capacity,3) accumulated forces
+            inverseMass  - numpy.ndarray - (capacity,) inverse masses
+            damping      - numpy.ndarray - (capacity,) damping values
+        ---------
+        methods:
+            add              - bind a particle to a new row of the store
+            remove           - detach a particle from the store
+            sync             - make the store hold exactly the given particles
+            clear            - detach all particles
+            integrate        - integrate all particles in one vectorized pass
+            clearAccumulators - clear the accumulated forces of all particles
+    '''
+
+    def __init__(self, capacity=64):
+        '''
+            Class constractor
+            ---------
+            args:
+                capacity - int = 64 - initial number of rows, grows when needed
+        '''
+
+        self.capacity = max(1, capacity)
+        self.count = 0
+        self.particles = []
+        self.custom = []
+        self.allocate(self.capacity)
+
+    def allocate(self, capacity):
+        '''
+            Allocate arrays of a given capacity, copying the used rows
+            ---------
+            args:
+                capacity - int - number of rows
+        '''
+
+        position = np.zeros((capacity, 3))
+        velocity = np.zeros((capacity, 3))
+        acceleration = np.zeros((capacity, 3))
+        forceAccum = np.zeros((capacity, 3))
+        inverseMass = np.zeros(capacity)
+        damping = np.ones(capacity)
+
+        if self.count:
+            n = self.count
+            position[:n] = self.position[:n]
+            velocity[:n] = self.velocity[:n]
+            acceleration[:n] = self.acceleration[:n]
+            forceAccum[:n] = self.forceAccum[:n]
+            inverseMass[:n] = self.inverseMass[:n]
+            damping[:n] = self.damping[:n]
+
+        self.capacity = capacity
+        self.position = position
+        self.velocity = velocity
+        self.acceleration = acceleration
+        self.forceAccum = forceAccum
+        self.inverseMass = inverseMass
+        self.damping = damping
+
+        #Views of bound particles point at the old arrays
+        for index, particle in enumerate(self.particles):
+            particle.bindStore(self, index)
+
+    def add(self, particle):
+        '''
+            Copy particle state into a new row and bind the particle to it
+            return index of the row
+            ---------
+            args:
+                particle - Particle
+        '''
+
+        if particle.store is self: return particle.index
+        if particle.store is not None: particle.store.remove(particle)
+
+        if self.count == self.capacity: self.allocate(self.capacity*2)
+
+        index = self.count
+        self.position[index] = (particle.position.x, particle.position.y, particle.position.z)
+        self.velocity[index] = (particle.velocity.x, particle.velocity.y, particle.velocity.z)
+        self.acceleration[index] = (particle.acceleration.x, particle.acceleration.y, particle.acceleration.z)
+        self.forceAccum[index] = (particle.forceAccum.x, particle.forceAccum.y, particle.forceAccum.z)
+        self.inverseMass[index] = particle.inverseMass
+        self.damping[index] = particle.damping
+
+        self.count += 1
+        self.particles.append(particle)
+        if type(particle).integrate is not Particle.integrate: self.custom.append(particle)
+        particle.bindStore(self, index)
+        return index
+
+    def remove(self, particle):
+        '''
+            Detach particle from the store, it keeps its current state
+            The last row is moved into the freed row
+            ---------
+            args:
+                particle - Particle
+        '''
+
+        if particle.store is not self: return
+        index = particle.index
+        last = self.count - 1
+        particle.unbindStore()
+        if self.custom: self.custom = [other for other in self.custom if other is not particle]
+
+        if index != last:
+            self.position[index] = self.position[last]
+            self.velocity[index] = self.velocity[last]
+            self.acceleration[index] = self.acceleration[last]
+            self.forceAccum[index] = self.forceAccum[last]
+            self.inverseMass[index] = self.inverseMass[last]
+            self.damping[index] = self.damping[last]
+            self.particles[index] = self.particles[last]
+            self.particles[index].bindStore(self, index)
+
+        self.particles.pop()
+        self.count -= 1
+
+    def sync(self, particles):
+        '''
+            Make the store hold exactly the given particles
+            Only does work when a particle was added, removed or replaced
+            ---------
+            args:
+                particles - list - list of particles
+        '''
+
+        #Same count and every particle bound here means the store holds exactly these particles, in any order
+        if len(particles) == self.count and all(particle.store is self for particle in particles): return
+
+        ids = set(id(particle) for particle in particles)
+        for particle in self.particles[:]:
+            if id(particle) not in ids: self.remove(particle)
+        for particle in particles:
+            if particle.store is not self: self.add(particle)
+
+    def clear(self):
+        '''
+            Detach all particles from the store
+        '''
+
+        for particle in self.particles:
+            particle.unbindStore()
+        self.particles.clear()
+        self.custom.clear()
+        self.count = 0
+
+    def integrate(self, duration):
+        '''
+            Integrate all particles in one vectorized pass, same as Particle.integrate
+            Particles whose class overrides integrate are left out of the pass and call their own method
+            ---------
+            args:
+                duration - double - duration of time step
+        '''
+
+        assert(duration > 0)
+        n = self.count
+        if n == 0: return
+
+        #Rows of particles with their own integrate are restored after the pass
+        custom = self.custom
+        if custom:
+            rows = [particle.index for particle in custom]
+            saved = (self.position[rows], self.velocity[rows], self.forceAccum[rows])
+
+        velocity = self.velocity[:n]
+        forceAccum = self.forceAccum[:n]
+
+        #Pn = Pn-1 + v*t
+        self.position[:n] += velocity * duration
+
+        #Acceleration from force
+        resultAcceleration = self.acceleration[:n] + forceAccum * self.inverseMass[:n, None]
+
+        #Update velocity and apply drag
+        velocity += resultAcceleration * duration
+        velocity *= (self.damping[:n] ** duration)[:, None]
+
+        forceAccum.fill(0)
+
+        if custom:
+            self.position[rows], self.velocity[rows], self.forceAccum[rows] = saved
+            for particle in custom: particle.integrate(duration)
+
+    def clearAccumulators(self):
+        '''
+            Clear accumulated forces of all particles
+        '''
+
+        self.forceAccum[:self.count].fill(0)
@@ -1,6 +1,11 @@
 from Typhoon.Pfgen import *
 from Typhoon.Pcontact import *
 from Typhoon.Core.Vector import Vector
+from Typhoon.Core.Timestep import FixedTimestep
+from Typhoon.Core.Stats import PhysicsStats
+from Typhoon.Pworld.ParticleStore import ParticleStore
+from Typhoon.State import SharedStatePublisher, Snapshot, FrameRecorder, SNAPSHOT_PARTICLE_WORLD
+import numpy as np
 
 class ParticleWorld:
     '''
@@ -14,11 +19,31 @@ class ParticleWorld:
             maxContacts         - int    - Max number of contacts allowed
             contacts            - list   - holds contact registers even if empty
             contactGenerators   - list   - holds contact generators
+            particleStore       - ParticleStore - holds the state of all particles in contiguous arrays
+            stepper             - FixedTimestep - turns wall clock time passed to step into fixed time steps
+            previousPositions   - numpy.ndarray - (N,3) positions in store order before the last time step of step, None before the first step
+            sharedState         - SharedStatePublisher - state array is written to it after each frame, None if not shared
+            recorder            - FrameRecorder - state array is appended to its frame log after each frame, None if not recording
+            stats               - PhysicsStats  - per phase timing of runPhysics, None if not measured
 
         ---------
         methods:
-            runPhysics - run a frame of duration
-            startFrame - clear all accumlators from previous frames
+            runPhysics     - run a frame of duration
+            step           - run as many fixed time steps as fit in the elapsed wall clock time
+            setTimestep    - set the fixed time step and max number of time steps of step
+            getInterpolatedPositions - positions of all particles interpolated between the last two time steps
+            getInterpolatedPosition  - position of a particle interpolated between the last two time steps
+            getStateArray  - positions and velocities of all particles in one array
+            setSharedState - publish the state array into a shared memory block after each frame
+            snapshot       - save particles, force bindings and solver settings as bytes
+            restore        - load a snapshot into the particles of the world
+            setStateArray  - set positions and velocities of all particles from one array
+            startRecording - append the state of each frame to a frame log
+            stopRecording  - close the frame log
+            setStats       - measure phases of runPhysics
+            startFrame     - clear all accumlators from previous frames
+            addParticle    - add a particle to the world
+            removeParticle - remove a particle from the world
     '''
 
     def __init__(self, maxContacts, iterations=0):
@@ -41,14 +66,43 @@ class ParticleWorld:
             self.contacts.append(ParticleContact())
 
         self.contactGenerators = []
+        self.particleStore = ParticleStore()
+        self.stepper = FixedTimestep(1/60, 5)
+        self.previousPositions = None
+        self.sharedState = None
+        self.recorder = None
+        self.stats = None
+
+    def addParticle(self, particle):
+        '''
+            Add a particle to the world and bind it to the particle store
+            Appending to particleRegistry directly works as well, the particle is bound on the next frame
+            ---------
+            args:
+                particle - Particle
+        '''
+
+        self.particleRegistry.append(particle)
+        self.particleStore.add(particle)
+
+    def removeParticle(self, particle):
+        '''
+            Remove a particle from the world, the particle keeps its state
+            ---------
+            args:
+                particle - Particle
+        '''
+
+        self.particleRegistry.remove(particle)
+        self.particleStore.remove(particle)
 
     def startFrame(self):
         '''
             Clears accumulators to start a new frame
         '''
 
-        for particle in self.particleRegistry:
-            particle.clearAccumulator()
+        self.particleStore.sync(self.particleRegistry)
+        self.particleStore.clearAccumulators()
 
     def generateContacts(self):
         '''
@@ -73,33 +127,289 @@ class ParticleWorld:
 
     def integrate(self, duration):
         '''
-            Run an integration on all particles for this time step
+            Run an integration on all particles for this time step, particles are integrated together by the
+            particle store, those whose class overrides Particle.integrate are integrated by their own method
             ---------
             args:
                 duration  - double - duration of time step 
         '''
 
-        for particle in self.particleRegistry:
-            particle.integrate(duration)
+        self.particleStore.sync(self.particleRegistry)
+        self.particleStore.integrate(duration)
 
     def runPhysics(self,duration):
         '''
-            run simulation with a time step of duration
+            run simulation with a time step of duration, returns the number of contacts generated
             ---------
             args:
                 duration  - double - duration of time step 
         '''
 
+        #Keyframes are taken before the frame so a frame log can be re-simulated from them
+        keyframe = None
+        if self.recorder is not None and self.recorder.needsKeyframe(): keyframe = self.snapshot()
+
+        stats = self.stats
+        if stats is not None: stats.begin()
+
         #apply force generator
         self.forceRegistery.updateForces(duration)
+        if stats is not None: stats.mark('forces')
         #integrate particles
         self.integrate(duration)
+        if stats is not None: stats.mark('integrate')
         #generate contacts
         usedContacts = self.generateContacts()
+        if stats is not None: stats.mark('contacts')
         #process contacts
         if(self.calculateIteration): 
             self.contactResolver.setIterations(2*usedContacts)
         self.contactResolver.resolveContacts(self.contacts,duration)
+        if stats is not None: stats.mark('resolve')
+
+        if self.sharedState is not None: self.sharedState.publish(self.getStateArray(), duration)
+        if self.recorder is not None: self.recorder.record(self.getStateArray(), usedContacts, duration, keyframe)
+
+        #Particles don't sleep and resolve velocity and interpenetration in the same iterations
+        if stats is not None:
+            if self.sharedState is not None or self.recorder is not None: stats.mark('output')
+            stats.end(usedContacts, self.contactResolver.usedIterations, 0, len(self.particleRegistry))
+        return usedContacts
+
+    def setStats(self, enabled = True, callback = None):
+        '''
+            Measure runPhysics, phases are forces, integrate, contacts, resolve and output (shared state and recording),
+            return the PhysicsStats or None, the iterations used by the resolver are reported as velocity iterations
+            ---------
+            args:
+                enabled  - bool = True     - False removes the stats
+                callback - callable = None - called with the stats after each frame
+        '''
+
+        self.stats = PhysicsStats(callback) if enabled else None
+        return self.stats
+
+    def setTimestep(self, timestep, maxSubsteps = 5):
+        '''
+            Set the fixed time step used by step
+            ---------
+            args:
+                timestep    - double    - duration of a time step
+                maxSubsteps - int = 5   - max number of time steps run by one call of step, wall clock time
+                                          over that is dropped so a slow frame doesn't make the next ones slower
+        '''
+
+        self.stepper = FixedTimestep(timestep, maxSubsteps)
+        self.previousPositions = None
+
+    def step(self, elapsed, callback = None):
+        '''
+            Run as many fixed time steps as fit in the elapsed wall clock time plus the time left from
+            previous calls, capped at stepper.maxSubsteps, and return the number of time steps run
+            ---------
+            args:
+                elapsed  - double          - wall clock time since last call
+                callback - callable = None - called with the duration after each time step, for game logic
+                                             which has to run once per time step rather than once per frame
+        '''
+
+        substeps = self.stepper.advance(elapsed)
+        for substep in range(substeps):
+            self.startFrame()
+            if substep == substeps - 1:
+                self.previousPositions = self.particleStore.position[:self.particleStore.count].copy()
+            self.runPhysics(self.stepper.timestep)
+            if callback is not None: callback(self.stepper.timestep)
+        return substeps
+
+    def getInterpolatedPositions(self):
+        '''
+            Return (N,3) positions of particles in particle store order (particle.index), blended between
+            the positions before the last time step and the current ones by stepper.alpha
+        '''
+
+        store = self.particleStore
+        positions = store.position[:store.count].copy()
+
+        #Particles were added or removed since the last time step
+        if self.previousPositions is None or len(self.previousPositions) != store.count: return positions
+        positions -= self.previousPositions
+        positions *= self.stepper.alpha
+        positions += self.previousPositions
+        return positions
+
+    def getInterpolatedPosition(self, particle):
+        '''
+            Return the position of a particle blended between the position before the last time step and the current one by stepper.alpha
+            ---------
+            args:
+                particle - Particle - particle in the world
+        '''
+
+        store = self.particleStore
+        #Particles appended to particleRegistry are only bound to the store on the next frame
+        if particle.store is not store: return particle.getPosition()
+
+        position = store.position[particle.index]
+        if self.previousPositions is not None and len(self.previousPositions) == store.count:
+            previous = self.previousPositions[particle.index]
+            position = previous + (position - previous) * self.stepper.alpha
+        return Vector(*position.tolist())
+
+    def setSharedState(self, enabled = True, capacity = None, name = None):
+        '''
+            Publish the state array into a shared memory block after each frame, other processes attach to it
+            with SharedStateReader(world.sharedState.name) and read the latest frame without pickling
+            Rows are in particleRegistry order with columns position 0:3 and velocity 3:6
+            ---------
+            args:
+                enabled  - bool = True  - False frees the block
+                capacity - int = None   - max number of particles, current number of particles if None
+                name     - str = None   - name of the block, a random name if None
+        '''
+
+        if self.sharedState is not None: self.sharedState.close()
+        self.sharedState = None
+        if enabled:
+            if capacity is None: capacity = len(self.particleRegistry)
+            self.sharedState = SharedStatePublisher(capacity, 6, name)
+
+    def snapshot(self):
+        '''
+            Return the state of the world as bytes in the Snapshot format, arrays written are
+                particles - (N,14) float64 - position, velocity, acceleration, force accumulator, inverse mass, damping
+                forces    - (M,2)  int64   - particle index and force generator index of each force registration,
+                                             generators are numbered in order of first registration
+                solver    - (7,)   float64 - resolver iterations, calculateIteration and stepper state
+            Particles are numbered in particleRegistry order, force generators and contact generators are not saved,
+            the snapshot is restored into a world with the same particles and generators (the same world or one built by the same code)
+        '''
+
+        store = self.particleStore
+        store.sync(self.particleRegistry)
+        rows = [particle.index for particle in self.particleRegistry]
+        indices = {id(particle): index for index, particle in enumerate(self.particleRegistry)}
+
+        state = np.empty((len(rows), 14))
+        state[:, 0:3] = store.position[rows]
+        state[:, 3:6] = store.velocity[rows]
+        state[:, 6:9] = store.acceleration[rows]
+        state[:, 9:12] = store.forceAccum[rows]
+        state[:, 12] = store.inverseMass[rows]
+        state[:, 13] = store.damping[rows]
+
+        registerations = self.forceRegistery.registerations
+        if any(id(registeration.particle) not in indices for registeration in registerations):
+            raise ValueError('forces are registered on particles which are not in particleRegistry')
+        generators = {}
+        for registeration in registerations: generators.setdefault(id(registeration.particleForceGenerator), len(generators))
+        forces = np.array([(indices[id(registeration.particle)], generators[id(registeration.particleForceGenerator)])
+                           for registeration in registerations], dtype=np.int64).reshape(-1, 2)
+
+        stepper = self.stepper
+        solver = np.array((self.contactResolver.iterations, self.calculateIteration,
+                           stepper.timestep, stepper.maxSubsteps, stepper.accumulator, stepper.steps, stepper.droppedTime), dtype=np.float64)
+
+        return Snapshot.pack(SNAPSHOT_PARTICLE_WORLD, {'particles': state, 'forces': forces, 'solver': solver})
+
+    def restore(self, data):
+        '''
+            Load a snapshot taken by snapshot into the particles of the world, force registrations are rebuilt
+            from the force generators currently registered
+            Raises ValueError if the snapshot doesn't match the particles or force generators of the world
+            ---------
+            args:
+                data - bytes - snapshot
+        '''
+
+        arrays = Snapshot.unpack(data, SNAPSHOT_PARTICLE_WORLD)
+        state, forces, solver = arrays['particles'], arrays['forces'], arrays['solver']
+
+        particles = self.particleRegistry
+        if len(state) != len(particles): raise ValueError('snapshot has %d particles, the world has %d' % (len(state), len(particles)))
+
+        generators = []
+        for registeration in self.forceRegistery.registerations:
+            if not any(generator is registeration.particleForceGenerator for generator in generators): generators.append(registeration.particleForceGenerator)
+        if len(forces) and forces[:, 1].max() >= len(generators):
+            raise ValueError('snapshot uses %d force generators, the world has %d' % (forces[:, 1].max() + 1, len(generators)))
+
+        store = self.particleStore
+        store.sync(particles)
+        rows = [particle.index for particle in particles]
+        store.position[rows] = state[:, 0:3]
+        store.velocity[rows] = state[:, 3:6]
+        store.acceleration[rows] = state[:, 6:9]
+        store.forceAccum[rows] = state[:, 9:12]
+        store.inverseMass[rows] = state[:, 12]
+        store.damping[rows] = state[:, 13]
+
+        self.forceRegistery.registerations = [ParticleForceRegistery.ParticleForceRegisteration(particles[particle], generators[generator])
+                                              for particle, generator in forces.tolist()]
+
+        iterations, calculateIteration, timestep, maxSubsteps, accumulator, steps, droppedTime = solver.tolist()
+        self.contactResolver.setIterations(int(iterations))
+        self.calculateIteration = bool(calculateIteration)
+
+        self.stepper = FixedTimestep(timestep, int(maxSubsteps))
+        self.stepper.accumulator, self.stepper.steps, self.stepper.droppedTime = accumulator, int(steps), droppedTime
+        self.stepper.alpha = accumulator / timestep
+        self.previousPositions = None
+
+    def setStateArray(self, state):
+        '''
+            Set position and velocity of the particles in particleRegistry from an (N,6) array laid out as getStateArray
+            ---------
+            args:
+                state - numpy.ndarray - (N,6) state array
+        '''
+
+        if len(state) != len(self.particleRegistry): raise ValueError('state has %d rows, the world has %d particles' % (len(state), len(self.particleRegistry)))
+        store = self.particleStore
+        store.sync(self.particleRegistry)
+        rows = [particle.index for particle in self.particleRegistry]
+        store.position[rows] = state[:, :3]
+        store.velocity[rows] = state[:, 3:6]
+
+    def startRecording(self, path, capacity = None, keyframeInterval = 60):
+        '''
+            Append the state array after each frame to a frame log read by FrameLogReader, a snapshot is
+            taken before every keyframeInterval frames so the log can be re-simulated and checked
+            ---------
+            args:
+                path             - str         - path of the frame log, the keyframes are written next to it
+                capacity         - int = None  - max number of particles, current number of particles if None
+                keyframeInterval - int = 60    - frames between keyframes, 0 for no keyframes
+        '''
+
+        self.stopRecording()
+        if capacity is None: capacity = len(self.particleRegistry)
+        self.recorder = FrameRecorder(path, SNAPSHOT_PARTICLE_WORLD, 6, capacity, keyframeInterval)
+
+    def stopRecording(self):
+        '''
+            Close the frame log
+        '''
+
+        if self.recorder is not None: self.recorder.close()
+        self.recorder = None
+
+    def getStateArray(self, dtype = np.float64):
+        '''
+            Return an (N,6) array of the particles in particleRegistry order, columns are position 0:3 and velocity 3:6
+            ---------
+            args:
+                dtype - numpy.dtype = float64 - float32 halves the size when sending states between processes
+        '''
+
+        store = self.particleStore
+        store.sync(self.particleRegistry)
+        rows = [particle.index for particle in self.particleRegistry]
+
+        state = np.empty((len(rows), 6), dtype=dtype)
+        state[:, :3] = store.position[rows]
+        state[:, 3:] = store.velocity[rows]
+        return state
 
     def getParticles(self):
         return self.particleRegistry
@@ -1,2 +1,3 @@
 from Typhoon.Pworld.Pworld import ParticleWorld
-from Typhoon.Pworld.Pworld import GroundContacts
\ No newline at end of file
+from Typhoon.Pworld.Pworld import GroundContacts
+from Typhoon.Pworld.ParticleStore import ParticleStore
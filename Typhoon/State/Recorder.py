@@ -0,0 +1,312 @@
+import mmap
+import os
+import struct
+import numpy as np
+
+#Frame log binary format, little endian
+#   header  - HEADER_SIZE bytes: magic 4s b'TYRC', version u16, kind u16 (SNAPSHOT_WORLD or SNAPSHOT_PARTICLE_WORLD),
+#             columns u32, capacity u32, keyframeInterval u32, recordSize u64
+#   records - one fixed size record per frame, record i starts at HEADER_SIZE + i*recordSize
+#             frame u64, duration f64, count u32, contacts u32, keyframe offset i64 (-1 if none), keyframe length i64,
+#             then (capacity, columns) float64 rows, the first count rows hold getStateArray after the frame
+#Keyframes are snapshots taken before a frame, appended to the file at path + '.keyframes'
+FRAME_LOG_MAGIC = b'TYRC'
+FRAME_LOG_VERSION = 1
+FRAME_LOG_HEADER = struct.Struct('<4sHHIIIQ')
+FRAME_RECORD_HEADER = struct.Struct('<QdIIqq')
+HEADER_SIZE = 64
+
+class FrameRecorder:
+    '''
+        Appends the state of a world after each frame to a frame log, every keyframeInterval frames
+        a snapshot taken before the frame is appended to the keyframe file so the log can be re-simulated
+        Records have a fixed size so FrameLogReader finds any frame without scanning the log
+        ---------
+        properties:
+            path             - str  - path of the frame log
+            kind             - int  - SNAPSHOT_WORLD or SNAPSHOT_PARTICLE_WORLD
+            columns          - int  - values per row of the state array
+            capacity         - int  - max number of rows per frame
+            keyframeInterval - int  - frames between keyframes, 0 for no keyframes
+            recordSize       - int  - bytes per frame record
+            frame            - int  - number of frames recorded
+            file             - file - frame log opened for appending
+            keyframeFile     - file - keyframe file opened for appending
+        ---------
+        methods:
+            needsKeyframe - return true if the next frame should start with a keyframe
+            record        - append a frame
+            close         - flush and close the files
+    '''
+
+    def __init__(self, path, kind, columns, capacity, keyframeInterval = 60):
+        '''
+            Class constractor, creates the frame log and keyframe files, replacing existing ones
+            ---------
+            args:
+                path             - str      - path of the frame log
+                kind             - int      - SNAPSHOT_WORLD or SNAPSHOT_PARTICLE_WORLD
+                columns          - int      - values per row of the state array
+                capacity         - int      - max number of rows per frame
+                keyframeInterval - int = 60 - frames between keyframes, 0 for no keyframes
+        '''
+
+        self.path = path
+        self.kind = kind
+        self.columns = columns
+        self.capacity = max(1, capacity)
+        self.keyframeInterval = keyframeInterval
+        self.recordSize = FRAME_RECORD_HEADER.size + 8*self.capacity*columns
+        self.frame = 0
+        self.padding = bytes(8*self.capacity*columns)
+
+        self.file = open(path, 'wb')
+        self.file.write(FRAME_LOG_HEADER.pack(FRAME_LOG_MAGIC, FRAME_LOG_VERSION, kind, columns, self.capacity, keyframeInterval, self.recordSize).ljust(HEADER_SIZE, b'\0'))
+        self.keyframeFile = open(path + '.keyframes', 'wb')
+        self.file.flush()
+
+    def needsKeyframe(self):
+        '''
+            Return true if the next recorded frame should start with a keyframe
+        '''
+
+        return self.keyframeInterval > 0 and self.frame % self.keyframeInterval == 0
+
+    def record(self, state, contacts, duration, keyframe = None):
+        '''
+            Append a frame to the log, files are flushed so the log survives a crash of the simulation
+            ---------
+            args:
+                state    - numpy.ndarray - (N, columns) state array after the frame
+                contacts - int           - number of contacts generated in the frame
+                duration - double        - duration of the frame
+                keyframe - bytes = None  - snapshot taken before the frame
+        '''
+
+        count = len(state)
+        if count > self.capacity: raise ValueError('%d rows don\'t fit in a frame log of capacity %d' % (count, self.capacity))
+
+        keyframeOffset, keyframeLength = -1, -1
+        if keyframe is not None:
+            keyframeOffset, keyframeLength = self.keyframeFile.tell(), len(keyframe)
+            self.keyframeFile.write(keyframe)
+            self.keyframeFile.flush()
+
+        rows = np.ascontiguousarray(state, dtype=np.float64).tobytes()
+        self.file.write(FRAME_RECORD_HEADER.pack(self.frame, duration, count, contacts, keyframeOffset, keyframeLength))
+        self.file.write(rows)
+        self.file.write(self.padding[len(rows):])
+        self.file.flush()
+        self.frame += 1
+
+    def close(self):
+        '''
+            Flush and close the files
+        '''
+
+        self.file.close()
+        self.keyframeFile.close()
+
+
+class FrameLogReader:
+    '''
+        Reads a frame log written by FrameRecorder through a memory map, frames are found by index in constant time
+        Frames can be loaded into a world to render them, or re-simulated from the last keyframe before them
+        to check that the simulation still produces the recorded states
+        ---------
+        properties:
+            path             - str  - path of the frame log
+            kind             - int  - SNAPSHOT_WORLD or SNAPSHOT_PARTICLE_WORLD
+            columns          - int  - values per row of the state array
+            capacity         - int  - max number of rows per frame
+            keyframeInterval - int  - frames between keyframes, 0 if there are none
+            recordSize       - int  - bytes per frame record
+            frameCount       - int  - number of complete frames in the log when it was last mapped
+            memory           - mmap - map of the frame log
+            keyframes        - mmap - map of the keyframe file, None if it's empty
+        ---------
+        methods:
+            refresh      - map the files again to see frames appended since
+            getFrame     - return duration, contacts and state of a frame
+            getKeyframe  - return the keyframe taken before a frame
+            loadFrame    - write the state of a frame into a world
+            seek         - re-simulate a world up to the end of a frame
+            verify       - re-simulate frames and return the first one which doesn't match the log
+            findKeyframe - return the last frame with a keyframe at or before a frame
+            run          - restore a keyframe and run frames with their recorded durations
+            close        - unmap the files
+    '''
+
+    def __init__(self, path):
+        '''
+            Class constractor, maps the frame log
+            Raises ValueError if the file is not a frame log of this version
+            ---------
+            args:
+                path - str - path of the frame log
+        '''
+
+        self.path = path
+        self.memory = None
+        self.keyframes = None
+        self.recordSize = 0
+        self.frameCount = 0
+        self.refresh()
+
+        magic, version, self.kind, self.columns, self.capacity, self.keyframeInterval, self.recordSize = FRAME_LOG_HEADER.unpack_from(self.memory, 0)
+        if magic != FRAME_LOG_MAGIC or version != FRAME_LOG_VERSION:
+            self.close()
+            raise ValueError('%s is not a version %d frame log' % (path, FRAME_LOG_VERSION))
+        self.frameCount = (len(self.memory) - HEADER_SIZE) // self.recordSize
+
+    def refresh(self):
+        '''
+            Map the files again, frames appended by a recorder since the last mapping become readable
+            States returned by getFrame stay views on the old mapping
+        '''
+
+        self.close()
+        with open(self.path, 'rb') as file:
+            self.memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.recordSize:
+            self.frameCount = (len(self.memory) - HEADER_SIZE) // self.recordSize
+
+        keyframePath = self.path + '.keyframes'
+        if os.path.exists(keyframePath) and os.path.getsize(keyframePath) > 0:
+            with open(keyframePath, 'rb') as file:
+                self.keyframes = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def getFrame(self, index):
+        '''
+            Return (duration, contacts, state) of a frame, state is a read only (count, columns) view on the log
+            ---------
+            args:
+                index - int - frame index, negative indices count from the end
+        '''
+
+        if index < 0: index += self.frameCount
+        if not 0 <= index < self.frameCount: raise IndexError('frame %d is not in a log of %d frames' % (index, self.frameCount))
+
+        offset = HEADER_SIZE + index*self.recordSize
+        frame, duration, count, contacts, keyframeOffset, keyframeLength = FRAME_RECORD_HEADER.unpack_from(self.memory, offset)
+        state = np.frombuffer(self.memory, dtype=np.float64, count=count*self.columns, offset=offset + FRAME_RECORD_HEADER.size)
+        return duration, contacts, state.reshape(count, self.columns)
+
+    def getKeyframe(self, index):
+        '''
+            Return the snapshot taken before a frame, None if the frame has no keyframe
+            ---------
+            args:
+                index - int - frame index
+        '''
+
+        offset = HEADER_SIZE + index*self.recordSize
+        keyframeOffset, keyframeLength = FRAME_RECORD_HEADER.unpack_from(self.memory, offset)[4:]
+        if keyframeOffset < 0 or self.keyframes is None: return None
+        return self.keyframes[keyframeOffset:keyframeOffset + keyframeLength]
+
+    def loadFrame(self, world, index):
+        '''
+            Write the recorded state of a frame into a world with the same bodies or particles, used to render a frame
+            Only the state array is loaded, to continue simulating from a frame use seek
+            ---------
+            args:
+                world - World or ParticleWorld - world the log was recorded from or one built by the same code
+                index - int                    - frame index
+        '''
+
+        world.setStateArray(self.getFrame(index)[2])
+
+    def seek(self, world, index):
+        '''
+            Restore the last keyframe at or before a frame and re-simulate up to the end of the frame
+            Frames after the keyframe are run as startFrame then runPhysics, so forces applied to bodies from
+            outside force generators are only replayed if they were applied before a keyframe
+            ---------
+            args:
+                world - World or ParticleWorld - world the log was recorded from or one built by the same code
+                index - int                    - frame index
+        '''
+
+        start = self.findKeyframe(index)
+        self.run(world, start, index + 1)
+
+    def verify(self, world, start = 0, end = None, tolerance = 0):
+        '''
+            Re-simulate frames from start up to end and return the index of the first frame whose state
+            or contact count differs from the log, None if all frames match
+            ---------
+            args:
+                world     - World or ParticleWorld - world the log was recorded from or one built by the same code
+                start     - int = 0    - first frame checked
+                end       - int = None - frame after the last one checked, the end of the log if None
+                tolerance - double = 0 - largest difference accepted between a recorded and a re-simulated value
+        '''
+
+        if end is None: end = self.frameCount
+        if start >= end: return None
+
+        first = self.findKeyframe(start)
+        self.run(world, first, start)
+
+        recorder = world.recorder
+        world.recorder = None
+        try:
+            for index in range(start, end):
+                duration, contacts, state = self.getFrame(index)
+                if index != first: world.startFrame()
+                usedContacts = world.runPhysics(duration)
+                current = world.getStateArray()
+                if usedContacts != contacts or current.shape != state.shape: return index
+                if len(state) and np.abs(current - state).max() > tolerance: return index
+        finally:
+            world.recorder = recorder
+        return None
+
+    def findKeyframe(self, index):
+        '''
+            Return the index of the last frame at or before index which has a keyframe
+            Raises ValueError if the log has no keyframes
+            ---------
+            args:
+                index - int - frame index
+        '''
+
+        if self.keyframeInterval <= 0: raise ValueError('frame log was recorded without keyframes, it can\'t be re-simulated')
+        if not 0 <= index < self.frameCount: raise IndexError('frame %d is not in a log of %d frames' % (index, self.frameCount))
+        return index // self.keyframeInterval * self.keyframeInterval
+
+    def run(self, world, first, end):
+        '''
+            Restore the keyframe of frame first and run frames from first up to end with their recorded durations
+            ---------
+            args:
+                world - World or ParticleWorld - world to run
+                first - int - frame with a keyframe
+                end   - int - frame after the last one run
+        '''
+
+        keyframe = self.getKeyframe(first)
+        if keyframe is None: raise ValueError('frame %d has no keyframe' % first)
+        world.restore(keyframe)
+
+        recorder = world.recorder
+        world.recorder = None
+        try:
+            for index in range(first, end):
+                if index != first: world.startFrame()
+                world.runPhysics(self.getFrame(index)[0])
+        finally:
+            world.recorder = recorder
+
+    def close(self):
+        '''
+            Unmap the files, a map still viewed by states from getFrame is unmapped when they are freed
+        '''
+
+        for memory in (self.memory, self.keyframes):
+            if memory is None: continue
+            try: memory.close()
+            except BufferError: pass
+        self.memory = None
+        self.keyframes = None
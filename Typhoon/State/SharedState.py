@@ -0,0 +1,194 @@
+import struct
+import numpy as np
+
+#Header of a shared state block, little endian, padded to HEADER_SIZE bytes
+#   magic    4s  - b'TYPH'
+#   version  u32 - SHARED_STATE_VERSION
+#   sequence u64 - odd while a frame is being written, incremented twice per frame
+#   capacity u32 - max number of rows
+#   count    u32 - number of rows in the last frame
+#   columns  u32 - float64 values per row, 13 for World and 6 for ParticleWorld
+#   frame    u64 - number of frames published
+#   time     f64 - simulated time of the last frame
+#Rows follow the header as a (capacity, columns) float64 array, the same columns as getStateArray
+#   World         - position 0:3, orientation r, i, j, k 3:7, velocity 7:10, rotation 10:13
+#   ParticleWorld - position 0:3, velocity 3:6
+SHARED_STATE_MAGIC = b'TYPH'
+SHARED_STATE_VERSION = 1
+SHARED_STATE_HEADER = struct.Struct('<4sIQIIIQd')
+HEADER_SIZE = 64
+
+class SharedStatePublisher:
+    '''
+        Writes the state of a world into a shared memory block every frame, so renderers and
+        telemetry in other processes read it without pickling python objects
+        The sequence counter in the header is odd while a frame is written, readers retry when it changed
+        ---------
+        properties:
+            memory    - SharedMemory  - the shared block, its name is used by readers to attach
+            name      - str           - name of the shared block
+            capacity  - int           - max number of rows
+            columns   - int           - values per row
+            rows      - numpy.ndarray - (capacity, columns) view of the rows in the block
+            sequence  - int           - sequence counter written in the header
+            frame     - int           - number of frames published
+            time      - double        - simulated time of the last frame
+            published - set           - class wide, names of blocks created by this process
+        ---------
+        methods:
+            writeHeader - write the header of the block
+            publish     - write a state array as the latest frame
+            close       - detach from the block and free it
+    '''
+
+    published = set()
+
+    def __init__(self, capacity, columns, name = None):
+        '''
+            Class constractor, creates the shared block
+            ---------
+            args:
+                capacity - int        - max number of rows
+                columns  - int        - values per row
+                name     - str = None - name of the block, a random name if None
+        '''
+
+        #Imported on first use, multiprocessing slows down import Typhoon
+        from multiprocessing import shared_memory
+        self.capacity = max(1, capacity)
+        self.columns = columns
+        self.memory = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + 8*self.capacity*columns)
+        self.name = self.memory.name
+        SharedStatePublisher.published.add(self.name)
+        self.rows = np.ndarray((self.capacity, columns), dtype=np.float64, buffer=self.memory.buf, offset=HEADER_SIZE)
+        self.sequence = 0
+        self.frame = 0
+        self.time = 0
+        self.writeHeader(0)
+
+    def writeHeader(self, count):
+        '''
+            Write the header of the block
+            ---------
+            args:
+                count - int - number of rows in the frame
+        '''
+
+        SHARED_STATE_HEADER.pack_into(self.memory.buf, 0, SHARED_STATE_MAGIC, SHARED_STATE_VERSION, self.sequence,
+                                      self.capacity, count, self.columns, self.frame, self.time)
+
+    def publish(self, state, duration = 0):
+        '''
+            Write a state array as the latest frame
+            ---------
+            args:
+                state    - numpy.ndarray - (N, columns) state array
+                duration - double = 0    - time simulated since the last frame
+        '''
+
+        count = len(state)
+        if count > self.capacity: raise ValueError('%d rows don\'t fit in a shared state of capacity %d' % (count, self.capacity))
+
+        #Odd sequence tells readers a frame is being written
+        self.sequence += 1
+        struct.pack_into('<Q', self.memory.buf, 8, self.sequence)
+
+        self.rows[:count] = state
+        self.frame += 1
+        self.time += duration
+
+        self.sequence += 1
+        self.writeHeader(count)
+
+    def close(self):
+        '''
+            Detach from the block and free it, readers still attached keep their mapping
+        '''
+
+        self.rows = None
+        self.memory.close()
+        self.memory.unlink()
+        SharedStatePublisher.published.discard(self.name)
+
+
+class SharedStateReader:
+    '''
+        Reads frames published by a SharedStatePublisher in another process
+        ---------
+        properties:
+            memory   - SharedMemory  - the attached block
+            capacity  - int           - max number of rows
+            columns  - int           - values per row
+            rows     - numpy.ndarray - (capacity, columns) view of the rows in the block, may change while read
+        ---------
+        methods:
+            readHeader  - return the header as a tuple
+            unpackFrame - return sequence, count, frame and time from the header
+            read        - copy the latest complete frame
+            close       - detach from the block
+    '''
+
+    def __init__(self, name):
+        '''
+            Class constractor, attaches to an existing block
+            ---------
+            args:
+                name - str - name of the block, SharedStatePublisher.name
+        '''
+
+        from multiprocessing import shared_memory, resource_tracker
+        #Readers must not free the block when they exit, older python tracks every attached block and frees it at exit
+        try: self.memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            self.memory = shared_memory.SharedMemory(name=name)
+            if self.memory.name not in SharedStatePublisher.published: resource_tracker.unregister(self.memory._name, 'shared_memory')
+        magic, version, sequence, capacity, count, columns, frame, time = self.readHeader()
+        if magic != SHARED_STATE_MAGIC or version != SHARED_STATE_VERSION:
+            self.memory.close()
+            raise ValueError('%s is not a version %d shared state block' % (name, SHARED_STATE_VERSION))
+
+        self.capacity = capacity
+        self.columns = columns
+        self.rows = np.ndarray((capacity, columns), dtype=np.float64, buffer=self.memory.buf, offset=HEADER_SIZE)
+
+    def readHeader(self):
+        '''
+            Return the header as (magic, version, sequence, capacity, count, columns, frame, time)
+        '''
+
+        return SHARED_STATE_HEADER.unpack_from(self.memory.buf, 0)
+
+    def read(self, retries = 100):
+        '''
+            Return (frame, time, state) of the latest complete frame, state is a copy of its (count, columns) rows
+            Returns None if no complete frame could be read in retries attempts
+            ---------
+            args:
+                retries - int = 100 - attempts before giving up while the publisher is writing
+        '''
+
+        for attempt in range(retries):
+            sequence, count, frame, time = self.unpackFrame()
+            if sequence & 1: continue
+
+            state = self.rows[:count].copy()
+
+            #Frame changed while it was copied
+            if self.unpackFrame()[0] == sequence: return frame, time, state
+        return None
+
+    def unpackFrame(self):
+        '''
+            Return (sequence, count, frame, time) from the header
+        '''
+
+        magic, version, sequence, capacity, count, columns, frame, time = self.readHeader()
+        return sequence, count, frame, time
+
+    def close(self):
+        '''
+            Detach from the block, it's freed by the publisher
+        '''
+
+        self.rows = None
+        self.memory.close()
@@ -0,0 +1,81 @@
+import struct
+import numpy as np
+
+#Snapshot binary format, little endian
+#   header  - magic 4s b'TYSN', version u16, kind u16, number of arrays u32
+#   arrays  - for each array: name length u8, name, dtype length u8, numpy dtype string, ndim u8, shape u64 * ndim, raw C ordered data
+#Kinds tell which world wrote the snapshot, the arrays each kind writes are listed in World.snapshot and ParticleWorld.snapshot
+SNAPSHOT_MAGIC = b'TYSN'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_WORLD = 1
+SNAPSHOT_PARTICLE_WORLD = 2
+SNAPSHOT_HEADER = struct.Struct('<4sHHI')
+
+class Snapshot:
+    '''
+        Packs named numpy arrays into the versioned snapshot format used by World and ParticleWorld
+        snapshot and restore, no python objects are pickled so snapshots are compact and safe to load
+        ---------
+        methods:
+            pack   - static, pack arrays into bytes
+            unpack - static, read arrays back from bytes
+    '''
+
+    @staticmethod
+    def pack(kind, arrays):
+        '''
+            Return bytes holding the arrays
+            ---------
+            args:
+                kind   - int  - SNAPSHOT_WORLD or SNAPSHOT_PARTICLE_WORLD
+                arrays - dict - numpy arrays keyed by name
+        '''
+
+        parts = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, kind, len(arrays))]
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            nameBytes = name.encode()
+            dtypeBytes = array.dtype.str.encode()
+            parts.append(struct.pack('<B', len(nameBytes)) + nameBytes)
+            parts.append(struct.pack('<B', len(dtypeBytes)) + dtypeBytes)
+            parts.append(struct.pack('<B%dQ' % array.ndim, array.ndim, *array.shape))
+            parts.append(array.tobytes())
+        return b''.join(parts)
+
+    @staticmethod
+    def unpack(data, kind):
+        '''
+            Return the arrays in data keyed by name, arrays are read only views on data
+            Raises ValueError if data is not a snapshot of this version and kind
+            ---------
+            args:
+                data - bytes - snapshot
+                kind - int   - expected kind, SNAPSHOT_WORLD or SNAPSHOT_PARTICLE_WORLD
+        '''
+
+        data = memoryview(data)
+        if len(data) < SNAPSHOT_HEADER.size: raise ValueError('data is too short to be a snapshot')
+        magic, version, dataKind, count = SNAPSHOT_HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC: raise ValueError('data is not a snapshot')
+        if version != SNAPSHOT_VERSION: raise ValueError('snapshot version %d is not supported, expected %d' % (version, SNAPSHOT_VERSION))
+        if dataKind != kind: raise ValueError('snapshot of kind %d can not be restored into kind %d' % (dataKind, kind))
+
+        offset = SNAPSHOT_HEADER.size
+        arrays = {}
+        for i in range(count):
+            length = data[offset]
+            name = bytes(data[offset+1:offset+1+length]).decode()
+            offset += 1 + length
+
+            length = data[offset]
+            dtype = np.dtype(bytes(data[offset+1:offset+1+length]).decode())
+            offset += 1 + length
+
+            ndim = data[offset]
+            shape = struct.unpack_from('<%dQ' % ndim, data, offset+1)
+            offset += 1 + 8*ndim
+
+            items = int(np.prod(shape))
+            arrays[name] = np.frombuffer(data, dtype=dtype, count=items, offset=offset).reshape(shape)
+            offset += items * dtype.itemsize
+        return arrays
@@ -0,0 +1,5 @@
+from Typhoon.State.SharedState import SharedStatePublisher
+from Typhoon.State.SharedState import SharedStateReader
+from Typhoon.State.Snapshot import *
+from Typhoon.State.Recorder import FrameRecorder
+from Typhoon.State.Recorder import FrameLogReader
\ No newline at end of file
@@ -1,6 +1,9 @@
 from Typhoon.Fgen import *
 from Typhoon.Core import *
 from Typhoon.Contact import *
+from Typhoon.Body import RigidBodyBatch
+from Typhoon.State import SharedStatePublisher, Snapshot, FrameRecorder, SNAPSHOT_WORLD
+import numpy as np
 
 class World:
     '''
@@ -10,15 +13,48 @@ class World:
             bodyRegistry        - list   - All rigid bodies in world
             calculateIteration  - bool   - True if world needs to calculate iterations for contact resolver
             forceRegistery      - list   - All the forces in world
-            contactResolver     - ParticleContactResolver - responsible for resolving contacts
+            resolver            - ContactResolver - responsible for resolving contacts
             maxContacts         - int    - Max number of contacts allowed
-            contactRegistry     - list   - holds contact registers 
-            contactGenRegistry  - list   - holds contact generators
+            contactRegistry     - list   - pool of contacts, only the first collisionData.contactCount are used in a frame
+            contactGenRegistry  - list   - holds contact generators, addContact gets a list to append to, or the
+                                           CollisionData for generators with usesPool set (see ContactGenerator)
+            bodyBatch           - RigidBodyBatch - used to integrate all bodies at once, None if bodies are integrated one by one
+            primitiveRegistry   - list   - collision primitives of bodies, collided with each other and with planes
+            staticPrimitives    - list   - collision primitives which never move (level geometry)
+            planeRegistry       - list   - immovable collision planes
+            broadPhase          - BroadPhase    - coarse collision detection used to find pairs of primitives to collide
+            collisionData       - CollisionData - holds friction, restitution and tolerance of generated collisions
+            manifoldCache       - ManifoldCache - keeps contacts of colliding pairs between frames, None if narrow phase runs every frame
+            sleepingPrimitives  - set    - primitives of sleeping bodies whose transform was calculated after they fell asleep
+            stepper             - FixedTimestep - turns wall clock time passed to step into fixed time steps
+            previousState       - tuple  - (bodies, positions, orientations) before the last time step of step, None before the first step
+            sharedState         - SharedStatePublisher - state array is written to it after each frame, None if not shared
+            recorder            - FrameRecorder - state array is appended to its frame log after each frame, None if not recording
+            stats               - PhysicsStats  - per phase timing of runPhysics, None if not measured
 
         ---------
         methods:
-            runPhysics - run a frame of duration
-            startFrame - clear all accumlators from previous frames
+            runPhysics          - run a frame of duration
+            step                - run as many fixed time steps as fit in the elapsed wall clock time
+            setTimestep         - set the fixed time step and max number of time steps of step
+            getInterpolatedTransforms - transforms of all bodies interpolated between the last two time steps
+            getInterpolatedTransform  - transform of a body interpolated between the last two time steps
+            getStateArray       - positions, orientations, velocities and rotations of all bodies in one array
+            setSharedState      - publish the state array into a shared memory block after each frame
+            snapshot            - save bodies, force bindings and solver settings as bytes
+            restore             - load a snapshot into the bodies of the world
+            setStateArray       - set positions, orientations, velocities and rotations of all bodies from one array
+            startRecording      - append the state of each frame to a frame log
+            stopRecording       - close the frame log
+            setStats            - measure phases of runPhysics
+            startFrame          - clear all accumlators from previous frames
+            setBatchIntegration - integrate bodies in one vectorized batch or one by one
+            setBroadPhase       - select the coarse collision detection algorithm
+            setResolver         - select the contact resolver
+            setManifoldCache    - keep contacts between frames so resting primitives skip narrow phase
+            addPrimitive        - add a collision primitive to the world
+            removePrimitive     - remove a collision primitive from the world
+            addPlane            - add an immovable collision plane to the world
     '''
 
     def __init__(self, maxContact, iterations=0):
@@ -32,19 +68,115 @@ class World:
 
         self.bodyRegistry = [] 
         self.contactGenRegistry = []
-        self.contactRegistry = []
         self.maxContact = maxContact
         self.forceRegistry = ForceRegistry()
         self.calculateIteration = (iterations == 0)
         self.resolver = ContactResolver(iterations,iterations)
+        self.bodyBatch = None
+        self.primitiveRegistry = []
+        self.staticPrimitives = []
+        self.planeRegistry = []
+        self.broadPhase = SpatialHash()
+        self.collisionData = CollisionData(maxContact)
+        self.manifoldCache = None
+        self.sleepingPrimitives = set()
+        self.contactRegistry = self.collisionData.contactArray
+        self.stepper = FixedTimestep(1/60, 5)
+        self.previousState = None
+        self.sharedState = None
+        self.recorder = None
+        self.stats = None
 
+    def setBroadPhase(self, broadPhase):
+        '''
+            Select the coarse collision detection algorithm, primitives already in the world are moved to it
+            ---------
+            args:
+                broadPhase - BroadPhase - SpatialHash, BoundingVolumeHierarchy or SweepAndPrune
+        '''
+
+        for primitive in self.primitiveRegistry:
+            broadPhase.insert(primitive, primitive in self.staticPrimitives)
+        self.broadPhase = broadPhase
+
+    def setResolver(self, resolver):
+        '''
+            Select the contact resolver, iterations are still calculated each frame if the world was created with 0 iterations
+            ---------
+            args:
+                resolver - ContactResolver - ContactResolver or SequentialImpulseResolver
+        '''
+
+        self.resolver = resolver
+
+    def setManifoldCache(self, enabled = True):
+        '''
+            Keep contacts of colliding pairs between frames, pairs which barely moved refresh
+            their contacts instead of running narrow phase again
+            ---------
+            args:
+                enabled - bool = True
+        '''
+
+        self.manifoldCache = ManifoldCache() if enabled else None
+
+    def addPrimitive(self, primitive, static = False):
+        '''
+            Add a collision primitive to the world
+            ---------
+            args:
+                primitive - CollisionPrimitive
+                static    - bool = False - True for level geometry which never moves, its transform is not recalculated
+        '''
+
+        if primitive.body is not None: primitive.calculateInternals()
+        self.primitiveRegistry.append(primitive)
+        if static: self.staticPrimitives.append(primitive)
+        self.broadPhase.insert(primitive, static)
+
+    def removePrimitive(self, primitive):
+        '''
+            Remove a collision primitive from the world
+            ---------
+            args:
+                primitive - CollisionPrimitive
+        '''
+
+        self.primitiveRegistry.remove(primitive)
+        self.sleepingPrimitives.discard(primitive)
+        if primitive in self.staticPrimitives: self.staticPrimitives.remove(primitive)
+        self.broadPhase.remove(primitive)
+
+    def addPlane(self, plane):
+        '''
+            Add an immovable collision plane to the world
+            ---------
+            args:
+                plane - CollisionPlane
+        '''
+
+        self.planeRegistry.append(plane)
+
+    def setBatchIntegration(self, enabled = True):
+        '''
+            Integrate bodies in one vectorized RigidBodyBatch pass instead of one by one
+            Mass, damping and inertia of the bodies are gathered when the body registry changes,
+            call bodyBatch.loadBodies after changing them on a registered body
+            ---------
+            args:
+                enabled - bool = True
+        '''
+
+        self.bodyBatch = RigidBodyBatch(len(self.bodyRegistry)) if enabled else None
 
     def startFrame(self):
         '''
-            Clears accumulators to start a new frame
+            Clears accumulators to start a new frame, sleeping bodies are skipped
         '''
 
         for body in self.bodyRegistry:
+            #Sleeping bodies don't move and forces wake them up
+            if not body.isAwake: continue
             body.clearAccumulators()
             body.calculateDerivedData()
 
@@ -57,47 +189,553 @@ class World:
                 duration  - double - duration of time step 
         '''
 
+        if self.bodyBatch is not None:
+            #Mass properties are only gathered again when bodies are added or removed
+            if self.bodyBatch.bodies != self.bodyRegistry: self.bodyBatch.loadBodies(self.bodyRegistry)
+            else: self.bodyBatch.loadState()
+            self.bodyBatch.integrate(duration)
+            self.bodyBatch.storeBodies()
+            return
+
         for body in self.bodyRegistry:
             body.integrate(duration)
 
     def runPhysics(self,duration):
         '''
-            run simulation with a time step of duration
+            run simulation with a time step of duration, returns the number of contacts generated
             ---------
             args:
                 duration  - double - duration of time step 
         '''
 
+        #Keyframes are taken before the frame so a frame log can be re-simulated from them
+        keyframe = None
+        if self.recorder is not None and self.recorder.needsKeyframe(): keyframe = self.snapshot()
+
+        stats = self.stats
+        if stats is not None: stats.begin()
+
         #apply force generator
-        self.forceRegistery.updateForces(duration)
+        self.forceRegistry.updateForces(duration)
+        if stats is not None: stats.mark('forces')
 
         #integrate bodies
-        for reg in self.bodyRegistry:
-            reg.integrate(duration)
+        self.integrate(duration)
+        if stats is not None: stats.mark('integrate')
 
         usedContacts = self.generateContacts()
+        if stats is not None: stats.mark('narrowPhase')
 
         if self.calculateIteration: self.resolver.setIterations(usedContacts * 4, usedContacts * 4)
-        resolver.resolveContacts(contacts, usedContacts, duration)
+        self.resolver.resolveContacts(self.contactRegistry, usedContacts, duration)
+
+        #Bodies woken up by contacts were moved and can fall asleep again before the next collision pass
+        wokenPrimitives = [primitive for primitive in self.sleepingPrimitives if primitive.body.isAwake]
+        for primitive in wokenPrimitives:
+            self.sleepingPrimitives.discard(primitive)
+            self.broadPhase.wake(primitive)
+        if stats is not None: stats.mark('resolve')
+
+        if self.sharedState is not None: self.sharedState.publish(self.getStateArray(), duration)
+        if self.recorder is not None: self.recorder.record(self.getStateArray(), usedContacts, duration, keyframe)
+
+        if stats is not None:
+            if self.sharedState is not None or self.recorder is not None: stats.mark('output')
+            stats.end(usedContacts, self.resolver.velocityIterationsUsed, self.resolver.positionIterationsUsed,
+                      sum(1 for body in self.bodyRegistry if body.isAwake))
+        return usedContacts
+
+
+    def setStats(self, enabled = True, callback = None):
+        '''
+            Measure runPhysics, phases are forces, integrate, broadPhase, narrowPhase (contact generators and
+            narrow phase), resolve and output (shared state and recording), return the PhysicsStats or None
+            ---------
+            args:
+                enabled  - bool = True     - False removes the stats
+                callback - callable = None - called with the stats after each frame
+        '''
+
+        self.stats = PhysicsStats(callback) if enabled else None
+        return self.stats
+
+    def setTimestep(self, timestep, maxSubsteps = 5):
+        '''
+            Set the fixed time step used by step
+            ---------
+            args:
+                timestep    - double    - duration of a time step
+                maxSubsteps - int = 5   - max number of time steps run by one call of step, wall clock time
+                                          over that is dropped so a slow frame doesn't make the next ones slower
+        '''
+
+        self.stepper = FixedTimestep(timestep, maxSubsteps)
+        self.previousState = None
+
+    def step(self, elapsed, callback = None):
+        '''
+            Run as many fixed time steps as fit in the elapsed wall clock time plus the time left from
+            previous calls, capped at stepper.maxSubsteps, and return the number of time steps run
+            State before the last time step is kept so getInterpolatedTransforms can blend it with the
+            current state by stepper.alpha
+            ---------
+            args:
+                elapsed  - double          - wall clock time since last call
+                callback - callable = None - called with the duration after each time step, for game logic
+                                             which has to run once per time step rather than once per frame
+        '''
+
+        substeps = self.stepper.advance(elapsed)
+        for substep in range(substeps):
+            if substep == substeps - 1: self.storePreviousState()
+            self.startFrame()
+            self.runPhysics(self.stepper.timestep)
+            if callback is not None: callback(self.stepper.timestep)
+        return substeps
+
+    def storePreviousState(self):
+        '''
+            Keep positions and orientations of all bodies to interpolate from
+        '''
+
+        bodies = list(self.bodyRegistry)
+        self.previousState = (bodies,) + World.gatherState(bodies)
+
+    def getInterpolatedTransforms(self):
+        '''
+            Return (N,3,4) transform matrices, same layout as Matrix4.data, of the bodies in bodyRegistry
+            blended between the state before the last time step and the current state by stepper.alpha
+            Bodies are not changed, the transforms are meant for rendering
+        '''
+
+        positions, orientations = World.gatherState(self.bodyRegistry)
+
+        #Without a matching previous state the current state is used as is
+        if self.previousState is None or self.previousState[0] != self.bodyRegistry:
+            return World.blendStates(positions, orientations, positions, orientations, 0)
+        return World.blendStates(self.previousState[1], self.previousState[2], positions, orientations, self.stepper.alpha)
+
+    def getInterpolatedTransform(self, body):
+        '''
+            Return the transform of a body blended between the state before the last time step and the current state by stepper.alpha
+            ---------
+            args:
+                body - RigidBody - body in bodyRegistry
+        '''
+
+        positions, orientations = World.gatherState([body])
+        previousPositions, previousOrientations, alpha = positions, orientations, 0
+        if self.previousState is not None and self.previousState[0] == self.bodyRegistry:
+            index = self.bodyRegistry.index(body)
+            previousPositions = self.previousState[1][index:index+1]
+            previousOrientations = self.previousState[2][index:index+1]
+            alpha = self.stepper.alpha
+
+        transform = World.blendStates(previousPositions, previousOrientations, positions, orientations, alpha)
+        return Matrix4(*transform.reshape(12).tolist())
+
+    def setSharedState(self, enabled = True, capacity = None, name = None):
+        '''
+            Publish the state array into a shared memory block after each frame, other processes attach to it
+            with SharedStateReader(world.sharedState.name) and read the latest frame without pickling
+            Rows are in bodyRegistry order with columns position 0:3, orientation r, i, j, k 3:7, velocity 7:10 and rotation 10:13
+            ---------
+            args:
+                enabled  - bool = True  - False frees the block
+                capacity - int = None   - max number of bodies, current number of bodies if None
+                name     - str = None   - name of the block, a random name if None
+        '''
+
+        if self.sharedState is not None: self.sharedState.close()
+        self.sharedState = None
+        if enabled:
+            if capacity is None: capacity = len(self.bodyRegistry)
+            self.sharedState = SharedStatePublisher(capacity, 13, name)
+
+    def snapshot(self):
+        '''
+            Return the state of the world as bytes in the Snapshot format, arrays written are
+                bodies   - (N,38) float64 - inverse mass, linear and angular damping, position, orientation, velocity, rotation,
+                                            acceleration, last frame acceleration, force and torque accumulators, motion,
+                                            inverse inertia tensor in body space
+                flags    - (N,2)  uint8   - isAwake, canSleep
+                forces   - (M,2)  int64   - body index and force generator index of each force registration,
+                                            generators are numbered in order of first registration
+                solver   - (17,)  float64 - resolver type and settings, collision data settings and stepper state
+                impulses - (K,6)  float64 - warm starting cache of SequentialImpulseResolver, body indices (-1 for none), feature and impulse
+                cache    - (4,)   float64 - manifold cache enabled, maxDrift, breakingDistance and frame
+                points   - (P,39) float64 - one row per kept manifold point, primitive indices, isPlane, manifold frame,
+                                            transform data of both primitives when the manifold was built, local point,
+                                            local anchor, local normal, plane offset and feature
+            Bodies are numbered in bodyRegistry order, primitives in primitiveRegistry order and planes in planeRegistry order,
+            force generators and collision primitives are not saved, the snapshot is restored into a world with the same bodies,
+            primitives and generators (the same world or one built by the same code)
+        '''
+
+        bodies = self.bodyRegistry
+        indices = {id(body): index for index, body in enumerate(bodies)}
+
+        state = np.array([(body.inverseMass, body.linearDamping, body.angularDamping,
+                           body.position.x, body.position.y, body.position.z,
+                           body.orientation.r, body.orientation.i, body.orientation.j, body.orientation.k,
+                           body.velocity.x, body.velocity.y, body.velocity.z,
+                           body.rotation.x, body.rotation.y, body.rotation.z,
+                           body.acceleration.x, body.acceleration.y, body.acceleration.z,
+                           body.lastFrameAcceleration.x, body.lastFrameAcceleration.y, body.lastFrameAcceleration.z,
+                           body.forceAccum.x, body.forceAccum.y, body.forceAccum.z,
+                           body.torqueAccum.x, body.torqueAccum.y, body.torqueAccum.z,
+                           body.motion) + tuple(body.inverseInertiaTensor.data) for body in bodies], dtype=np.float64).reshape(-1, 38)
+        flags = np.array([(body.isAwake, body.canSleep) for body in bodies], dtype=np.uint8).reshape(-1, 2)
+
+        if any(id(registeration.body) not in indices for registeration in self.forceRegistry.registerations):
+            raise ValueError('forces are registered on bodies which are not in bodyRegistry')
+        generators = {}
+        for registeration in self.forceRegistry.registerations: generators.setdefault(id(registeration.ForceGenerator), len(generators))
+        forces = np.array([(indices[id(registeration.body)], generators[id(registeration.ForceGenerator)])
+                           for registeration in self.forceRegistry.registerations], dtype=np.int64).reshape(-1, 2)
+
+        resolver, data, stepper = self.resolver, self.collisionData, self.stepper
+        sequentialImpulse = isinstance(resolver, SequentialImpulseResolver)
+        solver = np.array((1 if sequentialImpulse else 0, resolver.velocityIterations, resolver.positionIterations,
+                           resolver.velocityEpsilon, resolver.positionEpsilon, resolver.useIslands, resolver.useHeap,
+                           resolver.warmStartFactor if sequentialImpulse else 0, self.calculateIteration,
+                           data.friction, data.restitution, data.tolerance,
+                           stepper.timestep, stepper.maxSubsteps, stepper.accumulator, stepper.steps, stepper.droppedTime), dtype=np.float64)
+
+        impulses = np.empty((0, 6))
+        if sequentialImpulse:
+            impulses = np.array([(indices.get(id(one), -1) if one is not None else -1, indices.get(id(two), -1) if two is not None else -1,
+                                  feature, impulse.x, impulse.y, impulse.z)
+                                 for (one, two, feature), impulse in resolver.impulseCache.items()], dtype=np.float64).reshape(-1, 6)
+
+        cache, points = self.packManifoldCache()
+        return Snapshot.pack(SNAPSHOT_WORLD, {'bodies': state, 'flags': flags, 'forces': forces, 'solver': solver, 'impulses': impulses,
+                                              'cache': cache, 'points': points})
+
+    def packManifoldCache(self):
+        '''
+            Return the cache and points arrays of a snapshot, manifolds of primitives which are no longer
+            in the world are skipped, they would be pruned in the next frame
+        '''
+
+        cache = self.manifoldCache
+        if cache is None: return np.zeros(4), np.empty((0, 39))
+
+        primitives = {id(primitive): index for index, primitive in enumerate(self.primitiveRegistry)}
+        planes = {id(plane): index for index, plane in enumerate(self.planeRegistry)}
+        rows = []
+        for manifold in cache.manifolds.values():
+            one, two = manifold.primitives
+            first = primitives.get(id(one))
+            second = planes.get(id(two)) if manifold.isPlane else primitives.get(id(two))
+            if first is None or second is None: continue
+            transforms = manifold.transforms[0] + (manifold.transforms[1] or [0] * 12)
+            for point in manifold.points:
+                anchor = point.localAnchor or Vector()
+                normal = point.localNormal or Vector()
+                rows.append([first, second, manifold.isPlane, manifold.frame] + transforms +
+                            [point.localPoint.x, point.localPoint.y, point.localPoint.z, anchor.x, anchor.y, anchor.z,
+                             normal.x, normal.y, normal.z, point.planeOffset, point.feature])
+        return np.array((1, cache.maxDrift, cache.breakingDistance, cache.frame), dtype=np.float64), np.array(rows, dtype=np.float64).reshape(-1, 39)
+
+    def unpackManifoldCache(self, cache, points):
+        '''
+            Load the cache and points arrays of a snapshot into the manifold cache, the cache of the world is kept
+            and cleared, or created or removed to match the snapshot
+            ---------
+            args:
+                cache  - numpy.ndarray - (4,) manifold cache settings
+                points - numpy.ndarray - (P,39) kept manifold points
+        '''
+
+        enabled, maxDrift, breakingDistance, frame = cache.tolist()
+        if not enabled:
+            self.manifoldCache = None
+            return
+        if self.manifoldCache is None: self.manifoldCache = ManifoldCache()
+        manifoldCache = self.manifoldCache
+        manifoldCache.clear()
+        manifoldCache.maxDrift, manifoldCache.breakingDistance, manifoldCache.frame = maxDrift, breakingDistance, int(frame)
+        manifoldCache.reused = manifoldCache.built = 0
+
+        for row in points.tolist():
+            first, second, isPlane = int(row[0]), int(row[1]), bool(row[2])
+            one = self.primitiveRegistry[first]
+            two = self.planeRegistry[second] if isPlane else self.primitiveRegistry[second]
+
+            #Keys are built as ManifoldCache.collide and collideHalfSpace build them
+            key = (one, two) if isPlane or id(one) < id(two) else (two, one)
+            manifold = manifoldCache.manifolds.get(key)
+            if manifold is None:
+                manifold = ContactManifold(one, two)
+                manifold.frame = int(row[3])
+                manifold.transforms = [row[4:16], None if isPlane else row[16:28]]
+                manifoldCache.manifolds[key] = manifold
+            localPoint = Vector(*row[28:31])
+            if isPlane: manifold.points.append(ManifoldPoint(localPoint, None, None, row[37], int(row[38])))
+            else: manifold.points.append(ManifoldPoint(localPoint, Vector(*row[31:34]), Vector(*row[34:37]), 0, int(row[38])))
+
+    def restore(self, data):
+        '''
+            Load a snapshot taken by snapshot into the bodies of the world, force registrations are rebuilt
+            from the force generators currently registered and the resolver is replaced if it's of another type
+            Contacts kept by the manifold cache are restored into the world's cache, so a restored world continues
+            the same trajectory
+            Raises ValueError if the snapshot doesn't match the bodies, force generators or primitives of the world
+            ---------
+            args:
+                data - bytes - snapshot
+        '''
+
+        arrays = Snapshot.unpack(data, SNAPSHOT_WORLD)
+        state, flags, forces, solver, impulses = arrays['bodies'], arrays['flags'], arrays['forces'], arrays['solver'], arrays['impulses']
+        cache, points = arrays.get('cache'), arrays.get('points')
+
+        bodies = self.bodyRegistry
+        if len(state) != len(bodies): raise ValueError('snapshot has %d bodies, the world has %d' % (len(state), len(bodies)))
+
+        generators = []
+        for registeration in self.forceRegistry.registerations:
+            if not any(generator is registeration.ForceGenerator for generator in generators): generators.append(registeration.ForceGenerator)
+        if len(forces) and forces[:, 1].max() >= len(generators):
+            raise ValueError('snapshot uses %d force generators, the world has %d' % (forces[:, 1].max() + 1, len(generators)))
+        if points is not None and len(points):
+            planes = points[:, 2] == 1
+            if points[:, 0].max() >= len(self.primitiveRegistry) or points[~planes, 1].max(initial=-1) >= len(self.primitiveRegistry) \
+               or points[planes, 1].max(initial=-1) >= len(self.planeRegistry):
+                raise ValueError('snapshot has contacts of primitives or planes which are not in the world')
+
+        for body, row, flag in zip(bodies, state.tolist(), flags.tolist()):
+            body.inverseMass, body.linearDamping, body.angularDamping = row[0:3]
+            #Values are written into the body's own objects, references to them (get...View) stay valid
+            body.position.set(*row[3:6])
+            body.orientation.setComponent(*row[6:10])
+            body.velocity.set(*row[10:13])
+            body.rotation.set(*row[13:16])
+            body.acceleration.set(*row[16:19])
+            body.lastFrameAcceleration.set(*row[19:22])
+            body.forceAccum.set(*row[22:25])
+            body.torqueAccum.set(*row[25:28])
+            body.motion = row[28]
+            body.inverseInertiaTensor.data[:] = row[29:38]
+            body.isAwake, body.canSleep = bool(flag[0]), bool(flag[1])
+            body.calculateDerivedData()
+
+        self.forceRegistry.registerations = [ForceRegistry.ForceRegisteration(bodies[body], generators[generator]) for body, generator in forces.tolist()]
+
+        resolverType, velocityIterations, positionIterations, velocityEpsilon, positionEpsilon, useIslands, useHeap, warmStartFactor, calculateIteration, \
+            friction, restitution, tolerance, timestep, maxSubsteps, accumulator, steps, droppedTime = solver.tolist()
+        if resolverType == 1:
+            if not isinstance(self.resolver, SequentialImpulseResolver): self.resolver = SequentialImpulseResolver(0, 0)
+            self.resolver.warmStartFactor = warmStartFactor
+            self.resolver.impulseCache = {(bodies[int(one)] if one >= 0 else None, bodies[int(two)] if two >= 0 else None, int(feature)): Vector(x, y, z)
+                                          for one, two, feature, x, y, z in impulses.tolist()}
+        elif type(self.resolver) is not ContactResolver: self.resolver = ContactResolver(0, 0)
+        self.resolver.setIterations(int(velocityIterations), int(positionIterations))
+        self.resolver.setEpsilon(velocityEpsilon, positionEpsilon)
+        self.resolver.useIslands, self.resolver.useHeap = bool(useIslands), bool(useHeap)
+        self.calculateIteration = bool(calculateIteration)
+        self.collisionData.friction, self.collisionData.restitution, self.collisionData.tolerance = friction, restitution, tolerance
+
+        self.stepper = FixedTimestep(timestep, int(maxSubsteps))
+        self.stepper.accumulator, self.stepper.steps, self.stepper.droppedTime = accumulator, int(steps), droppedTime
+        self.stepper.alpha = accumulator / timestep
+        self.previousState = None
+
+        #Derived data of primitives belongs to the old state
+        self.sleepingPrimitives.clear()
+        self.broadPhase.clearSleeping()
+        for primitive in self.primitiveRegistry:
+            if primitive.body is not None: primitive.calculateInternals()
+        #Snapshots written before the manifold cache was saved drop the cached contacts
+        if cache is not None: self.unpackManifoldCache(cache, points)
+        elif self.manifoldCache is not None: self.manifoldCache.clear()
+        if self.bodyBatch is not None: self.bodyBatch.loadBodies(bodies)
+
+    def setStateArray(self, state):
+        '''
+            Set position, orientation, velocity and rotation of the bodies in bodyRegistry from an (N,13) array
+            laid out as getStateArray, derived data of the bodies is recalculated
+            Values are written into the bodies' own vectors, so references to them stay valid
+            ---------
+            args:
+                state - numpy.ndarray - (N,13) state array
+        '''
 
+        if len(state) != len(self.bodyRegistry): raise ValueError('state has %d rows, the world has %d bodies' % (len(state), len(self.bodyRegistry)))
+        for body, row in zip(self.bodyRegistry, np.asarray(state, dtype=np.float64).tolist()):
+            body.position.set(*row[0:3])
+            body.orientation.setComponent(*row[3:7])
+            body.velocity.set(*row[7:10])
+            body.rotation.set(*row[10:13])
+            body.calculateDerivedData()
+
+    def startRecording(self, path, capacity = None, keyframeInterval = 60):
+        '''
+            Append the state array after each frame to a frame log read by FrameLogReader, a snapshot is
+            taken before every keyframeInterval frames so the log can be re-simulated and checked
+            Keyframes hold the contacts of the manifold cache, so a re-simulated frame refreshes the same
+            contacts as the recorded one instead of running the narrow phase
+            ---------
+            args:
+                path             - str         - path of the frame log, the keyframes are written next to it
+                capacity         - int = None  - max number of bodies, current number of bodies if None
+                keyframeInterval - int = 60    - frames between keyframes, 0 for no keyframes
+        '''
+
+        self.stopRecording()
+        if capacity is None: capacity = len(self.bodyRegistry)
+        self.recorder = FrameRecorder(path, SNAPSHOT_WORLD, 13, capacity, keyframeInterval)
+
+    def stopRecording(self):
+        '''
+            Close the frame log
+        '''
+
+        if self.recorder is not None: self.recorder.close()
+        self.recorder = None
+
+    def getStateArray(self, dtype = np.float64):
+        '''
+            Return an (N,13) array of the bodies in bodyRegistry order, columns are
+            position 0:3, orientation r, i, j, k 3:7, velocity 7:10 and rotation 10:13
+            ---------
+            args:
+                dtype - numpy.dtype = float64 - float32 halves the size when sending states between processes
+        '''
+
+        state = np.empty((len(self.bodyRegistry), 13), dtype=dtype)
+        for row, body in zip(state, self.bodyRegistry):
+            position, orientation, velocity, rotation = body.position, body.orientation, body.velocity, body.rotation
+            row[:] = (position.x, position.y, position.z,
+                      orientation.r, orientation.i, orientation.j, orientation.k,
+                      velocity.x, velocity.y, velocity.z,
+                      rotation.x, rotation.y, rotation.z)
+        return state
+
+    @staticmethod
+    def gatherState(bodies):
+        '''
+            Return (N,3) positions and (N,4) orientations of bodies
+            ---------
+            args:
+                bodies - list - RigidBody objects
+        '''
+
+        positions = np.array([(body.position.x, body.position.y, body.position.z) for body in bodies], dtype=float).reshape(-1, 3)
+        orientations = np.array([(body.orientation.r, body.orientation.i, body.orientation.j, body.orientation.k) for body in bodies], dtype=float).reshape(-1, 4)
+        return positions, orientations
+
+    @staticmethod
+    def blendStates(previousPositions, previousOrientations, positions, orientations, alpha):
+        '''
+            Return (N,3,4) transforms of positions blended linearly and orientations blended by nlerp
+            ---------
+            args:
+                previousPositions    - numpy.ndarray - (N,3) positions at alpha 0
+                previousOrientations - numpy.ndarray - (N,4) orientations at alpha 0
+                positions            - numpy.ndarray - (N,3) positions at alpha 1
+                orientations         - numpy.ndarray - (N,4) orientations at alpha 1
+                alpha                - double        - blend factor between 0 and 1
+        '''
+
+        positions = previousPositions + (positions - previousPositions) * alpha
+
+        #q and -q are the same rotation, blend along the shorter arc
+        sign = np.where(np.einsum('ni,ni->n', previousOrientations, orientations) < 0, -1.0, 1.0)
+        orientations = previousOrientations + (orientations * sign[:, None] - previousOrientations) * alpha
+
+        length = np.sqrt(np.einsum('ni,ni->n', orientations, orientations))
+        small = length < REAL_EPSILON
+        if small.any():
+            orientations[small] = (1, 0, 0, 0)
+            length[small] = 1
+        orientations /= length[:, None]
+
+        return RigidBodyBatch.calculateTransforms(positions, orientations)
 
     def generateContacts(self):
         '''
-            Add contacts due to contact generators
+            Add contacts due to contact generators and collision of primitives
         '''
 
-        limit = self.maxContact
+        data = self.collisionData
+        data.reset(self.maxContact)
         for reg in self.contactGenRegistry:
-            used  = reg.addContact(self.contactRegistry, limit)
-            limit -= used
+            if getattr(reg, 'usesPool', False):
+                used = reg.addContact(data, data.contactsLeft)
+            else:
+                #Generators written for a contact list get one, their contacts are put in the pool
+                contacts = []
+                used = reg.addContact(contacts, data.contactsLeft)
+                data.reserve(data.contactCount + used)
+                for offset, contact in enumerate(contacts[:used]):
+                    data.contactArray[data.contactCount + offset] = contact
+            data.addContacts(used)
+
+            if not data.hasMoreContacts(): break
+
+        self.generateCollisions()
+        return data.contactCount
+
+    def generateCollisions(self):
+        '''
+            Collide primitives with planes, and with each other for pairs found by the broad phase
+            Primitives of sleeping bodies are not moved, and are only collided with primitives of awake bodies
+            Without a manifold cache boxes and spheres are collided with planes by BatchCollisionDetector
+        '''
+
+        if not self.primitiveRegistry: return
+        data = self.collisionData
+
+        #Time of contact generators is counted in the narrow phase
+        stats = self.stats
+        if stats is not None: stats.mark('narrowPhase')
+
+        sleepingPrimitives = self.sleepingPrimitives
+        for primitive in self.primitiveRegistry:
+            if primitive.body is None or primitive in self.staticPrimitives: continue
+            if primitive.body.isAwake:
+                primitive.calculateInternals()
+                sleepingPrimitives.discard(primitive)
+            elif primitive not in sleepingPrimitives:
+                #Transform is calculated once more after the body fell asleep
+                primitive.calculateInternals()
+                sleepingPrimitives.add(primitive)
+        self.broadPhase.update()
+        if stats is not None: stats.mark('broadPhase')
+
+        #Primitives of sleeping bodies are only collided with awake ones
+        awakePrimitives = [primitive for primitive in self.primitiveRegistry if primitive.isAwake()]
+
+        #The manifold cache runs the narrow phase only for pairs which moved
+        detector = CollisionDetector
+        if self.manifoldCache is not None:
+            detector = self.manifoldCache
+            detector.prune()
+
+        if self.manifoldCache is None:
+            #All boxes and spheres are collided with all planes in one vectorized pass
+            BatchCollisionDetector.collideHalfSpaces(awakePrimitives, self.planeRegistry, data)
+        else:
+            for plane in self.planeRegistry:
+                for primitive in awakePrimitives:
+                    if not data.hasMoreContacts(): return
+                    detector.collideHalfSpace(primitive, plane, data)
 
-            if limit <= 0: break
+        if stats is not None: stats.mark('narrowPhase')
+        potentialContacts = self.broadPhase.getPotentialContacts(data.contactsLeft)
+        if stats is not None: stats.mark('broadPhase')
 
-        return self.maxContact - limit
+        for potentialContact in potentialContacts:
+            if not data.hasMoreContacts(): return
+            one, two = potentialContact.primitives
+            if not (one.isAwake() or two.isAwake()): continue
+            detector.collide(one, two, data)
         
 
     def getBodyRegistry(self):
         return self.bodyRegistry
 
     def getForces(self):
-        return self.forceRegistery
\ No newline at end of file
+        return self.forceRegistry
\ No newline at end of file
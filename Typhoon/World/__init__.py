@@ -1 +1 @@
-
+from Typhoon.World.World import World
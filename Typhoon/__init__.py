@@ -8,4 +8,6 @@ from Typhoon.Fgen import *
 from Typhoon.World import *
 from Typhoon.Body import *
 from Typhoon.Contact import *
-from Typhoon.Link import *
\ No newline at end of file
+from Typhoon.Link import *
+from Typhoon.Batch import *
+from Typhoon.State import *
\ No newline at end of file
@@ -0,0 +1,112 @@
+from os.path import dirname, abspath, join
+import sys
+sys.path.insert(0, join(dirname(abspath(__file__)), '..'))
+
+import unittest
+from Typhoon import *
+
+def makeParticle(x):
+    particle = Particle()
+    particle.setMass(1)
+    particle.setPosition(x, 10, 0)
+    particle.setAcceleration(0, -1, 0)
+    return particle
+
+class ParticleStoreSyncTest(unittest.TestCase):
+
+    def runFrames(self, world, frames):
+        for frame in range(frames):
+            world.startFrame()
+            world.runPhysics(0.1)
+
+    def test_swapped_particle_at_same_count_is_rebound(self):
+        world = ParticleWorld(10)
+        for x in range(3):
+            world.addParticle(makeParticle(x))
+        self.runFrames(world, 3)
+
+        old = world.getParticles()[0]
+        new = makeParticle(5)
+        world.getParticles()[0] = new
+        oldY = old.getPosition().y
+        self.runFrames(world, 10)
+
+        self.assertLess(new.getPosition().y, 10)
+        self.assertEqual(old.getPosition().y, oldY)
+        self.assertIsNone(old.store)
+        self.assertEqual(world.particleStore.count, 3)
+        self.assertCountEqual([id(p) for p in world.particleStore.particles], [id(p) for p in world.getParticles()])
+
+class AnchoredParticle(Particle):
+    '''
+        Particle which ignores forces and stays where it is
+    '''
+
+    def integrate(self, duration):
+        self.integrations = getattr(self, 'integrations', 0) + 1
+        self.clearAccumulator()
+
+class HalfSpeedParticle(Particle):
+    '''
+        Particle which integrates as Particle with half the time step
+    '''
+
+    def integrate(self, duration):
+        super().integrate(duration / 2)
+
+class ParticleStoreIntegrateTest(unittest.TestCase):
+
+    def runFrames(self, world, frames):
+        for frame in range(frames):
+            world.startFrame()
+            world.runPhysics(0.1)
+
+    def makeParticle(self, cls, x):
+        particle = cls()
+        particle.setMass(1)
+        particle.setDamping(0.9)
+        particle.setPosition(x, 10, 0)
+        particle.setVelocity(1, 0, 0)
+        particle.setAcceleration(0, -1, 0)
+        return particle
+
+    def test_overridden_integrate_is_called(self):
+        world = ParticleWorld(10)
+        plain = self.makeParticle(Particle, 0)
+        anchored = self.makeParticle(AnchoredParticle, 1)
+        world.addParticle(plain)
+        world.addParticle(anchored)
+        self.runFrames(world, 5)
+
+        self.assertEqual(anchored.integrations, 5)
+        self.assertEqual((anchored.getPosition().x, anchored.getPosition().y), (1, 10))
+        self.assertLess(plain.getPosition().y, 10)
+
+    def test_overridden_integrate_matches_its_own_integration(self):
+        world = ParticleWorld(10)
+        reference = ParticleWorld(10)
+        for x in range(3):
+            world.addParticle(self.makeParticle(HalfSpeedParticle if x == 1 else Particle, x))
+            reference.addParticle(self.makeParticle(Particle, x))
+        self.runFrames(world, 4)
+        self.runFrames(reference, 4)
+
+        expected = self.makeParticle(Particle, 1)
+        for frame in range(4):
+            expected.integrate(0.05)
+        half = world.getParticles()[1]
+        self.assertAlmostEqual(half.getPosition().x, expected.getPosition().x)
+        self.assertAlmostEqual(half.getPosition().y, expected.getPosition().y)
+        for particle, other in zip(world.getParticles()[::2], reference.getParticles()[::2]):
+            self.assertEqual(particle.getPosition().y, other.getPosition().y)
+
+    def test_removed_particle_leaves_custom_list(self):
+        world = ParticleWorld(10)
+        anchored = self.makeParticle(AnchoredParticle, 1)
+        world.addParticle(self.makeParticle(Particle, 0))
+        world.addParticle(anchored)
+        world.removeParticle(anchored)
+        self.assertEqual(world.particleStore.custom, [])
+
+if __name__ == '__main__':
+    unittest.main()
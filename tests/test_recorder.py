@@ -0,0 +1,52 @@
+from os.path import dirname, abspath, join
+import sys
+sys.path.insert(0, join(dirname(abspath(__file__)), '..'))
+sys.path.insert(0, dirname(abspath(__file__)))
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from Typhoon import *
+from test_world_snapshot import makeStack, runFrames
+
+class FrameLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = join(self.directory.name, 'frames.log')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, world, frames, keyframeInterval):
+        world.startRecording(self.path, keyframeInterval=keyframeInterval)
+        runFrames(world, frames)
+        world.stopRecording()
+        return FrameLogReader(self.path)
+
+    def test_replay_of_world_with_manifold_cache_matches_recording(self):
+        world = makeStack(4)
+        world.setManifoldCache()
+        reader = self.record(world, 60, 20)
+        try:
+            self.assertIsNone(reader.verify(world))
+            self.assertIsNone(reader.verify(world, 40))
+
+            reader.seek(world, 59)
+            np.testing.assert_array_equal(world.getStateArray(), reader.getFrame(59)[2])
+        finally:
+            reader.close()
+
+    def test_verify_reports_first_diverging_frame(self):
+        world = makeStack(4)
+        world.setManifoldCache()
+        reader = self.record(world, 60, 20)
+        try:
+            world.planeRegistry[0].offset = 0.1
+            self.assertEqual(reader.verify(world, 40), 40)
+        finally:
+            reader.close()
+
+if __name__ == '__main__':
+    unittest.main()
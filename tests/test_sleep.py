@@ -0,0 +1,73 @@
+from os.path import dirname, abspath, join
+import sys
+sys.path.insert(0, join(dirname(abspath(__file__)), '..'))
+
+import unittest
+from Typhoon import *
+
+def makeBall(world, x, radius = 0.5):
+    body = RigidBody()
+    body.setMass(1)
+    tensor = Matrix3()
+    tensor.setBlockInertiaTensor(Vector(radius, radius, radius), 1)
+    body.setInertiaTensor(tensor)
+    body.setDamping(1, 1)
+    body.setCanSleep(True)
+    body.setPosition(x, 0, 0)
+    body.calculateDerivedData()
+    world.getBodyRegistry().append(body)
+
+    primitive = CollisionSphere()
+    primitive.body = body
+    primitive.radius = radius
+    world.addPrimitive(primitive)
+    return body
+
+def runFrames(world, frames):
+    for frame in range(frames):
+        world.startFrame()
+        world.runPhysics(1/60)
+
+class SleepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(16)
+        self.world.collisionData.restitution = 0.5
+        self.ball = makeBall(self.world, 0)
+
+    def fallAsleep(self):
+        for frame in range(600):
+            if not self.ball.isAwake: return
+            runFrames(self.world, 1)
+        self.fail('ball did not fall asleep')
+
+    def test_resting_body_falls_asleep(self):
+        self.fallAsleep()
+        self.assertLess(self.ball.motion, SLEEP_EPSILON)
+        self.assertEqual(self.ball.velocity.magnitude(), 0)
+
+    def test_slow_hit_wakes_sleeping_body_and_moves_it(self):
+        self.fallAsleep()
+        start = self.ball.position.x
+
+        #A ball rolling in at 0.5 m/s, under the speed which keeps a body awake on its own
+        other = makeBall(self.world, -3)
+        other.setCanSleep(False)
+        other.setVelocity(0.5, 0, 0)
+        runFrames(self.world, 300)
+
+        self.assertTrue(self.ball.isAwake)
+        self.assertGreater(self.ball.velocity.x, 0)
+        self.assertGreater(self.ball.position.x - start, 0.1)
+
+    def test_impulse_wakes_sleeping_body(self):
+        self.fallAsleep()
+        self.ball.addImpulse(Vector(0.5, 0, 0))
+        runFrames(self.world, 10)
+
+        self.assertTrue(self.ball.isAwake)
+        self.assertGreater(self.ball.velocity.x, 0)
+        self.assertGreater(self.ball.position.x, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+from os.path import dirname, abspath, join
+import sys
+sys.path.insert(0, join(dirname(abspath(__file__)), '..'))
+
+import unittest
+import numpy as np
+from Typhoon import *
+
+def makeStack(height):
+    world = World(height * 4)
+    world.collisionData.friction = 0.6
+
+    ground = CollisionPlane()
+    ground.direction = Vector(0, 1, 0)
+    ground.offset = 0
+    world.addPlane(ground)
+
+    for i in range(height):
+        body = RigidBody()
+        body.setMass(1)
+        tensor = Matrix3()
+        tensor.setBlockInertiaTensor(Vector(1, 1, 1), 1)
+        body.setInertiaTensor(tensor)
+        body.setDamping(0.95, 0.8)
+        body.setPosition(0, 1 + i * 2, 0)
+        body.setAcceleration(0, -9.81, 0)
+        body.calculateDerivedData()
+        world.getBodyRegistry().append(body)
+
+        primitive = CollisionBox()
+        primitive.body = body
+        primitive.halfSize = Vector(1, 1, 1)
+        world.addPrimitive(primitive)
+    return world
+
+def runFrames(world, frames):
+    for frame in range(frames):
+        world.startFrame()
+        world.runPhysics(1/60)
+
+class WorldSnapshotTest(unittest.TestCase):
+
+    def test_restored_world_with_manifold_cache_continues_the_same_trajectory(self):
+        world = makeStack(4)
+        world.setManifoldCache()
+        world.manifoldCache.maxDrift, world.manifoldCache.breakingDistance = 0.04, 0.01
+        runFrames(world, 30)
+        self.assertTrue(world.manifoldCache.manifolds)
+
+        data = world.snapshot()
+        runFrames(world, 30)
+        expected = world.getStateArray()
+
+        cache = world.manifoldCache
+        world.restore(data)
+        self.assertIs(world.manifoldCache, cache)
+        self.assertEqual((cache.maxDrift, cache.breakingDistance), (0.04, 0.01))
+        runFrames(world, 30)
+        np.testing.assert_array_equal(world.getStateArray(), expected)
+
+    def test_snapshot_restores_into_a_world_built_by_the_same_code(self):
+        world = makeStack(4)
+        world.setManifoldCache()
+        runFrames(world, 30)
+        data = world.snapshot()
+        runFrames(world, 30)
+
+        other = makeStack(4)
+        other.restore(data)
+        self.assertIsNotNone(other.manifoldCache)
+        runFrames(other, 30)
+        np.testing.assert_array_equal(other.getStateArray(), world.getStateArray())
+
+    def test_snapshot_of_other_primitives_is_rejected(self):
+        world = makeStack(4)
+        world.setManifoldCache()
+        runFrames(world, 30)
+        data = world.snapshot()
+
+        other = makeStack(4)
+        other.primitiveRegistry = other.primitiveRegistry[:1]
+        with self.assertRaises(ValueError):
+            other.restore(data)
+
+if __name__ == '__main__':
+    unittest.main()